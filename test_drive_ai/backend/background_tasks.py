@@ -1,39 +1,221 @@
 import asyncio
-from typing import Any
+import logging
+import math
+import time
+from typing import Any, Optional
 
+from test_drive_ai.backend.config import settings
 from test_drive_ai.backend.experiment_schema import ExperimentStatus
+from test_drive_ai.backend.experiment_service import ExperimentService
+from test_drive_ai.backend.simulation_service import SimulationService
+
+logger = logging.getLogger(__name__)
+
+# Weight of the latest finished run in the moving average of seconds per work unit
+THROUGHPUT_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """A run was refused because the worker pool or the client's quota is exhausted"""
+
+    def __init__(self, reason: str, message: str, retry_after: int, estimated_wait: float):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.estimated_wait = estimated_wait
 
 
 class ExperimentTaskManager:
-    """Manager for background experiment tasks"""
+    """Manager for background experiment tasks
 
-    def __init__(self):
+    At most max_concurrent experiments run at once; further runs wait in a queue.
+    Runs are admitted against the queue depth, the outstanding estimated work and
+    per-client quotas before they are created.
+    """
+
+    def __init__(self, max_concurrent: int = settings.MAX_CONCURRENT_EXPERIMENTS):
         self.running_tasks: dict[str, asyncio.Task] = {}
+        self.max_concurrent = max_concurrent
+        self.queued = 0
+        self.active = 0
+        self.seconds_per_unit = settings.ADMISSION_DEFAULT_SECONDS_PER_UNIT
+        self.draining = False
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._reservations: dict[str, tuple[str, int]] = {}
+        self._jobs: dict[str, tuple[str, dict[str, Any], ExperimentService]] = {}
+
+    @property
+    def saturated(self) -> bool:
+        """Whether every worker slot is taken, so new runs will queue"""
+        return self.active >= self.max_concurrent
+
+    @property
+    def outstanding_work(self) -> int:
+        """Estimated work units of every admitted run that has not finished"""
+        return sum(units for _, units in self._reservations.values())
+
+    def estimated_wait(self) -> float:
+        """Estimate in seconds how long a newly admitted run would wait for a worker slot"""
+        pending = len(self._reservations) - self.active
+        if pending <= 0 and not self.saturated:
+            return 0.0
+        return self.outstanding_work * self.seconds_per_unit / self.max_concurrent
+
+    def admit(self, client_id: str, units: int) -> None:
+        """Check whether a client may start a run of the given estimated work
+
+        Raises:
+            AdmissionRejected: If the queue, the outstanding work or the client's quota is at its limit
+        """
+        if self.draining:
+            raise AdmissionRejected(
+                "draining", "The service is shutting down", math.ceil(settings.SHUTDOWN_DRAIN_SECONDS), 0.0
+            )
+        pending = len(self._reservations) - self.active
+        quota = settings.ADMISSION_CLIENT_QUOTAS.get(client_id, settings.ADMISSION_CLIENT_MAX_RUNS)
+        client_runs = sum(1 for owner, _ in self._reservations.values() if owner == client_id)
+
+        if client_runs >= quota:
+            reason, message = "client_quota", f"Client already has {client_runs} of {quota} allowed runs in progress"
+        elif pending >= settings.ADMISSION_MAX_QUEUED_RUNS:
+            reason, message = "queue_full", f"{pending} runs are already waiting for a worker"
+        elif self._reservations and self.outstanding_work + units > settings.ADMISSION_MAX_OUTSTANDING_WORK:
+            reason, message = "work_limit", "Outstanding simulation work is at its limit"
+        else:
+            return
+
+        estimated_wait = self.estimated_wait()
+        retry_after = min(max(1, math.ceil(estimated_wait)), settings.ADMISSION_MAX_RETRY_AFTER_SECONDS)
+        raise AdmissionRejected(reason, message, retry_after, estimated_wait)
+
+    def reserve(self, run_id: str, client_id: str, units: int) -> None:
+        """Account an admitted run until it finishes"""
+        self._reservations[run_id] = (client_id, units)
+
+    def start(
+        self,
+        experiment_id: str,
+        run_id: str,
+        config: dict[str, Any],
+        experiment_service: ExperimentService,
+        simulation_service: SimulationService,
+    ) -> asyncio.Task:
+        """Schedule a run as a task owned by the manager, so shutdown can drain or checkpoint it"""
+        self._jobs[run_id] = (experiment_id, config, experiment_service)
+        task = asyncio.create_task(
+            self.run_experiment(experiment_id, run_id, config, experiment_service, simulation_service)
+        )
+        self.running_tasks[run_id] = task
+        task.add_done_callback(lambda finished: self._forget(run_id, finished))
+        return task
+
+    def _forget(self, run_id: str, task: asyncio.Task) -> None:
+        self.running_tasks.pop(run_id, None)
+        self._jobs.pop(run_id, None)
+        # Failures were already logged and recorded on the run
+        if not task.cancelled():
+            task.exception()
+
+    def estimated_remaining(self, run_id: str, progress: float) -> float:
+        """Estimate in seconds how long a started run still needs"""
+        _, units = self._reservations.get(run_id, ("", 0))
+        return units * self.seconds_per_unit * (1 - progress / 100)
+
+    async def drain(self, deadline_seconds: float) -> list[dict[str, Any]]:
+        """Stop admitting runs, let short runs finish and checkpoint the rest
+
+        Started runs expected to finish within the deadline are awaited. Runs still queued or
+        unfinished at the deadline are cancelled and returned as checkpoints from which a
+        later process resumes them.
+        """
+        self.draining = True
+        short_runs = []
+        for run_id, task in self.running_tasks.items():
+            run = self._jobs[run_id][2].get_run_status(run_id)
+            if (
+                run is not None
+                and run.status != ExperimentStatus.PENDING
+                and self.estimated_remaining(run_id, run.progress) <= deadline_seconds
+            ):
+                short_runs.append(task)
+        if short_runs:
+            await asyncio.wait(short_runs, timeout=deadline_seconds)
+
+        checkpoints: list[dict[str, Any]] = []
+        interrupted = list(self.running_tasks.items())
+        for run_id, task in interrupted:
+            experiment_id, config, experiment_service = self._jobs[run_id]
+            client_id, units = self._reservations.get(run_id, ("", 0))
+            run = experiment_service.get_run_status(run_id)
+            if run is not None:
+                checkpoints.append({
+                    "experiment_id": experiment_id,
+                    "run": run.model_dump(mode="json"),
+                    "config": config,
+                    "client_id": client_id,
+                    "units": units,
+                })
+            task.cancel()
+        await asyncio.gather(*(task for _, task in interrupted), return_exceptions=True)
+        if checkpoints:
+            logger.info("Checkpointed unfinished runs", extra={"run_ids": [c["run"]["run_id"] for c in checkpoints]})
+        return checkpoints
 
     async def run_experiment(
         self,
         experiment_id: str,
         run_id: str,
         config: dict[str, Any],
-        experiment_service,
-        simulation_service,
-    ):
-        """Run an experiment in the background"""
+        experiment_service: ExperimentService,
+        simulation_service: SimulationService,
+    ) -> None:
+        """Run an experiment in the background once a worker slot is free"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
 
-        def status_callback(run_id: str, status: ExperimentStatus, progress: float, current_step: str):
+        # The reservation is released however the run ends, including when it is cancelled while queued
+        try:
+            self.queued += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self.queued -= 1
+            self.active += 1
+            start = time.perf_counter()
+            try:
+                await self._run(experiment_id, run_id, config, experiment_service, simulation_service)
+                _, units = self._reservations.get(run_id, ("", 0))
+                if units:
+                    self.seconds_per_unit += THROUGHPUT_SMOOTHING * (
+                        (time.perf_counter() - start) / units - self.seconds_per_unit
+                    )
+            finally:
+                self.active -= 1
+                self._slots.release()
+        finally:
+            self._reservations.pop(run_id, None)
+
+    async def _run(
+        self,
+        experiment_id: str,
+        run_id: str,
+        config: dict[str, Any],
+        experiment_service: ExperimentService,
+        simulation_service: SimulationService,
+    ) -> None:
+        """Run an experiment on a worker slot"""
+
+        def status_callback(run_id: str, status: ExperimentStatus, progress: float, current_step: str) -> None:
             """Callback to update experiment status"""
-            print(f"Updating status for run {run_id}: {status}, progress: {progress}, step: {current_step}")
-            run = experiment_service.update_run_status(run_id, status, progress, current_step)
-            print(f"Status updated for run {run_id} - {run}")
+            experiment_service.update_run_status(run_id, status, progress, current_step)
 
         try:
-            print(f"Starting experiment {experiment_id} with run ID {run_id}")
+            logger.info("Experiment run started", extra={"run_id": run_id, "experiment_id": experiment_id})
             # Update initial status
             status_callback(run_id, ExperimentStatus.INITIALIZING, 0, "Starting experiment")
-            print("Experiment initialization done")
 
             # Run the simulation
-            print(f"Running experiment {experiment_id} with config: {config}")
+            logger.debug("Experiment run config", extra={"run_id": run_id, "config": config})
             results = await simulation_service.run_experiment(experiment_id, run_id, config, status_callback)
 
             # Save results
@@ -41,23 +223,13 @@ class ExperimentTaskManager:
 
         except Exception as e:
             # Handle errors
+            logger.exception("Experiment run failed", extra={"run_id": run_id, "experiment_id": experiment_id})
             status_callback(run_id, ExperimentStatus.FAILED, 0, f"Error: {e!s}")
             raise
 
-        finally:
-            # Clean up
-            if run_id in self.running_tasks:
-                del self.running_tasks[run_id]
-
     def cancel_experiment(self, run_id: str) -> bool:
         """Cancel a running experiment"""
         if run_id in self.running_tasks:
-            task = self.running_tasks[run_id]
-            task.cancel()
-            del self.running_tasks[run_id]
+            self.running_tasks.pop(run_id).cancel()
             return True
         return False
-
-
-# Global instance
-experiment_task_manager = ExperimentTaskManager()
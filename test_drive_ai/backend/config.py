@@ -1,3 +1,22 @@
+import os
+
+# Settings overridden by the environment variable of the same name, converted to the default's type
+ENVIRONMENT_SETTINGS = (
+    "SIMULATION_ENGINE",
+    "FRAMEWORK_LLM_MODEL",
+    "FRAMEWORK_SIMULATION_MODE",
+    "FRAMEWORK_SIMULATION_BATCH",
+    "FRAMEWORK_CACHE_PATH",
+    "FRAMEWORK_MAX_CONCURRENCY",
+    "FRAMEWORK_LLM_TIMEOUT_SECONDS",
+    "FRAMEWORK_LLM_MAX_ATTEMPTS",
+    "FRAMEWORK_LLM_HEDGE",
+)
+
+# Environment values read as True for boolean settings
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
 class Settings:
     """Application settings"""
 
@@ -10,6 +29,10 @@ class Settings:
     APP_NAME: str = "Experiment Dashboard"
     API_VERSION: str = "1.0.0"
 
+    # Logging Settings
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_INTERVAL_SECONDS: float = 1.0  # at most one sampled record per run and message
+
     # CORS Settings
     CORS_ORIGINS: list = ["http://localhost:8501"]  # noqa: RUF012
 
@@ -17,10 +40,71 @@ class Settings:
     MAX_CONCURRENT_EXPERIMENTS: int = 5
     EXPERIMENT_TIMEOUT_SECONDS: int = 3600  # 1 hour
 
+    # Admission Control Settings
+    ADMISSION_MAX_QUEUED_RUNS: int = 20
+    ADMISSION_MAX_OUTSTANDING_WORK: int = 1_000_000  # population size x replications over admitted runs
+    ADMISSION_CLIENT_MAX_RUNS: int = 5  # unfinished runs per client
+    ADMISSION_CLIENT_QUOTAS: dict = {}  # noqa: RUF012 - overrides of ADMISSION_CLIENT_MAX_RUNS by client host
+    ADMISSION_DEFAULT_SECONDS_PER_UNIT: float = 0.002  # until finished runs have been measured
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 300  # cap on the Retry-After of refused runs
+
+    # Shutdown Settings
+    SHUTDOWN_DRAIN_SECONDS: float = 30.0  # how long short runs may finish before the rest are checkpointed
+    RUN_CHECKPOINT_PATH: str = "data/run_checkpoints.json"
+
+    # Experiment Catalog Settings
+    EXPERIMENTS_DIR: str = "data/experiments"
+    CATALOG_CACHE_PATH: str = "data/.cache/experiment_catalog.pickle"
+    CATALOG_RELOAD_INTERVAL_SECONDS: float = 5.0  # 0 disables hot reload
+    EXPERIMENT_PAGE_MAX_SIZE: int = 500
+    RUN_PAGE_MAX_SIZE: int = 500
+    COMPARE_MAX_RUNS: int = 100
+
+    # Outcome Storage Settings
+    OUTCOMES_DIR: str = "data/outcomes"
+    OUTCOME_BATCH_SIZE: int = 100_000  # rows per Parquet row group
+    OUTCOME_QUERY_MAX_ROWS: int = 10_000
+    EXPORT_CHUNK_ROWS: int = 10_000
+
+    # Simulation Engine Settings
+    # Overridable by environment variables, see ENVIRONMENT_SETTINGS
+    SIMULATION_ENGINE: str = "numeric"  # "numeric" mock simulator or "framework" for LLM-driven runs
+    FRAMEWORK_LLM_MODEL: str = "anthropic/claude-3-7-sonnet-20250219"
+    FRAMEWORK_SIMULATION_MODE: str = "hybrid"  # "llm" crew per intervention x segment or "hybrid" priors
+    FRAMEWORK_SIMULATION_BATCH: str = "none"  # in llm mode, "segments" or "interventions" share one crew
+    FRAMEWORK_CACHE_PATH: str = "data/llm_cache.sqlite3"
+    FRAMEWORK_MAX_CONCURRENCY: int = 4  # LLM jobs per run
+    FRAMEWORK_LLM_TIMEOUT_SECONDS: float = 120.0  # deadline of each LLM call attempt
+    FRAMEWORK_LLM_MAX_ATTEMPTS: int = 3  # attempts per LLM call on transient errors and missed deadlines
+    FRAMEWORK_LLM_HEDGE: bool = False  # duplicate LLM calls still running after their p95 latency
+
+    # Profiling Settings
+    PROFILES_DIR: str = "data/profiles"
+
+    # Run Watching Settings
+    WS_TICK_SECONDS: float = 0.25  # interval at which coalesced updates are flushed
+    WS_MAX_SUBSCRIPTIONS: int = 1000  # per connection
+    RUN_EVENT_BUFFER_SIZE: int = 256  # status events kept per run for SSE replay
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+
+    # Response Settings
+    COMPRESSION_MIN_BYTES: int = 1024
+
     class Config:
         env_file = ".env"
         case_sensitive = True
 
+    def __init__(self) -> None:
+        for name in ENVIRONMENT_SETTINGS:
+            value = os.environ.get(name)
+            if value is None:
+                continue
+            default = getattr(self, name)
+            if isinstance(default, bool):
+                setattr(self, name, value.strip().lower() in TRUE_VALUES)
+            else:
+                setattr(self, name, type(default)(value))
+
 
 # Create settings instance
 settings = Settings()
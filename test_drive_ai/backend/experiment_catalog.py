@@ -0,0 +1,342 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any, Optional
+
+import yaml
+from pydantic import ValidationError
+
+from test_drive_ai.backend.experiment_schema import Experiment, ExperimentConfig
+
+logger = logging.getLogger(__name__)
+
+# Prefer the libyaml-backed loader, falling back to the pure-Python one
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump when the layout of cached records changes
+CACHE_VERSION = 1
+
+# Experiment fields available without parsing the full config
+SUMMARY_FIELDS = ("id", "name", "description", "category", "tags")
+
+# Fields every experiment definition must have
+REQUIRED_FIELDS = ("id", "name", "description", "category", "config")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def encode_cursor(experiment_id: str) -> str:
+    """Encode the last returned experiment ID as an opaque page cursor"""
+    return base64.urlsafe_b64encode(experiment_id.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    """Decode a page cursor back into the experiment ID it points after"""
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e  # noqa: TRY003
+
+
+class CatalogEntry:
+    """Summary of an experiment definition whose full config is parsed on first access"""
+
+    def __init__(self, summary: dict[str, Any], config_blob: bytes):
+        self.id: str = summary["id"]
+        self.name: str = summary["name"]
+        self.description: str = summary["description"]
+        self.category: str = summary["category"]
+        self.tags: list[str] = summary.get("tags", [])
+        self._config_blob = config_blob
+        self._experiment: Optional[Experiment] = None
+
+    @property
+    def experiment(self) -> Experiment:
+        """Build the full Experiment model, caching it after the first call"""
+        if self._experiment is None:
+            config = pickle.loads(self._config_blob)  # noqa: S301 - blob produced by this process
+            self._experiment = Experiment(
+                id=self.id,
+                name=self.name,
+                description=self.description,
+                category=self.category,
+                tags=self.tags,
+                config=ExperimentConfig(**config),
+            )
+        return self._experiment
+
+    def project(self, fields: Optional[Iterable[str]] = None) -> dict[str, Any]:
+        """Return the requested fields, parsing the config only when it is asked for"""
+        if fields is None:
+            return self.experiment.model_dump(mode="json")
+        fields = list(fields)
+        if all(field in SUMMARY_FIELDS for field in fields):
+            return {field: getattr(self, field) for field in fields}
+        return self.experiment.model_dump(mode="json", include=set(fields))
+
+
+class CatalogIndex:
+    """Inverted indexes over catalog summaries for filtering, search and keyset pagination"""
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self.by_category: dict[str, set[str]] = defaultdict(set)
+        self.by_tag: dict[str, set[str]] = defaultdict(set)
+        self.by_token: dict[str, set[str]] = defaultdict(set)
+        ids = []
+        for entry in entries:
+            ids.append(entry.id)
+            self.by_category[entry.category.lower()].add(entry.id)
+            for tag in entry.tags:
+                self.by_tag[tag.lower()].add(entry.id)
+            for token in tokenize(" ".join([entry.id, entry.name, entry.description, entry.category, *entry.tags])):
+                self.by_token[token].add(entry.id)
+        self.ids = sorted(ids)
+        self.vocabulary = sorted(self.by_token)
+
+    def _prefix_matches(self, prefix: str) -> set[str]:
+        """Union of postings for every indexed token starting with the prefix"""
+        start = bisect_left(self.vocabulary, prefix)
+        matches: set[str] = set()
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self.by_token[token]
+        return matches
+
+    def search(
+        self, category: Optional[str] = None, tags: Optional[list[str]] = None, text: Optional[str] = None
+    ) -> list[str]:
+        """Return sorted IDs matching the category, all tags and every search term"""
+        postings: list[set[str]] = []
+        if category:
+            postings.append(self.by_category.get(category.lower(), set()))
+        postings.extend(self.by_tag.get(tag.lower(), set()) for tag in tags or [])
+        postings.extend(self._prefix_matches(token) for token in tokenize(text or ""))
+        if not postings:
+            return self.ids
+        return sorted(set.intersection(*sorted(postings, key=len)))
+
+
+def compile_definition(data: dict[str, Any]) -> dict[str, Any]:
+    """Split raw experiment data into a cheap summary and a serialized config
+
+    Raises:
+        ValueError: If the data is not a mapping with every required field, or is not a valid experiment
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a mapping, got {type(data).__name__}")  # noqa: TRY003, TRY004
+    missing = [field for field in REQUIRED_FIELDS if field not in data]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")  # noqa: TRY003
+    if not isinstance(data["config"], dict):
+        raise ValueError("The config field must be a mapping")  # noqa: TRY003, TRY004
+    try:
+        Experiment.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(f"Invalid experiment definition: {e}") from None  # noqa: TRY003
+    return {
+        "summary": {
+            "id": data["id"],
+            "name": data["name"],
+            "description": data["description"],
+            "category": data["category"],
+            "tags": data.get("tags", []),
+        },
+        "config": pickle.dumps(data["config"], protocol=pickle.HIGHEST_PROTOCOL),
+    }
+
+
+class ExperimentCatalog:
+    """Experiment definitions loaded from YAML files with a compiled on-disk cache"""
+
+    def __init__(self, directory: str, cache_path: str):
+        self.directory = directory
+        self.cache_path = cache_path
+        self._records: dict[str, dict[str, Any]] = {}
+        self._file_entries: dict[str, CatalogEntry] = {}
+        self._entries: dict[str, CatalogEntry] = {}
+        self._invalid: dict[str, str] = {}
+        self._index = CatalogIndex([])
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Check whether the experiments directory exists"""
+        return os.path.isdir(self.directory)
+
+    def load(self) -> None:
+        """Load the catalog, reusing compiled records for files that have not changed"""
+        self._records = self._read_cache()
+        self.refresh()
+
+    def add(self, data: dict[str, Any]) -> CatalogEntry:
+        """Register an experiment definition that does not come from a file"""
+        compiled = compile_definition(data)
+        entry = CatalogEntry(compiled["summary"], compiled["config"])
+        self._set_entries({**self._entries, entry.id: entry})
+        return entry
+
+    def _set_entries(self, entries: dict[str, CatalogEntry]) -> None:
+        """Swap in a new set of entries together with freshly built indexes"""
+        self._index = CatalogIndex(entries.values())
+        self._entries = entries
+
+    def get(self, experiment_id: str) -> Optional[CatalogEntry]:
+        """Get a catalog entry by experiment ID"""
+        return self._entries.get(experiment_id)
+
+    def entries(self) -> list[CatalogEntry]:
+        """Get all catalog entries in load order"""
+        return list(self._entries.values())
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        text: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list[CatalogEntry], Optional[str], int]:
+        """Filter entries through the indexes and return one page ordered by ID
+
+        Returns:
+            The page of entries, the cursor for the next page and the total number of matches
+        """
+        entries = self._entries
+        ids = self._index.search(category, tags, text)
+        start = bisect_right(ids, decode_cursor(cursor)) if cursor else 0
+        end = len(ids) if limit is None else start + limit
+        page = [entries[experiment_id] for experiment_id in ids[start:end] if experiment_id in entries]
+        next_cursor = encode_cursor(ids[end - 1]) if end < len(ids) else None
+        return page, next_cursor, len(ids)
+
+    def refresh(self) -> list[str]:
+        """Re-read only the files whose mtime, size or content changed
+
+        Files that cannot be read or do not hold a valid definition are skipped, and
+        logged once per content.
+
+        Returns:
+            IDs of experiments that were added, modified or removed
+        """
+        with self._lock:
+            records: dict[str, dict[str, Any]] = {}
+            file_entries: dict[str, CatalogEntry] = {}
+            invalid: dict[str, str] = {}
+            changed: list[str] = []
+            dirty = False
+
+            for dir_entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+                if not dir_entry.name.endswith(".yaml"):
+                    continue
+                previous = self._records.get(dir_entry.name)
+                record = self._load_file(dir_entry, previous, invalid)
+                if record is None:
+                    continue
+                records[dir_entry.name] = record
+                if record is not previous:
+                    dirty = True
+                    if previous is None or record["sha256"] != previous["sha256"]:
+                        changed.append(record["summary"]["id"])
+
+                entry = self._file_entries.get(dir_entry.name)
+                if entry is None or previous is None or records[dir_entry.name]["sha256"] != previous["sha256"]:
+                    entry = CatalogEntry(records[dir_entry.name]["summary"], records[dir_entry.name]["config"])
+                file_entries[dir_entry.name] = entry
+
+            for filename in self._records.keys() - records.keys():
+                changed.append(self._records[filename]["summary"]["id"])
+                dirty = True
+
+            self._records = records
+            self._file_entries = file_entries
+            self._invalid = invalid
+            if dirty or not self._entries:
+                self._set_entries({entry.id: entry for entry in file_entries.values()})
+            if dirty:
+                self._write_cache()
+            return changed
+
+    def _load_file(
+        self, dir_entry: os.DirEntry, previous: Optional[dict[str, Any]], invalid: dict[str, str]
+    ) -> Optional[dict[str, Any]]:
+        """Compile a definition file, reusing its previous record when the file is unchanged
+
+        Returns:
+            The file's record, or None when it cannot be read or does not hold a valid
+            definition, in which case the digest of its content is added to invalid
+        """
+        try:
+            stat = dir_entry.stat()
+            if previous and (previous["mtime_ns"], previous["size"]) == (stat.st_mtime_ns, stat.st_size):
+                return previous
+            with open(dir_entry.path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            logger.warning("Skipping unreadable experiment file %s: %s", dir_entry.name, e)
+            return None
+        digest = hashlib.sha256(raw).hexdigest()
+        if previous and previous["sha256"] == digest:
+            return {**previous, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        try:
+            record = compile_definition(yaml.load(raw, Loader=SafeLoader))  # noqa: S506
+        except (yaml.YAMLError, ValueError) as e:
+            if self._invalid.get(dir_entry.name) != digest:
+                logger.warning("Skipping invalid experiment file %s: %s", dir_entry.name, e)
+            invalid[dir_entry.name] = digest
+            return None
+        return {**record, "sha256": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    async def watch(self, interval: float) -> None:
+        """Poll the experiments directory and reload changed files until cancelled
+
+        A failed reload is logged and retried at the next poll rather than ending the watcher.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if not self.exists():
+                continue
+            try:
+                changed = await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Failed to reload experiment catalog")
+                continue
+            if changed:
+                logger.info("Reloaded experiments", extra={"experiment_ids": changed})
+
+    def _read_cache(self) -> dict[str, dict[str, Any]]:
+        """Read compiled records from the cache file, ignoring missing or stale caches"""
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = pickle.load(f)  # noqa: S301 - cache written by this process
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return {}
+        if cache.get("version") != CACHE_VERSION or cache.get("directory") != os.path.abspath(self.directory):
+            return {}
+        records: dict[str, dict[str, Any]] = cache["records"]
+        return records
+
+    def _write_cache(self) -> None:
+        """Atomically persist compiled records for the next process start"""
+        cache = {"version": CACHE_VERSION, "directory": os.path.abspath(self.directory), "records": self._records}
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Failed to write experiment catalog cache: %s", e)
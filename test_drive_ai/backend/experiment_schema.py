@@ -1,6 +1,6 @@
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Any, ClassVar, Optional
+from typing import Any, ClassVar, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -43,6 +43,8 @@ class ExperimentRunRequest(BaseModel):
     """Request model for running an experiment"""
 
     custom_parameters: Optional[dict[str, Any]] = None
+    store_outcomes: bool = False  # refused with 422 by the framework simulation engine
+    profile: Optional[Literal["timing", "cprofile"]] = None
 
 
 class ExperimentRun(BaseModel):
@@ -73,3 +75,53 @@ class ExperimentResult(BaseModel):
     visualizations: list[dict[str, Any]]
     recommendations: list[str]
     metadata: dict[str, Any] = {}
+
+
+class RunAggregates(BaseModel):
+    """Aggregates over every run matching a run listing query"""
+
+    total: int
+    counts_by_status: dict[str, int]
+    mean_duration_seconds: Optional[float] = None
+    queue_wait_seconds: dict[str, float]
+
+
+class RunPage(BaseModel):
+    """Model for a page of experiment runs"""
+
+    runs: list[ExperimentRun]
+    next_cursor: Optional[str] = None
+    aggregates: RunAggregates
+
+
+class RunComparisonRequest(BaseModel):
+    """Request model for comparing several completed runs"""
+
+    run_ids: list[str] = Field(min_length=2)
+    baseline_run_id: Optional[str] = None
+
+
+class RunComparison(BaseModel):
+    """Metric deltas, significance tests and aligned series for several runs
+
+    Matrices have one row per run, in run_ids order, and one column per metric.
+    """
+
+    baseline_run_id: str
+    run_ids: list[str]
+    metrics: list[str]
+    values: list[list[Optional[float]]]
+    deltas: list[list[Optional[float]]]
+    relative_deltas: list[list[Optional[float]]]
+    significance: dict[str, Any]
+    visualizations: list[dict[str, Any]]
+
+
+class OutcomeQueryResult(BaseModel):
+    """Model for a page of per-customer outcome rows"""
+
+    run_id: str
+    columns: list[str]
+    offset: int
+    limit: int
+    rows: list[dict[str, Any]]
@@ -1,44 +1,72 @@
-import os
+import logging
 import uuid
 from datetime import UTC, datetime
 from typing import Any, Optional
 
-import yaml
-
+from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_catalog import ExperimentCatalog
 from test_drive_ai.backend.experiment_schema import (
     Experiment,
-    ExperimentConfig,
     ExperimentResult,
     ExperimentRun,
     ExperimentStatus,
 )
+from test_drive_ai.backend.metrics import metrics
+from test_drive_ai.backend.responses import CachedBody, dumps
+from test_drive_ai.backend.run_comparison import compare_results
+from test_drive_ai.backend.run_events import RunEventBroker
+from test_drive_ai.backend.run_index import RunIndex
+
+logger = logging.getLogger(__name__)
+
+# Caches of pre-serialized response bodies
+BODY_CACHES = ("experiment", "result")
+
+BODY_CACHE_LOOKUPS = metrics.counter(
+    "response_cache_lookups_total", "Pre-serialized response body lookups by cache and result", ["cache", "result"]
+)
+
+
+def _body_cache_hit_ratios() -> dict[tuple[str], float]:
+    """Fraction of body cache lookups served without serializing"""
+    ratios = {}
+    for cache in BODY_CACHES:
+        hits = BODY_CACHE_LOOKUPS.value(cache=cache, result="hit")
+        lookups = hits + BODY_CACHE_LOOKUPS.value(cache=cache, result="miss")
+        ratios[(cache,)] = hits / lookups if lookups else 0.0
+    return ratios
+
+
+metrics.gauge(
+    "response_cache_hit_ratio", "Hit ratio of pre-serialized response bodies", ["cache"], _body_cache_hit_ratios
+)
 
 
 class ExperimentService:
     """Service to manage experiments"""
 
-    def __init__(self):
-        self.experiments: dict[str, Experiment] = {}
+    def __init__(self) -> None:
+        self.catalog = ExperimentCatalog(settings.EXPERIMENTS_DIR, settings.CATALOG_CACHE_PATH)
         self.active_runs: dict[str, ExperimentRun] = {}
+        self.run_index = RunIndex()
+        self.events = RunEventBroker()
         self.completed_results: dict[str, ExperimentResult] = {}
+        self._experiment_bodies: dict[str, tuple[Any, CachedBody]] = {}
+        self._result_bodies: dict[str, CachedBody] = {}
         self.load_experiments()
 
     def load_experiments(self) -> None:
         """Load experiments from YAML files"""
-        experiments_dir = "data/experiments"
-
         # Mock experiments if directory doesn't exist
-        if not os.path.exists(experiments_dir):
+        if not self.catalog.exists():
             self._create_mock_experiments()
             return
 
-        for filename in os.listdir(experiments_dir):
-            if filename.endswith(".yaml"):
-                filepath = os.path.join(experiments_dir, filename)
-                with open(filepath) as f:
-                    data = yaml.safe_load(f)
-                    experiment = self._parse_experiment(data)
-                    self.experiments[experiment.id] = experiment
+        self.catalog.load()
+
+    async def watch_experiments(self) -> None:
+        """Reload changed experiment files in the background"""
+        await self.catalog.watch(settings.CATALOG_RELOAD_INTERVAL_SECONDS)
 
     def _create_mock_experiments(self) -> None:
         """Create mock experiments for demo"""
@@ -100,28 +128,47 @@ class ExperimentService:
         ]
 
         for exp_data in mock_experiments:
-            experiment = self._parse_experiment(exp_data)
-            self.experiments[experiment.id] = experiment
-
-    def _parse_experiment(self, data: dict[str, Any]) -> Experiment:
-        """Parse experiment data into Experiment model"""
-        config = ExperimentConfig(**data["config"])
-        return Experiment(
-            id=data["id"],
-            name=data["name"],
-            description=data["description"],
-            category=data["category"],
-            tags=data.get("tags", []),
-            config=config,
-        )
+            self.catalog.add(exp_data)
 
     def get_all_experiments(self) -> list[Experiment]:
         """Get all available experiments"""
-        return list(self.experiments.values())
+        return [entry.experiment for entry in self.catalog.entries()]
+
+    def list_experiments(
+        self,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        text: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list[dict[str, Any]], Optional[str], int]:
+        """Get a filtered page of experiments projected onto the requested fields"""
+        unknown = [field for field in fields or [] if field not in Experiment.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown experiment fields: {', '.join(unknown)}")  # noqa: TRY003
+
+        entries, next_cursor, total = self.catalog.query(category, tags, text, cursor, limit)
+        return [entry.project(fields) for entry in entries], next_cursor, total
 
     def get_experiment(self, experiment_id: str) -> Optional[Experiment]:
         """Get a specific experiment by ID"""
-        return self.experiments.get(experiment_id)
+        entry = self.catalog.get(experiment_id)
+        return entry.experiment if entry else None
+
+    def get_experiment_body(self, experiment_id: str) -> Optional[CachedBody]:
+        """Get an experiment serialized once per catalog entry"""
+        entry = self.catalog.get(experiment_id)
+        if entry is None:
+            return None
+        cached = self._experiment_bodies.get(experiment_id)
+        if cached is None or cached[0] is not entry:
+            BODY_CACHE_LOOKUPS.inc(cache="experiment", result="miss")
+            cached = (entry, CachedBody(dumps(entry.experiment.model_dump())))
+            self._experiment_bodies[experiment_id] = cached
+        else:
+            BODY_CACHE_LOOKUPS.inc(cache="experiment", result="hit")
+        return cached[1]
 
     def create_experiment_run(
         self, experiment_id: str, custom_parameters: Optional[dict[str, Any]] = None
@@ -135,11 +182,23 @@ class ExperimentService:
             custom_parameters=custom_parameters,
         )
         self.active_runs[run.run_id] = run
-        print(f"Created run {run.run_id} for experiment {experiment_id}")
-        if custom_parameters:
-            print(f"Custom parameters: {custom_parameters}")
+        self.run_index.add(run)
+        self.events.publish(run)
+        logger.info(
+            "Created run",
+            extra={"run_id": run.run_id, "experiment_id": experiment_id, "custom_parameters": custom_parameters},
+        )
         return run
 
+    def restore_run(self, run: ExperimentRun) -> None:
+        """Register a run checkpointed by a previous process, queued to resume"""
+        run.status = ExperimentStatus.PENDING
+        run.current_step = "Queued to resume after restart"
+        self.active_runs[run.run_id] = run
+        self.run_index.add(run)
+        self.events.publish(run)
+        logger.info("Restored run", extra={"run_id": run.run_id, "experiment_id": run.experiment_id})
+
     def update_run_status(
         self, run_id: str, status: ExperimentStatus, progress: float, current_step: str
     ) -> Optional[ExperimentRun]:
@@ -147,16 +206,42 @@ class ExperimentService:
         if run_id not in self.active_runs:
             return None
 
+        now = datetime.now(UTC)
+        previous = self.active_runs[run_id].status
+        self.run_index.update_status(run_id, previous, status, now)
         self.active_runs[run_id].status = status
         self.active_runs[run_id].progress = progress
         self.active_runs[run_id].current_step = current_step
 
         if status == ExperimentStatus.COMPLETED:
-            self.active_runs[run_id].completed_at = datetime.now(UTC)
+            self.active_runs[run_id].completed_at = now
 
-        print("exp_service: ", self.active_runs[run_id])
+        self.events.publish(self.active_runs[run_id])
+        # Status transitions are always logged; progress within a status is sampled per run
+        logger.info(
+            "Run status changed" if status != previous else "Run progress",
+            extra={
+                "run_id": run_id,
+                "status": status,
+                "progress": progress,
+                "step": current_step,
+                "sampled": status == previous,
+            },
+        )
         return self.active_runs[run_id]
 
+    def list_runs(
+        self,
+        experiment_id: Optional[str] = None,
+        statuses: Optional[list[ExperimentStatus]] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """List runs newest first with aggregates over all matching runs"""
+        return self.run_index.query(experiment_id, statuses, started_after, started_before, cursor, limit)
+
     def get_run_status(self, run_id: str) -> Optional[ExperimentRun]:
         """Get the current status of an experiment run"""
         return self.active_runs.get(run_id)
@@ -168,10 +253,35 @@ class ExperimentService:
         # Mark run as completed
         if results.run_id in self.active_runs:
             run = self.active_runs[results.run_id]
+            now = datetime.now(UTC)
+            self.run_index.update_status(run.run_id, run.status, ExperimentStatus.COMPLETED, now)
             run.status = ExperimentStatus.COMPLETED
             run.progress = 100
-            run.completed_at = datetime.now(UTC)
+            run.completed_at = now
+            self.events.publish(run)
 
     def get_results(self, run_id: str) -> Optional[ExperimentResult]:
         """Get results for a completed experiment run"""
         return self.completed_results.get(run_id)
+
+    def get_results_body(self, run_id: str) -> Optional[CachedBody]:
+        """Get results serialized once, since completed results never change"""
+        if run_id not in self._result_bodies:
+            results = self.completed_results.get(run_id)
+            if results is None:
+                return None
+            BODY_CACHE_LOOKUPS.inc(cache="result", result="miss")
+            self._result_bodies[run_id] = CachedBody(dumps(results.model_dump()))
+        else:
+            BODY_CACHE_LOOKUPS.inc(cache="result", result="hit")
+        return self._result_bodies[run_id]
+
+    def compare_runs(self, run_ids: list[str], baseline_run_id: Optional[str] = None) -> dict[str, Any]:
+        """Compare the results of several completed runs against a baseline run"""
+        missing = [run_id for run_id in run_ids if run_id not in self.completed_results]
+        if missing:
+            raise KeyError(", ".join(missing))
+        if baseline_run_id and baseline_run_id not in run_ids:
+            raise ValueError("Baseline run must be one of the compared runs")  # noqa: TRY003
+
+        return compare_results([self.completed_results[run_id] for run_id in run_ids], baseline_run_id)
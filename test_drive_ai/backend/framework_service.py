@@ -0,0 +1,290 @@
+import asyncio
+import functools
+import statistics
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Callable, Optional, cast
+
+# Imported for its side effect of exporting the framework's LLM calls as metrics
+from test_drive_ai.backend import llm_metrics  # noqa: F401
+from test_drive_ai.backend.experiment_schema import ExperimentResult, ExperimentStatus
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.backend.profiling import RunProfiler
+from test_drive_ai.backend.simulation_service import (
+    INTERVENTION_KEYS,
+    SEGMENT_KEYS,
+    SimulationService,
+    _dimension,
+    _int_parameter,
+)
+from test_drive_ai.shared.call_policy import CallPolicy
+from test_drive_ai.shared.lazy_imports import lazy_import
+from test_drive_ai.shared.task_outputs import AnalysisStats, InterventionPlan, InterventionRanking, SimulationReport
+
+# The framework module loads .env and the crewai client, so it is imported by the first run
+if TYPE_CHECKING:
+    from test_drive_ai import foo
+else:
+    foo = lazy_import("test_drive_ai.foo")
+
+# Progress percentage at which each framework stage starts
+STAGE_PROGRESS = {
+    "Analyzing experiment configuration": 5,
+    "Generating interventions": 15,
+    "Simulating interventions": 25,
+    "Ranking interventions": 85,
+    "Finalizing results": 95,
+}
+
+# Interventions generated when the experiment does not configure any
+GENERATED_INTERVENTIONS = 3
+
+# Admission work units per expected crew kickoff, on the scale of the numeric engine's customer outcomes
+WORK_UNITS_PER_KICKOFF = 5_000
+
+
+def _configured_interventions(parameters: dict[str, Any]) -> list[dict[str, Any]]:
+    """Interventions configured by the experiment, as dicts with at least a name"""
+    for key in INTERVENTION_KEYS:
+        values = parameters.get(key)
+        if isinstance(values, list) and values:
+            return [value if isinstance(value, dict) else {"name": str(value)} for value in values]
+    return []
+
+
+def _report(record: dict[str, Any]) -> Optional[SimulationReport]:
+    """Typed report of a simulation record, from a crew's validated output or numeric statistics"""
+    result = record.get("result")
+    if isinstance(result, dict):
+        return SimulationReport(analysis=AnalysisStats.model_validate(result))
+    return getattr(result, "pydantic", None)
+
+
+def _mean(values: Sequence[Optional[float]]) -> Optional[float]:
+    present = [value for value in values if value is not None]
+    return statistics.fmean(present) if present else None
+
+
+def build_result(
+    experiment_id: str,
+    run_id: str,
+    records: list[dict[str, Any]],
+    ranking: Optional[InterventionRanking],
+    ranking_text: str = "",
+) -> ExperimentResult:
+    """Build an experiment result from typed simulation reports and the intervention ranking
+
+    Conversion rate metrics are percentages averaged over segments. Pairs whose simulation
+    failed or whose output did not match its schema are listed in the metadata.
+    """
+    reports = {(record["intervention"], record["segment"]): _report(record) for record in records}
+    interventions = list(dict.fromkeys(record["intervention"] for record in records))
+    segments = list(dict.fromkeys(record["segment"] for record in records))
+
+    def rates(intervention: str, field: str) -> list[Optional[float]]:
+        values = []
+        for segment in segments:
+            report = reports.get((intervention, segment))
+            value = getattr(report.analysis, field) if report else None
+            values.append(round(value * 100, 3) if value is not None else None)
+        return values
+
+    control = [_mean(column) for column in zip(*(rates(name, "control_conversion_rate") for name in interventions))]
+    treatment = {name: rates(name, "treatment_conversion_rate") for name in interventions}
+
+    metrics = {"control_conversion_rate": _mean(control), "pairs_simulated": len(records)}
+    for name in interventions:
+        metrics[f"{name}_conversion_rate"] = _mean(treatment[name])
+        metrics[f"{name}_lift"] = _mean([
+            report.analysis.lift for (intervention, _), report in reports.items() if intervention == name and report
+        ])
+    metrics["failed_pairs"] = sum(report is None for report in reports.values())
+
+    return ExperimentResult(
+        run_id=run_id,
+        experiment_id=experiment_id,
+        summary=ranking.summary if ranking else ranking_text,
+        metrics={name: value for name, value in metrics.items() if value is not None},
+        recommendations=ranking.recommendations if ranking else [],
+        visualizations=[
+            {
+                "type": "bar_chart",
+                "title": "Intervention Effectiveness by Customer Segment",
+                "data": {"categories": segments, "control": control, **treatment},
+            }
+        ],
+        metadata={
+            "engine": "framework",
+            "simulation_timestamp": datetime.now(UTC).isoformat(),
+            "ranking": [entry.model_dump() for entry in ranking.ranking] if ranking else None,
+            "implementation_sequence": ranking.implementation_sequence if ranking else [],
+            "pairs": [
+                {
+                    "intervention": intervention,
+                    "segment": segment,
+                    **({"report": report.model_dump()} if report else {"error": "No valid simulation output"}),
+                }
+                for (intervention, segment), report in reports.items()
+            ],
+        },
+    )
+
+
+class FrameworkSimulationService(SimulationService):
+    """Service running experiments through the LLM intervention framework
+
+    Each run parses the configuration, generates interventions unless the experiment
+    configures them, simulates every intervention on every segment and ranks them,
+    reporting every stage and every finished simulation through the status callback.
+    An interrupted run restarts from the beginning, ignoring resume_from_phase; the
+    response cache makes the stages it had completed cheap to repeat. Profiling records
+    each stage, and per-customer outcomes are not simulated, so store_outcomes is refused.
+    """
+
+    def __init__(
+        self,
+        llm_model: str,
+        mode: str = "hybrid",
+        cache_path: Optional[str] = None,
+        max_concurrency: int = 4,
+        outcome_store: Optional[OutcomeStore] = None,
+        profiles_dir: Optional[str] = None,
+        batch: str = "none",
+        call_policy: Optional[CallPolicy] = None,
+    ):
+        super().__init__(outcome_store, profiles_dir)
+        self.call_policy = call_policy
+        self.llm_model = llm_model
+        self.mode = mode
+        self.batch = batch
+        self.cache_path = cache_path
+        self.max_concurrency = max_concurrency
+
+    def validate_config(self, config: dict[str, Any]) -> None:
+        """Check the run parameters and options before the run is admitted
+
+        Raises:
+            ValueError: If a parameter is invalid or per-customer outcomes are requested
+        """
+        super().validate_config(config)
+        if config.get("store_outcomes"):
+            raise ValueError("store_outcomes is not supported by the framework simulation engine")  # noqa: TRY003
+
+    def estimate_work(self, config: dict[str, Any]) -> int:
+        """Estimate the work of a run from the crew kickoffs it is expected to make"""
+        parameters = config.get("parameters", {})
+        segments = len(_dimension(parameters, SEGMENT_KEYS, ["all_customers"]))
+        interventions = len(_configured_interventions(parameters))
+        # Configuration parsing and ranking, plus intervention generation when none are configured
+        kickoffs = 2 if interventions else 3
+        interventions = interventions or GENERATED_INTERVENTIONS
+        if self.mode == "hybrid" or self.batch == "segments":
+            kickoffs += interventions
+        elif self.batch == "interventions":
+            kickoffs += segments
+        else:
+            kickoffs += interventions * segments
+        return kickoffs * WORK_UNITS_PER_KICKOFF
+
+    @staticmethod
+    async def _generate_interventions(
+        framework: "foo.InterventionFramework", context: str, profiler: RunProfiler
+    ) -> list[dict[str, Any]]:
+        """Generate interventions for an experiment that does not configure any"""
+        plan = await asyncio.to_thread(
+            profiler.run_engine, framework.generate_interventions, context, GENERATED_INTERVENTIONS
+        )
+        if plan.pydantic is None:
+            raise ValueError("Generated interventions did not match the InterventionPlan schema")  # noqa: TRY003
+        return [intervention.model_dump() for intervention in cast(InterventionPlan, plan.pydantic).interventions]
+
+    async def run_experiment(
+        self,
+        experiment_id: str,
+        run_id: str,
+        config: dict[str, Any],
+        status_callback: Callable[[str, ExperimentStatus, float, str], None],
+    ) -> ExperimentResult:
+        """
+        Run an experiment through the intervention framework
+
+        Args:
+            experiment_id: ID of the experiment
+            config: Experiment configuration
+            status_callback: Callback to update status
+
+        Returns:
+            ExperimentResult built from the typed stage outputs, with the run's LLM usage
+        """
+        parameters = config.get("parameters", {})
+        segments = _dimension(parameters, SEGMENT_KEYS, ["all_customers"])
+        profiler = RunProfiler(config.get("profile"))
+
+        def stage(name: str) -> AbstractContextManager[dict[str, Any]]:
+            status_callback(run_id, ExperimentStatus.RUNNING, STAGE_PROGRESS[name], name)
+            return profiler.phase(name)
+
+        try:
+            seed = _int_parameter(config.get("custom_context", {}), "random_seed", 42, minimum=0)
+            sample_size = _int_parameter(parameters, "sample_size", 0) if "sample_size" in parameters else None
+            framework = await asyncio.to_thread(
+                foo.get_framework, self.llm_model, cache_path=self.cache_path, call_policy=self.call_policy
+            )
+            with framework.track_usage() as usage:
+                with stage("Analyzing experiment configuration"):
+                    context = await asyncio.to_thread(profiler.run_engine, framework.parse_experiment_config, config)
+
+                interventions = _configured_interventions(parameters)
+                if not interventions:
+                    with stage("Generating interventions"):
+                        interventions = await self._generate_interventions(framework, context.raw, profiler)
+
+                start, end = STAGE_PROGRESS["Simulating interventions"], STAGE_PROGRESS["Ranking interventions"]
+                total = len(interventions) * len(segments)
+                completed = 0
+
+                def on_complete(records: list[dict[str, Any]]) -> None:
+                    nonlocal completed
+                    completed += len(records)
+                    pairs = ", ".join(f"{record['intervention']} on {record['segment']}" for record in records)
+                    status_callback(
+                        run_id,
+                        ExperimentStatus.RUNNING,
+                        start + (end - start) * completed / total,
+                        f"Simulated {completed}/{total}: {pairs}",
+                    )
+
+                with stage("Simulating interventions"):
+                    records = await framework.asimulate_interventions(
+                        interventions,
+                        segments,
+                        sample_size,
+                        self.max_concurrency,
+                        mode=self.mode,
+                        seed=seed,
+                        on_complete=on_complete,
+                        batch=self.batch,
+                    )
+
+                with stage("Ranking interventions"):
+                    ranking = await asyncio.to_thread(
+                        profiler.run_engine,
+                        functools.partial(framework.rank_interventions, records, max_concurrency=self.max_concurrency),
+                    )
+
+            with stage("Finalizing results"):
+                typed_ranking = cast(Optional[InterventionRanking], ranking.pydantic)
+                results = build_result(experiment_id, run_id, records, typed_ranking, ranking.raw)
+                results.metadata["simulation_mode"] = self.mode
+                results.metadata["simulation_batch"] = self.batch
+                results.metadata["llm_usage"] = usage.summary()
+            await self._attach_profile(profiler, run_id, results)
+
+            status_callback(run_id, ExperimentStatus.COMPLETED, 100, "Experiment completed successfully")
+
+            return results  # noqa: TRY300
+
+        except Exception as e:
+            status_callback(run_id, ExperimentStatus.FAILED, 0, f"Error: {e!s}")
+            raise
@@ -0,0 +1,55 @@
+from test_drive_ai.backend.metrics import metrics
+from test_drive_ai.shared import call_policy, llm_usage
+
+LLM_TOKENS = metrics.counter("llm_tokens_total", "LLM tokens by agent role and token type", ["agent", "type"])
+LLM_CALLS = metrics.counter("llm_calls_total", "LLM calls by agent role and outcome", ["agent", "outcome"])
+LLM_CALL_SECONDS = metrics.histogram("llm_call_duration_seconds", "LLM call latency by agent role", ["agent"])
+LLM_COST = metrics.counter("llm_estimated_cost_usd_total", "Estimated LLM cost in USD by agent role", ["agent"])
+STAGE_SECONDS = metrics.histogram(
+    "llm_stage_duration_seconds", "Crew kickoff latency by pipeline stage and cache use", ["stage", "cached"]
+)
+LLM_RETRIES = metrics.counter(
+    "llm_call_retries_total", "LLM calls retried after a transient error, by agent role and error", ["agent", "error"]
+)
+LLM_HEDGES = metrics.counter(
+    "llm_hedged_calls_total", "Duplicate LLM calls sent after the hedging delay, by agent role", ["agent"]
+)
+LLM_HEDGE_WINS = metrics.counter(
+    "llm_hedged_call_wins_total", "Duplicate LLM calls that answered before the original, by agent role", ["agent"]
+)
+
+
+class UsageMetrics(llm_usage.UsageObserver):
+    """Export the framework's crew kickoffs and LLM calls as metrics"""
+
+    def kickoff(self, stage: str, seconds: float, cached: bool) -> None:
+        STAGE_SECONDS.observe(seconds, stage=stage, cached=str(cached).lower())
+
+    def call(
+        self, model: str, agent: str, seconds: float, prompt_tokens: int, completion_tokens: int, failed: bool
+    ) -> None:
+        LLM_CALLS.inc(agent=agent, outcome="failure" if failed else "success")
+        LLM_CALL_SECONDS.observe(seconds, agent=agent)
+        LLM_TOKENS.inc(prompt_tokens, agent=agent, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, agent=agent, type="completion")
+        cost = llm_usage.estimate_cost(model, prompt_tokens, completion_tokens)
+        if cost is not None:
+            LLM_COST.inc(cost, agent=agent)
+
+
+class PolicyMetrics(call_policy.PolicyObserver):
+    """Export the retries and hedges of the framework's call policies as metrics"""
+
+    def retry(self, agent: str, error: str) -> None:
+        LLM_RETRIES.inc(agent=agent, error=error)
+
+    def hedge(self, agent: str) -> None:
+        LLM_HEDGES.inc(agent=agent)
+
+    def hedge_win(self, agent: str) -> None:
+        LLM_HEDGE_WINS.inc(agent=agent)
+
+
+# Registered on import, like the metrics themselves
+llm_usage.add_observer(UsageMetrics())
+call_policy.add_observer(PolicyMetrics())
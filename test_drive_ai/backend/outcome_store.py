@@ -0,0 +1,166 @@
+import functools
+import os
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Optional
+
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+else:
+    pa = lazy_import("pyarrow")
+
+# Per-customer outcome columns written for every stored run, with their Arrow type names
+OUTCOME_COLUMNS = {
+    "customer_id": "int64",
+    "segment": "string",
+    "intervention": "string",
+    "converted": "bool_",
+    "days_to_convert": "float64",
+    "engagement_score": "float64",
+    "cost": "float64",
+}
+
+
+@functools.cache
+def outcome_schema() -> "pa.Schema":
+    """Arrow schema of the outcome columns, built on first use so pyarrow loads lazily"""
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in OUTCOME_COLUMNS.items()])
+
+
+class OutcomeWriter:
+    """Incremental writer for a single run's per-customer outcomes"""
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.rows_written = 0
+        self.row_groups_written = 0
+        self._tmp_path = f"{path}.tmp"
+        self._writer = pq.ParquetWriter(self._tmp_path, outcome_schema(), compression="zstd", write_statistics=True)
+
+    def write_batch(self, columns: dict[str, Any]) -> None:
+        """Append one batch of outcome rows as its own row group"""
+        batch = pa.RecordBatch.from_pydict(columns, schema=outcome_schema())
+        self._writer.write_batch(batch, row_group_size=batch.num_rows)
+        self.rows_written += batch.num_rows
+        self.row_groups_written += 1
+
+    def close(self) -> None:
+        """Finalize the file and make it visible to readers"""
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard a partially written file"""
+        self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class OutcomeStore:
+    """Columnar storage of per-customer simulated outcomes, one Parquet file per run"""
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+
+    def _path(self, run_id: str) -> str:
+        return os.path.join(self.base_dir, f"{run_id}.parquet")
+
+    def open_writer(self, run_id: str) -> OutcomeWriter:
+        """Start writing outcomes for a run"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        return OutcomeWriter(self._path(run_id))
+
+    def has_outcomes(self, run_id: str) -> bool:
+        """Check whether a finished outcome file exists for a run"""
+        return os.path.exists(self._path(run_id))
+
+    def _open(self, run_id: str) -> "pq.ParquetFile":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(self._path(run_id), memory_map=True)
+
+    def describe(self, run_id: str) -> dict[str, Any]:
+        """Summarize the stored outcome file from its footer only"""
+        metadata = self._open(run_id).metadata
+        return {
+            "rows": metadata.num_rows,
+            "row_groups": metadata.num_row_groups,
+            "columns": list(OUTCOME_COLUMNS),
+        }
+
+    @staticmethod
+    def _row_group_matches(row_group: "pq.RowGroupMetaData", filters: dict[str, set[str]]) -> bool:
+        """Use min/max statistics to decide whether a row group can contain matching rows"""
+        for i in range(row_group.num_columns):
+            column = row_group.column(i)
+            wanted = filters.get(column.path_in_schema)
+            if not wanted:
+                continue
+            stats = column.statistics
+            if stats is None or not stats.has_min_max or stats.min is None or stats.max is None:
+                continue
+            if not any(stats.min <= value <= stats.max for value in wanted):
+                return False
+        return True
+
+    def iter_batches(
+        self,
+        run_id: str,
+        columns: Optional[list[str]] = None,
+        filters: Optional[dict[str, set[str]]] = None,
+    ) -> Iterator["pa.Table"]:
+        """Yield matching rows one row group at a time, reading only the requested columns"""
+        import pyarrow.compute as pc
+
+        columns = columns or list(OUTCOME_COLUMNS)
+        unknown = [name for name in [*columns, *(filters or {})] if name not in OUTCOME_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown outcome columns: {', '.join(unknown)}")  # noqa: TRY003
+
+        parquet_file = self._open(run_id)
+        filters = {key: values for key, values in (filters or {}).items() if values}
+        read_columns = list(dict.fromkeys([*columns, *filters]))
+
+        for index in range(parquet_file.metadata.num_row_groups):
+            if not self._row_group_matches(parquet_file.metadata.row_group(index), filters):
+                continue
+            table = parquet_file.read_row_group(index, columns=read_columns)
+            if filters:
+                conditions = [
+                    pc.is_in(table[key], value_set=pa.array(sorted(values))) for key, values in filters.items()
+                ]
+                table = table.filter(functools.reduce(pc.and_, conditions))
+            if table.num_rows:
+                yield table.select(columns)
+
+    def query(
+        self,
+        run_id: str,
+        columns: Optional[list[str]] = None,
+        filters: Optional[dict[str, set[str]]] = None,
+        limit: int = 1000,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """Return a page of outcome rows matching the filters"""
+        rows: list[dict[str, Any]] = []
+        matched = 0
+        for table in self.iter_batches(run_id, columns, filters):
+            if len(rows) >= limit:
+                break
+            start = max(offset - matched, 0)
+            matched += table.num_rows
+            if start >= table.num_rows:
+                continue
+            rows.extend(table.slice(start, limit - len(rows)).to_pylist())
+
+        return {
+            "run_id": run_id,
+            "columns": columns or list(OUTCOME_COLUMNS),
+            "offset": offset,
+            "limit": limit,
+            "rows": rows,
+        }
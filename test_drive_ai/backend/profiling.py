@@ -0,0 +1,152 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, TypeVar, cast
+
+# Profiling modes accepted when starting a run
+PROFILE_MODES = ("timing", "cprofile")
+
+# Number of functions listed in a profile summary
+TOP_FUNCTIONS = 15
+
+T = TypeVar("T")
+
+# Rows of a pstats table: (file, line, function) -> (primitive calls, calls, own time, cumulative time, callers)
+StatsTable = dict[tuple[str, int, str], tuple[int, int, float, float, dict]]
+
+# Only one cProfile profiler can be active per process on recent Python versions
+_cprofile_lock = threading.Lock()
+
+# Runs currently tracing memory; tracemalloc is stopped when the last one finishes
+_memory_tracers = 0
+
+
+def _stats_table(profile: cProfile.Profile) -> StatsTable:
+    """Read a profile's per-function statistics
+
+    pstats exposes them only through the undocumented Stats.stats attribute, whose layout
+    has been stable since Python 2, so it is read once here with its type spelled out.
+    """
+    return cast(StatsTable, vars(pstats.Stats(profile))["stats"])
+
+
+def _start_memory_tracing() -> None:
+    global _memory_tracers
+    if _memory_tracers == 0 and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _memory_tracers += 1
+
+
+def _stop_memory_tracing() -> None:
+    global _memory_tracers
+    _memory_tracers -= 1
+    if _memory_tracers == 0 and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class RunProfiler:
+    """Per-phase wall time, CPU time and peak memory of a run, with an optional cProfile of engine work
+
+    Wall time is always recorded. The other measurements are taken only when a profiling
+    mode is set. CPU time is the thread CPU time of engine work offloaded through
+    run_engine, which excludes unrelated requests served by the event loop meanwhile.
+    Memory peaks are those of Python allocations in the whole process, so they are exact
+    only when no other run executes at the same time.
+    """
+
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode
+        self.phases: list[dict[str, Any]] = []
+        self._current: Optional[dict[str, Any]] = None
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._profiled_calls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[dict[str, Any]]:
+        """Measure one simulation phase"""
+        timing: dict[str, Any] = {"phase": name, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+        self._current = timing
+        if self.enabled:
+            _start_memory_tracing()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing["wall_seconds"] = time.perf_counter() - start
+            if self.enabled:
+                timing["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+                _stop_memory_tracing()
+            self._current = None
+            self.phases.append(timing)
+
+    def run_engine(self, func: Callable[..., T], *args: Any) -> T:
+        """Run engine work, typically in a worker thread, charging its CPU time to the current phase"""
+        timing = self._current
+        profile = self._profile if self._profile is not None and _cprofile_lock.acquire(blocking=False) else None
+        start = time.thread_time()
+        try:
+            if profile is not None:
+                self._profiled_calls += 1
+                return profile.runcall(func, *args)
+            return func(*args)
+        finally:
+            if profile is not None:
+                _cprofile_lock.release()
+            if timing is not None:
+                timing["cpu_seconds"] += time.thread_time() - start
+
+    @property
+    def has_profile(self) -> bool:
+        return self._profiled_calls > 0
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> list[dict[str, Any]]:
+        """List the functions with the highest cumulative time in the engine profile"""
+        if self._profile is None or not self.has_profile:
+            return []
+        stats = _stats_table(self._profile)
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_seconds": round(total, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for (filename, line, name), (_, calls, total, cumulative, _) in ranked
+        ]
+
+    def dump_profile(self, path: str) -> None:
+        """Write the raw engine profile in the pstats format
+
+        Raises:
+            ValueError: If the run was not profiled with cProfile
+        """
+        if self._profile is None:
+            raise ValueError("The run was not profiled with cProfile")  # noqa: TRY003
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._profile.dump_stats(path)
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the run's phases for the result metadata"""
+        return {
+            "mode": self.mode,
+            "phases": [
+                {key: round(value, 6) if isinstance(value, float) else value for key, value in timing.items()}
+                for timing in self.phases
+            ],
+            "total_wall_seconds": round(sum(timing["wall_seconds"] for timing in self.phases), 6),
+            "total_cpu_seconds": round(sum(timing["cpu_seconds"] for timing in self.phases), 6),
+            "peak_memory_bytes": max((timing.get("peak_memory_bytes", 0) for timing in self.phases), default=0),
+            "top_functions": self.top_functions(),
+            "profile_available": self.has_profile,
+        }
@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from test_drive_ai.backend.config import settings
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:  # brotli is optional; gzip is always available
+    BROTLI_AVAILABLE = False
+
+# Cache-Control for bodies that never change once produced, such as finished results
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Cache-Control for bodies that may change and must be revalidated with their ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with orjson"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class CachedBody:
+    """Pre-serialized JSON body with lazily built compressed variants
+
+    Each representation has its own strong ETag: the body's hash, suffixed with the
+    content encoding for compressed variants since their bytes differ.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()
+        self._encoded: dict[str, bytes] = {}
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """Strong ETag of the representation served with the given content encoding"""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Check an If-None-Match header against the ETags of every representation of the body"""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            opaque = tag.strip().removeprefix("W/").strip('"')
+            if opaque.partition("-")[0] == self.digest:
+                return True
+        return False
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body compressed with the given content encoding, compressing only once"""
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = brotli.compress(self.body)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, mtime=0)
+        return self._encoded[encoding]
+
+
+def negotiate_encoding(accept_encoding: str, size: int) -> Optional[str]:
+    """Pick the preferred supported content encoding, or None when compression is not worth it"""
+    if size < settings.COMPRESSION_MIN_BYTES:
+        return None
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    supported = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    candidates = [name for name in supported if accepted.get(name, accepted.get("*", 0.0)) > 0]
+    return max(candidates, key=lambda name: accepted.get(name, accepted.get("*", 0.0)), default=None)
+
+
+def cached_response(request: Request, cached: CachedBody, cache_control: str) -> Response:
+    """Serve a cached body, answering conditional requests with 304 and compressing when accepted
+
+    A tag of any representation of the body satisfies If-None-Match, and the 304 carries
+    the ETag of the representation the request would have received.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(cached.body))
+    headers = {"ETag": cached.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if cached.matches(request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=cached.encoded(encoding), media_type="application/json", headers=headers)
@@ -0,0 +1,114 @@
+import io
+import json
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional
+
+from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_schema import ExperimentResult
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from _typeshed import ReadableBuffer
+else:
+    pa = lazy_import("pyarrow")
+
+# Media type and file extension of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back in chunks while tracking the absolute offset"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: "ReadableBuffer") -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _metrics_table(result: ExperimentResult) -> "pa.Table":
+    """Tabulate result metrics as one row per metric"""
+    return pa.table({"metric": list(result.metrics), "value": [float(v) for v in result.metrics.values()]})
+
+
+def _tables(result: ExperimentResult, outcome_store: Optional[OutcomeStore], table: str) -> Iterator["pa.Table"]:
+    """Yield the exported table in bounded chunks"""
+    if table == "metrics":
+        yield _metrics_table(result)
+        return
+    if outcome_store is None:
+        raise ValueError(f"No outcome store to export the {table} table from")  # noqa: TRY003
+    for batch in outcome_store.iter_batches(result.run_id):
+        for offset in range(0, batch.num_rows, settings.EXPORT_CHUNK_ROWS):
+            yield batch.slice(offset, settings.EXPORT_CHUNK_ROWS)
+
+
+def export_ndjson(result: ExperimentResult, outcome_store: Optional[OutcomeStore]) -> Iterator[bytes]:
+    """Stream the result document followed by one line per customer outcome"""
+    yield json.dumps({"type": "result", **result.model_dump(mode="json")}).encode() + b"\n"
+    if outcome_store is None or not outcome_store.has_outcomes(result.run_id):
+        return
+    for chunk in _tables(result, outcome_store, "outcomes"):
+        yield b"".join(json.dumps({"type": "outcome", **row}).encode() + b"\n" for row in chunk.to_pylist())
+
+
+def export_csv(result: ExperimentResult, outcome_store: Optional[OutcomeStore], table: str) -> Iterator[bytes]:
+    """Stream a table as CSV with the header written once"""
+    import pyarrow.csv as pacsv
+
+    include_header = True
+    for chunk in _tables(result, outcome_store, table):
+        buffer = io.BytesIO()
+        pacsv.write_csv(chunk, buffer, write_options=pacsv.WriteOptions(include_header=include_header))
+        include_header = False
+        yield buffer.getvalue()
+
+
+def export_parquet(result: ExperimentResult, outcome_store: Optional[OutcomeStore], table: str) -> Iterator[bytes]:
+    """Stream a table as a Parquet file, flushing after every row group"""
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for chunk in _tables(result, outcome_store, table):
+        if writer is None:
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), chunk.schema, compression="zstd")
+        writer.write_table(chunk)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def export_result(
+    result: ExperimentResult, outcome_store: Optional[OutcomeStore], export_format: str, table: str
+) -> Iterator[bytes]:
+    """Dispatch to the streaming exporter for a format"""
+    if export_format == "ndjson":
+        return export_ndjson(result, outcome_store)
+    if export_format == "csv":
+        return export_csv(result, outcome_store, table)
+    return export_parquet(result, outcome_store, table)
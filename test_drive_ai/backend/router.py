@@ -1,49 +1,204 @@
 import asyncio
 import json
-from typing import Optional
-
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+import logging
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Annotated, Any, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 
+from test_drive_ai.backend.background_tasks import AdmissionRejected, ExperimentTaskManager
+from test_drive_ai.backend.config import settings
 from test_drive_ai.backend.experiment_schema import (
     Experiment,
     ExperimentResult,
     ExperimentRun,
     ExperimentRunRequest,
     ExperimentStatus,
+    OutcomeQueryResult,
+    RunComparison,
+    RunComparisonRequest,
+    RunPage,
+)
+from test_drive_ai.backend.experiment_service import ExperimentService
+from test_drive_ai.backend.metrics import metrics
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.backend.responses import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    ORJSONResponse,
+    cached_response,
+    dumps,
 )
+from test_drive_ai.backend.result_export import EXPORT_FORMATS, export_result
+from test_drive_ai.backend.run_events import TERMINAL_STATUSES, RunEventBroker, RunSubscription
+from test_drive_ai.backend.simulation_service import SimulationService
 
-router = APIRouter(prefix="/experiments", tags=["experiments"])
+router = APIRouter(prefix="/experiments", tags=["experiments"], default_response_class=ORJSONResponse)
 
+logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=list[Experiment])
-async def get_experiments(request: Request):
-    """Get all available experiments"""
-    experiment_service = request.app.state.experiment_service
-    return experiment_service.get_all_experiments()
+SSE_SUBSCRIBERS = metrics.gauge("sse_subscribers", "Open run status SSE streams")
+WS_WATCHERS = metrics.gauge("websocket_watchers", "Open run watching WebSocket connections")
+
+
+@router.get("/", response_model=list[dict[str, Any]])
+async def get_experiments(
+    request: Request,
+    response: Response,
+    category: Annotated[Optional[str], Query()] = None,
+    tag: Annotated[Optional[list[str]], Query()] = None,
+    q: Annotated[Optional[str], Query(description="Free-text search over names, descriptions and tags")] = None,
+    fields: Annotated[Optional[str], Query(description="Comma-separated list of fields to return")] = None,
+    cursor: Annotated[Optional[str], Query()] = None,
+    limit: Annotated[Optional[int], Query(ge=1, le=settings.EXPERIMENT_PAGE_MAX_SIZE)] = None,
+) -> list[dict[str, Any]]:
+    """Get available experiments, optionally filtered, paginated and projected
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    selected_fields = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    try:
+        experiments, next_cursor, total = experiment_service.list_experiments(
+            category, tag, q, selected_fields, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return experiments
+
+
+def _list_runs(
+    request: Request,
+    experiment_id: Optional[str],
+    status: Optional[list[ExperimentStatus]],
+    started_after: Optional[datetime],
+    started_before: Optional[datetime],
+    cursor: Optional[str],
+    limit: int,
+) -> dict[str, Any]:
+    """List runs through the experiment service, mapping bad cursors to 400"""
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    try:
+        return experiment_service.list_runs(experiment_id, status, started_after, started_before, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/runs", response_model=RunPage)
+async def get_runs(
+    request: Request,
+    status: Annotated[Optional[list[ExperimentStatus]], Query()] = None,
+    started_after: Annotated[Optional[datetime], Query()] = None,
+    started_before: Annotated[Optional[datetime], Query()] = None,
+    cursor: Annotated[Optional[str], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.RUN_PAGE_MAX_SIZE)] = 50,
+) -> dict[str, Any]:
+    """List runs across all experiments, newest first, with aggregates"""
+    return _list_runs(request, None, status, started_after, started_before, cursor, limit)
+
+
+@router.post("/runs/compare", response_model=RunComparison)
+async def compare_runs(comparison_request: RunComparisonRequest, request: Request) -> dict[str, Any]:
+    """Compare metrics, significance and visualization series of several completed runs"""
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    run_ids = list(dict.fromkeys(comparison_request.run_ids))
+    if len(run_ids) > settings.COMPARE_MAX_RUNS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.COMPARE_MAX_RUNS} runs can be compared")
+    try:
+        return experiment_service.compare_runs(run_ids, comparison_request.baseline_run_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Results not found for runs: {e.args[0]}") from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/{experiment_id}", response_model=Experiment)
-async def get_experiment(experiment_id: str, request: Request):
+async def get_experiment(experiment_id: str, request: Request) -> Response:
     """Get a specific experiment by ID"""
-    experiment_service = request.app.state.experiment_service
-    experiment = experiment_service.get_experiment(experiment_id)
-    if not experiment:
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    body = experiment_service.get_experiment_body(experiment_id)
+    if not body:
         raise HTTPException(status_code=404, detail="Experiment not found")
-    return experiment
+    return cached_response(request, body, REVALIDATE_CACHE_CONTROL)
+
+
+@router.get("/{experiment_id}/runs", response_model=RunPage)
+async def get_experiment_runs(
+    experiment_id: str,
+    request: Request,
+    status: Annotated[Optional[list[ExperimentStatus]], Query()] = None,
+    started_after: Annotated[Optional[datetime], Query()] = None,
+    started_before: Annotated[Optional[datetime], Query()] = None,
+    cursor: Annotated[Optional[str], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.RUN_PAGE_MAX_SIZE)] = 50,
+) -> dict[str, Any]:
+    """List runs of one experiment, newest first, with aggregates"""
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    if not experiment_service.get_experiment(experiment_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    return _list_runs(request, experiment_id, status, started_after, started_before, cursor, limit)
+
+
+def _admit_run(
+    request: Request,
+    task_manager: ExperimentTaskManager,
+    simulation_service: SimulationService,
+    config: dict[str, Any],
+) -> tuple[str, int]:
+    """Apply admission control to a run request, answering 429 (503 while draining) with Retry-After when refused
+
+    Run parameters the simulation cannot use are refused with 422 before any work is estimated.
+    """
+    try:
+        simulation_service.validate_config(config)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    # Quotas are keyed on the connecting host, since any caller could pick a fresh self-declared ID per request
+    client_id = request.client.host if request.client else "anonymous"
+    units = simulation_service.estimate_work(config)
+    try:
+        task_manager.admit(client_id, units)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503 if e.reason == "draining" else 429,
+            detail={
+                "message": str(e),
+                "reason": e.reason,
+                "retry_after_seconds": e.retry_after,
+                "estimated_wait_seconds": round(e.estimated_wait, 1),
+            },
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+    return client_id, units
 
 
 @router.post("/{experiment_id}/run", response_model=ExperimentRun)
 async def run_experiment(
     experiment_id: str,
     request: Request,
-    background_tasks: BackgroundTasks,
     run_request: Optional[ExperimentRunRequest] = None,
-):
+) -> ExperimentRun:
     """Start running an experiment with optional custom parameters"""
-    experiment_service = request.app.state.experiment_service
-    simulation_service = request.app.state.simulation_service
-    task_manager = request.app.state.task_manager
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    simulation_service: SimulationService = request.app.state.simulation_service
+    task_manager: ExperimentTaskManager = request.app.state.task_manager
 
     experiment = experiment_service.get_experiment(experiment_id)
     if not experiment:
@@ -54,9 +209,6 @@ async def run_experiment(
     if run_request and run_request.custom_parameters:
         custom_params = run_request.custom_parameters
 
-    # Create a new run with custom parameters
-    run = experiment_service.create_experiment_run(experiment_id, custom_params)
-
     # Merge custom parameters with default config
     config = experiment.config.dict()
     if custom_params:
@@ -96,18 +248,27 @@ async def run_experiment(
             "confidence_level": custom_params.get("confidence_level", 0.95),
         }
 
+    if run_request:
+        config["store_outcomes"] = run_request.store_outcomes
+        config["profile"] = run_request.profile
+
+    # Refuse the run before creating it when the worker pool or the client's quota is exhausted
+    client_id, units = _admit_run(request, task_manager, simulation_service, config)
+
+    # Create a new run with custom parameters
+    run = experiment_service.create_experiment_run(experiment_id, custom_params)
+    task_manager.reserve(run.run_id, client_id, units)
+
     # Start the experiment in background
-    background_tasks.add_task(
-        task_manager.run_experiment, experiment_id, run.run_id, config, experiment_service, simulation_service
-    )
+    task_manager.start(experiment_id, run.run_id, config, experiment_service, simulation_service)
 
     return run
 
 
 @router.get("/run/{run_id}/status", response_model=ExperimentRun)
-async def get_run_status(run_id: str, request: Request):
+async def get_run_status(run_id: str, request: Request) -> ExperimentRun:
     """Get the status of an experiment run"""
-    experiment_service = request.app.state.experiment_service
+    experiment_service: ExperimentService = request.app.state.experiment_service
     run = experiment_service.get_run_status(run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
@@ -115,67 +276,173 @@ async def get_run_status(run_id: str, request: Request):
 
 
 @router.get("/run/{run_id}/stream")
-async def stream_run_status(run_id: str, request: Request):
-    """Stream real-time status updates for an experiment run using SSE"""
-    experiment_service = request.app.state.experiment_service
-
-    async def event_generator():
+async def stream_run_status(
+    run_id: str, request: Request, last_event_id: Annotated[Optional[str], Header()] = None
+) -> EventSourceResponse:
+    """Stream real-time status updates for an experiment run using SSE
+
+    Every status transition carries its event ID. A client reconnecting with the Last-Event-ID
+    header is sent only the transitions it missed, or the current state when they are no longer buffered.
+    """
+    events: RunEventBroker = request.app.state.experiment_service.events
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    async def event_generator() -> AsyncIterator[dict[str, str]]:
         """Generate server-sent events"""
-        previous_state = None
-        error_count = 0
-        max_errors = 5
-
-        while error_count < max_errors:
-            try:
-                run = experiment_service.get_run_status(run_id)
-                print(f"Checking status for run ID: {run_id} - Current Status: {run.status if run else 'None'}")
-
-                if not run:
+        last_seen = resume_from
+        logger.debug("Status stream opened", extra={"run_id": run_id, "last_event_id": resume_from})
+        SSE_SUBSCRIBERS.inc()
+        try:
+            while not await request.is_disconnected():
+                missed = events.events_since(run_id, last_seen)
+                if missed is None:
                     yield {"event": "error", "data": json.dumps({"message": "Run not found"})}
                     break
 
-                # Create a state tuple for comparison
-                current_state = (run.status, run.progress, run.current_step)
-
-                # Send update if state changed
-                if current_state != previous_state:
-                    data = {
-                        "run_id": run.run_id,
-                        "status": run.status,
-                        "progress": run.progress,
-                        "current_step": run.current_step,
-                        "started_at": run.started_at.isoformat() if run.started_at else None,
-                        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+                for event in missed:
+                    yield {"event": "update", "id": str(event["event_id"]), "data": json.dumps(event)}
+                    last_seen = event["event_id"]
+
+                latest = events.latest(run_id)
+                if latest and latest["status"] in TERMINAL_STATUSES:
+                    yield {
+                        "event": "complete",
+                        "id": str(latest["event_id"]),
+                        "data": json.dumps(latest),
                     }
+                    break
 
-                    # Debug log
-                    print(f"SSE Update: Status={run.status}, Progress={run.progress}%, Step={run.current_step}")
+                await events.wait_for_event(run_id, settings.SSE_KEEPALIVE_SECONDS)
+        finally:
+            SSE_SUBSCRIBERS.dec()
 
-                    yield {"event": "update", "data": json.dumps(data)}
+    return EventSourceResponse(event_generator())
 
-                    previous_state = current_state
 
-                # Check if experiment is complete
-                if run.status in [ExperimentStatus.COMPLETED, ExperimentStatus.FAILED]:
-                    yield {"event": "complete", "data": json.dumps({"status": run.status})}
-                    break
+async def _flush_run_updates(websocket: WebSocket, subscription: RunSubscription, events: RunEventBroker) -> None:
+    """Send the updates coalesced for a watcher once per tick"""
+    while True:
+        await asyncio.sleep(settings.WS_TICK_SECONDS)
+        message = subscription.drain(events)
+        if message:
+            await websocket.send_text(dumps(message).decode())
+
+
+@router.websocket("/ws")
+async def watch_runs(websocket: WebSocket) -> None:
+    """Watch many runs and experiments over one WebSocket connection
+
+    Clients send {"action": "subscribe" | "unsubscribe", "run_ids": [...], "experiment_ids": [...]}
+    and receive one batched "updates" message per tick with changed runs and experiment progress.
+    """
+    events: RunEventBroker = websocket.app.state.experiment_service.events
+    await websocket.accept()
+    subscription = RunSubscription()
+    flusher = asyncio.create_task(_flush_run_updates(websocket, subscription, events))
+    WS_WATCHERS.inc()
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action") if isinstance(message, dict) else None
+            run_ids = message.get("run_ids", []) if action else []
+            experiment_ids = message.get("experiment_ids", []) if action else []
+            if not all(
+                isinstance(ids, list) and all(isinstance(i, str) for i in ids) for ids in (run_ids, experiment_ids)
+            ):
+                subscription.push_error("run_ids and experiment_ids must be lists of strings")
+                continue
+
+            if action == "subscribe":
+                total = len(subscription.run_ids | set(run_ids)) + len(
+                    subscription.experiment_ids | set(experiment_ids)
+                )
+                if total > settings.WS_MAX_SUBSCRIPTIONS:
+                    subscription.push_error(f"At most {settings.WS_MAX_SUBSCRIPTIONS} subscriptions per connection")
+                    continue
+                events.watch(subscription, run_ids, experiment_ids)
+            elif action == "unsubscribe":
+                events.unwatch(subscription, run_ids, experiment_ids)
+            else:
+                subscription.push_error("Unknown action, expected 'subscribe' or 'unsubscribe'")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        WS_WATCHERS.dec()
+        flusher.cancel()
+        events.close(subscription)
 
-                # Wait before next check
-                await asyncio.sleep(0.5)
 
-            except Exception as e:
-                error_count += 1
-                yield {"event": "error", "data": json.dumps({"message": str(e)})}
-                await asyncio.sleep(1)
+@router.get("/run/{run_id}/results", response_model=ExperimentResult)
+async def get_run_results(run_id: str, request: Request) -> Response:
+    """Get the results of a completed experiment run"""
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    body = experiment_service.get_results_body(run_id)
+    if not body:
+        raise HTTPException(status_code=404, detail="Results not found")
+    return cached_response(request, body, IMMUTABLE_CACHE_CONTROL)
 
-    return EventSourceResponse(event_generator())
 
+@router.get("/run/{run_id}/profile")
+async def download_run_profile(run_id: str, request: Request) -> FileResponse:
+    """Download the raw engine profile of a run started with profile=cprofile, in the pstats format"""
+    simulation_service: SimulationService = request.app.state.simulation_service
+    profile_path = simulation_service.profile_path(run_id)
+    if not profile_path or not os.path.exists(profile_path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(profile_path, media_type="application/octet-stream", filename=f"{run_id}.prof")
 
-@router.get("/run/{run_id}/results", response_model=ExperimentResult)
-async def get_run_results(run_id: str, request: Request):
-    """Get the results of a completed experiment run"""
-    experiment_service = request.app.state.experiment_service
+
+@router.get("/run/{run_id}/export")
+async def export_run_results(
+    run_id: str,
+    request: Request,
+    export_format: Annotated[Literal["ndjson", "csv", "parquet"], Query(alias="format")] = "ndjson",
+    table: Annotated[
+        Literal["outcomes", "metrics"], Query(description="Table exported as CSV or Parquet")
+    ] = "outcomes",
+) -> StreamingResponse:
+    """Stream the results and per-customer outcomes of a run without materializing them"""
+    experiment_service: ExperimentService = request.app.state.experiment_service
+    outcome_store: OutcomeStore = request.app.state.outcome_store
     results = experiment_service.get_results(run_id)
     if not results:
         raise HTTPException(status_code=404, detail="Results not found")
-    return results
+    if export_format != "ndjson" and table == "outcomes" and not outcome_store.has_outcomes(run_id):
+        raise HTTPException(status_code=404, detail="Outcomes not found")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{run_id}.{extension}" if export_format == "ndjson" else f"{run_id}-{table}.{extension}"
+    return StreamingResponse(
+        export_result(results, outcome_store, export_format, table),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/run/{run_id}/outcomes", response_model=OutcomeQueryResult)
+async def query_run_outcomes(
+    run_id: str,
+    request: Request,
+    columns: Annotated[Optional[str], Query(description="Comma-separated list of columns to return")] = None,
+    segment: Annotated[Optional[list[str]], Query()] = None,
+    intervention: Annotated[Optional[list[str]], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.OUTCOME_QUERY_MAX_ROWS)] = 1000,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> dict[str, Any]:
+    """Query stored per-customer outcomes of a run, filtered by segment and intervention"""
+    outcome_store: OutcomeStore = request.app.state.outcome_store
+    if not outcome_store.has_outcomes(run_id):
+        raise HTTPException(status_code=404, detail="Outcomes not found")
+
+    selected_columns = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+    filters = {"segment": set(segment or []), "intervention": set(intervention or [])}
+    try:
+        return await asyncio.to_thread(
+            outcome_store.query, run_id, selected_columns, filters, limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
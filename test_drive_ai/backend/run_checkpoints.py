@@ -0,0 +1,31 @@
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def save_checkpoints(path: str, checkpoints: list[dict[str, Any]]) -> None:
+    """Atomically persist checkpoints of unfinished runs for the next process"""
+    if not checkpoints:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"runs": checkpoints}, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoints(path: str) -> list[dict[str, Any]]:
+    """Read and consume persisted checkpoints, so each interrupted run is resumed once"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoints: list[dict[str, Any]] = json.load(f)["runs"]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Ignoring unreadable run checkpoints in %s: %s", path, e)
+        checkpoints = []
+    os.remove(path)
+    return checkpoints
@@ -0,0 +1,113 @@
+import functools
+import math
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from test_drive_ai.backend.experiment_schema import ExperimentResult
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+# Metrics reported as conversion percentages, tested for significance against the baseline
+RATE_SUFFIX = "_conversion_rate"
+
+# Data keys that hold the category axis of a visualization
+LABEL_KEYS = ("x", "categories", "labels")
+
+
+@functools.cache
+def _erfc() -> Callable[["np.ndarray"], "np.ndarray"]:
+    """Element-wise complementary error function, vectorized on first use"""
+    return np.vectorize(math.erfc, otypes=[float])
+
+
+def _matrix_to_lists(matrix: "np.ndarray") -> list[list[Optional[float]]]:
+    """Convert a float matrix to nested lists with NaN mapped to None"""
+    return [[None if math.isnan(value) else round(float(value), 6) for value in row] for row in matrix]
+
+
+def _pooled_p_values(rates: "np.ndarray", sizes: "np.ndarray", baseline: int) -> "np.ndarray":
+    """Two-sided pooled two-proportion z-test of every run against the baseline run
+
+    Args:
+        rates: Conversion proportions, one row per run and one column per metric
+        sizes: Sample size of each run
+        baseline: Row index of the baseline run
+
+    Returns:
+        Matrix of p-values shaped like rates, NaN where a test is not possible
+    """
+    n1 = sizes[:, None]
+    n0 = sizes[baseline]
+    p0 = rates[baseline]
+    pooled = (rates * n1 + p0 * n0) / (n1 + n0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (rates - p0) / np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n0))
+    p_values = _erfc()(np.abs(z) / math.sqrt(2))
+    p_values[baseline] = np.nan
+    return p_values
+
+
+def _align_visualizations(results: list[ExperimentResult]) -> list[dict[str, Any]]:
+    """Align each visualization's series across runs on the union of its category labels"""
+    aligned: dict[str, dict[str, Any]] = {}
+    for result in results:
+        for viz in result.visualizations:
+            data = viz.get("data", {})
+            label_key = next((key for key in LABEL_KEYS if key in data), None)
+            if label_key is None:
+                continue
+            labels = [str(label) for label in data[label_key]]
+            entry = aligned.setdefault(viz.get("title", ""), {"type": viz.get("type"), "labels": [], "series": {}})
+            entry["labels"].extend(label for label in labels if label not in entry["labels"])
+            for key, values in data.items():
+                if key == label_key or not isinstance(values, list) or len(values) != len(labels):
+                    continue
+                if all(isinstance(value, (int, float)) for value in values):
+                    entry["series"][f"{result.run_id}:{key}"] = dict(zip(labels, values))
+
+    return [
+        {
+            "title": title,
+            "type": entry["type"],
+            "labels": entry["labels"],
+            "series": {
+                name: [points.get(label) for label in entry["labels"]] for name, points in entry["series"].items()
+            },
+        }
+        for title, entry in aligned.items()
+    ]
+
+
+def compare_results(results: list[ExperimentResult], baseline_run_id: Optional[str] = None) -> dict[str, Any]:
+    """Compare results of several runs against a baseline run in one compact payload"""
+    run_ids = [result.run_id for result in results]
+    baseline = run_ids.index(baseline_run_id) if baseline_run_id else 0
+    metrics = sorted({name for result in results for name in result.metrics})
+
+    values = np.array(
+        [[result.metrics.get(name, np.nan) for name in metrics] for result in results], dtype=float
+    ).reshape(len(results), len(metrics))
+    deltas = values - values[baseline]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(values[baseline] != 0, deltas / np.abs(values[baseline]) * 100, np.nan)
+
+    rate_columns = [i for i, name in enumerate(metrics) if name.endswith(RATE_SUFFIX)]
+    sizes = np.array([result.metrics.get("sample_size", np.nan) for result in results], dtype=float)
+    p_values = _pooled_p_values(values[:, rate_columns] / 100, sizes, baseline)
+
+    return {
+        "baseline_run_id": run_ids[baseline],
+        "run_ids": run_ids,
+        "metrics": metrics,
+        "values": _matrix_to_lists(values),
+        "deltas": _matrix_to_lists(deltas),
+        "relative_deltas": _matrix_to_lists(relative),
+        "significance": {
+            "metrics": [metrics[i] for i in rate_columns],
+            "p_values": _matrix_to_lists(p_values),
+        },
+        "visualizations": _align_visualizations(results),
+    }
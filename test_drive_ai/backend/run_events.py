@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+from collections import Counter, defaultdict, deque
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_schema import ExperimentRun, ExperimentStatus
+
+TERMINAL_STATUSES = (ExperimentStatus.COMPLETED, ExperimentStatus.FAILED)
+
+
+def run_snapshot(run: ExperimentRun, event_id: int) -> dict[str, Any]:
+    """Build the status payload pushed to run watchers"""
+    return {
+        "event_id": event_id,
+        "run_id": run.run_id,
+        "experiment_id": run.experiment_id,
+        "status": ExperimentStatus(run.status).value,
+        "progress": run.progress,
+        "current_step": run.current_step,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+    }
+
+
+class RunSubscription:
+    """One watcher's subscriptions with updates coalesced until the next flush"""
+
+    def __init__(self) -> None:
+        self.run_ids: set[str] = set()
+        self.experiment_ids: set[str] = set()
+        self._pending_runs: dict[str, dict[str, Any]] = {}
+        self._pending_experiments: set[str] = set()
+        self._errors: list[str] = []
+
+    def push_run(self, snapshot: dict[str, Any]) -> None:
+        """Queue a run update, replacing any older update for the same run"""
+        self._pending_runs[snapshot["run_id"]] = snapshot
+
+    def mark_experiment(self, experiment_id: str) -> None:
+        """Queue a refreshed progress summary for an experiment"""
+        self._pending_experiments.add(experiment_id)
+
+    def push_error(self, message: str) -> None:
+        """Queue an error message for the watcher"""
+        self._errors.append(message)
+
+    def drain(self, broker: "RunEventBroker") -> Optional[dict[str, Any]]:
+        """Collect everything queued since the last flush into one message"""
+        if not (self._pending_runs or self._pending_experiments or self._errors):
+            return None
+        message = {
+            "type": "updates",
+            "runs": list(self._pending_runs.values()),
+            "experiments": [broker.experiment_summary(experiment_id) for experiment_id in self._pending_experiments],
+            "errors": self._errors,
+        }
+        self._pending_runs = {}
+        self._pending_experiments = set()
+        self._errors = []
+        return message
+
+
+class RunEventBroker:
+    """Fans run status changes out to subscribed watchers"""
+
+    def __init__(self) -> None:
+        self._events: dict[str, deque[dict[str, Any]]] = {}
+        self._signals: dict[str, asyncio.Event] = {}
+        self._run_watchers: dict[str, set[RunSubscription]] = defaultdict(set)
+        self._experiment_watchers: dict[str, set[RunSubscription]] = defaultdict(set)
+        self._active_progress: dict[str, dict[str, float]] = defaultdict(dict)
+        self._finished: dict[str, Counter] = defaultdict(Counter)
+
+    def publish(self, run: ExperimentRun) -> dict[str, Any]:
+        """Record a run's new state as its next event and queue it for every interested watcher"""
+        events = self._events.setdefault(run.run_id, deque(maxlen=settings.RUN_EVENT_BUFFER_SIZE))
+        previous = events[-1] if events else None
+        snapshot = run_snapshot(run, previous["event_id"] + 1 if previous else 1)
+        events.append(snapshot)
+
+        active = self._active_progress[run.experiment_id]
+        if run.status in TERMINAL_STATUSES:
+            active.pop(run.run_id, None)
+            if previous is None or previous["status"] != snapshot["status"]:
+                self._finished[run.experiment_id][snapshot["status"]] += 1
+        else:
+            active[run.run_id] = run.progress
+
+        for subscription in self._run_watchers.get(run.run_id, ()):
+            subscription.push_run(snapshot)
+        for subscription in self._experiment_watchers.get(run.experiment_id, ()):
+            subscription.mark_experiment(run.experiment_id)
+        signal = self._signals.pop(run.run_id, None)
+        if signal is not None:
+            signal.set()
+        return snapshot
+
+    def events_since(self, run_id: str, last_event_id: Optional[int] = None) -> Optional[list[dict[str, Any]]]:
+        """Return the events a watcher missed after last_event_id
+
+        Without a last event ID, when missed events have already been evicted from the
+        ring buffer, or when the ID is ahead of the run's latest event because it was issued
+        before a restart restarted the numbering, only the latest event is returned so the
+        watcher resynchronizes.
+
+        Returns:
+            Missed events oldest first, or None if the run is unknown
+        """
+        events = self._events.get(run_id)
+        if events is None:
+            return None
+        if last_event_id is None or events[0]["event_id"] > last_event_id + 1 or last_event_id > events[-1]["event_id"]:
+            return [events[-1]]
+        return [event for event in events if event["event_id"] > last_event_id]
+
+    def latest(self, run_id: str) -> Optional[dict[str, Any]]:
+        """Return the run's most recent event, or None if the run is unknown"""
+        events = self._events.get(run_id)
+        return events[-1] if events else None
+
+    async def wait_for_event(self, run_id: str, timeout: float) -> None:
+        """Wait until the run publishes a new event or the timeout expires"""
+        signal = self._signals.setdefault(run_id, asyncio.Event())
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(signal.wait(), timeout)
+
+    def experiment_summary(self, experiment_id: str) -> dict[str, Any]:
+        """Aggregate progress over an experiment's active runs"""
+        active = self._active_progress.get(experiment_id, {})
+        finished = self._finished.get(experiment_id, Counter())
+        return {
+            "experiment_id": experiment_id,
+            "active_runs": len(active),
+            "mean_progress": sum(active.values()) / len(active) if active else None,
+            "completed_runs": finished[ExperimentStatus.COMPLETED.value],
+            "failed_runs": finished[ExperimentStatus.FAILED.value],
+        }
+
+    def watch(
+        self, subscription: RunSubscription, run_ids: Iterable[str] = (), experiment_ids: Iterable[str] = ()
+    ) -> None:
+        """Subscribe to runs and experiments, queueing their current state right away"""
+        for run_id in run_ids:
+            latest = self.latest(run_id)
+            if latest is None:
+                subscription.push_error(f"Run not found: {run_id}")
+                continue
+            subscription.run_ids.add(run_id)
+            self._run_watchers[run_id].add(subscription)
+            subscription.push_run(latest)
+        for experiment_id in experiment_ids:
+            subscription.experiment_ids.add(experiment_id)
+            self._experiment_watchers[experiment_id].add(subscription)
+            subscription.mark_experiment(experiment_id)
+
+    def unwatch(
+        self, subscription: RunSubscription, run_ids: Iterable[str] = (), experiment_ids: Iterable[str] = ()
+    ) -> None:
+        """Remove subscriptions to runs and experiments"""
+        for run_id in run_ids:
+            subscription.run_ids.discard(run_id)
+            self._discard(self._run_watchers, run_id, subscription)
+        for experiment_id in experiment_ids:
+            subscription.experiment_ids.discard(experiment_id)
+            self._discard(self._experiment_watchers, experiment_id, subscription)
+
+    def close(self, subscription: RunSubscription) -> None:
+        """Drop every subscription held by a watcher"""
+        self.unwatch(subscription, list(subscription.run_ids), list(subscription.experiment_ids))
+
+    @staticmethod
+    def _discard(watchers: dict[str, set[RunSubscription]], key: str, subscription: RunSubscription) -> None:
+        subscriptions = watchers.get(key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del watchers[key]
@@ -0,0 +1,109 @@
+import base64
+import binascii
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from test_drive_ai.backend.experiment_schema import ExperimentRun, ExperimentStatus
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+# Queue wait percentiles reported in run aggregates
+QUEUE_WAIT_PERCENTILES = (50, 90, 99)
+
+# Key ordering runs by submission time, newest last
+RunKey = tuple[float, str]
+
+
+def encode_run_cursor(key: RunKey) -> str:
+    """Encode the key of the last returned run as an opaque page cursor"""
+    return base64.urlsafe_b64encode(f"{key[0]!r}|{key[1]}".encode()).decode()
+
+
+def decode_run_cursor(cursor: str) -> RunKey:
+    """Decode a page cursor back into the run key it points after"""
+    try:
+        timestamp, run_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(timestamp), run_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e  # noqa: TRY003
+
+
+class RunIndex:
+    """Secondary indexes over experiment runs for listing and aggregate queries"""
+
+    def __init__(self) -> None:
+        self._runs: dict[str, ExperimentRun] = {}
+        self._all: list[RunKey] = []
+        self._by_experiment: dict[str, list[RunKey]] = {}
+        self._by_status: dict[ExperimentStatus, set[str]] = {status: set() for status in ExperimentStatus}
+        self._queue_waits: dict[str, float] = {}
+
+    def add(self, run: ExperimentRun) -> None:
+        """Index a newly created run"""
+        key = (run.started_at.timestamp() if run.started_at else 0.0, run.run_id)
+        self._runs[run.run_id] = run
+        insort(self._all, key)
+        insort(self._by_experiment.setdefault(run.experiment_id, []), key)
+        self._by_status[run.status].add(run.run_id)
+
+    def update_status(self, run_id: str, previous: ExperimentStatus, current: ExperimentStatus, at: datetime) -> None:
+        """Move a run between status buckets and record when it left the queue"""
+        run = self._runs.get(run_id)
+        if run is None:
+            return
+        self._by_status[previous].discard(run_id)
+        self._by_status[current].add(run_id)
+        if previous == ExperimentStatus.PENDING and current != ExperimentStatus.PENDING and run.started_at:
+            self._queue_waits.setdefault(run_id, (at - run.started_at).total_seconds())
+
+    def query(
+        self,
+        experiment_id: Optional[str] = None,
+        statuses: Optional[list[ExperimentStatus]] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """Return a page of runs, newest first, with aggregates over every matching run"""
+        keys = self._all if experiment_id is None else self._by_experiment.get(experiment_id, [])
+        low = bisect_left(keys, (started_after.timestamp(), "")) if started_after else 0
+        high = bisect_right(keys, (started_before.timestamp(), "\uffff")) if started_before else len(keys)
+        matching = keys[low:high]
+        if statuses:
+            allowed = set().union(*(self._by_status[status] for status in statuses))
+            matching = [key for key in matching if key[1] in allowed]
+
+        end = bisect_left(matching, decode_run_cursor(cursor)) if cursor else len(matching)
+        page = matching[max(end - limit, 0) : end][::-1]
+        next_cursor = encode_run_cursor(page[-1]) if page and end - limit > 0 else None
+
+        return {
+            "runs": [self._runs[run_id] for _, run_id in page],
+            "next_cursor": next_cursor,
+            "aggregates": self._aggregate([run_id for _, run_id in matching]),
+        }
+
+    def _aggregate(self, run_ids: list[str]) -> dict[str, Any]:
+        """Compute status counts, mean duration and queue wait percentiles for a set of runs"""
+        runs = [self._runs[run_id] for run_id in run_ids]
+        durations = [
+            (run.completed_at - run.started_at).total_seconds()
+            for run in runs
+            if run.status == ExperimentStatus.COMPLETED and run.completed_at and run.started_at
+        ]
+        waits = [self._queue_waits[run_id] for run_id in run_ids if run_id in self._queue_waits]
+        percentiles: list[float] = np.percentile(waits, QUEUE_WAIT_PERCENTILES).tolist() if waits else []
+
+        return {
+            "total": len(runs),
+            "counts_by_status": dict(Counter(ExperimentStatus(run.status).value for run in runs)),
+            "mean_duration_seconds": float(np.mean(durations)) if durations else None,
+            "queue_wait_seconds": {f"p{p}": float(value) for p, value in zip(QUEUE_WAIT_PERCENTILES, percentiles)},
+        }
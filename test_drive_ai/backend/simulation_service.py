@@ -1,15 +1,98 @@
 import asyncio
+import os
+import time
 from datetime import UTC, datetime
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
+from test_drive_ai.backend.config import settings
 from test_drive_ai.backend.experiment_schema import ExperimentResult, ExperimentStatus
+from test_drive_ai.backend.metrics import metrics
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.backend.profiling import RunProfiler
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
+else:
+    np = lazy_import("numpy")
+    pa = lazy_import("pyarrow")
+
+# Parameter names that describe the segment and intervention dimensions of an experiment
+SEGMENT_KEYS = ("segments", "customer_tiers", "risk_categories")
+INTERVENTION_KEYS = ("interventions", "strategies", "model_versions")
+
+# Simulation phases with progress percentages
+PHASES = [
+    ("Initializing experiment environment", 10),
+    ("Loading historical data", 20),
+    ("Preprocessing customer segments", 30),
+    ("Running intervention simulations", 50),
+    ("Analyzing customer responses", 70),
+    ("Calculating statistical significance", 85),
+    ("Generating visualizations", 95),
+    ("Finalizing results", 100),
+]
+
+# Phase during which per-customer outcomes are simulated and stored
+OUTCOME_PHASE = "Running intervention simulations"
+
+# Mock processing time spent in each phase
+MOCK_PHASE_SECONDS = 3.0
+
+PHASE_SECONDS = metrics.histogram("simulation_phase_duration_seconds", "Wall time of each simulation phase", ["phase"])
+REPLICATIONS = metrics.counter("simulation_replications_total", "Customer outcomes simulated")
+REPLICATION_RATE = metrics.gauge(
+    "simulation_replications_per_second", "Customer outcomes simulated per second by the latest outcome simulation"
+)
+
+
+def _dimension(parameters: dict[str, Any], keys: tuple[str, ...], default: list[str]) -> list[str]:
+    """Pick the first configured list of names for an experiment dimension"""
+    for key in keys:
+        values = parameters.get(key)
+        if isinstance(values, list) and values:
+            return [value["name"] if isinstance(value, dict) else str(value) for value in values]
+    return default
+
+
+def _int_parameter(values: dict[str, Any], key: str, default: int, minimum: int = 1) -> int:
+    """Read an integer run parameter
+
+    Raises:
+        ValueError: If the value is not an integer of at least minimum
+    """
+    value = values.get(key, default)
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{key} must be an integer, got {value!r}") from None  # noqa: TRY003
+    if number < minimum:
+        raise ValueError(f"{key} must be at least {minimum}, got {number}")  # noqa: TRY003
+    return number
 
 
 class SimulationService:
     """Service to handle experiment simulations"""
 
-    @staticmethod
+    def __init__(
+        self,
+        outcome_store: Optional[OutcomeStore] = None,
+        profiles_dir: Optional[str] = None,
+        phase_seconds: float = MOCK_PHASE_SECONDS,
+    ):
+        self.outcome_store = outcome_store
+        self.profiles_dir = profiles_dir
+        self.phase_seconds = phase_seconds
+
+    def profile_path(self, run_id: str) -> Optional[str]:
+        """Path of a run's raw engine profile, if profiles are kept"""
+        if self.profiles_dir is None:
+            return None
+        return os.path.join(self.profiles_dir, f"{run_id}.prof")
+
     async def run_experiment(
+        self,
         experiment_id: str,
         run_id: str,
         config: dict[str, Any],
@@ -27,27 +110,38 @@ class SimulationService:
             ExperimentResult with mock data
         """
 
-        # Simulation phases with progress percentages
-        phases = [
-            ("Initializing experiment environment", 10),
-            ("Loading historical data", 20),
-            ("Preprocessing customer segments", 30),
-            ("Running intervention simulations", 50),
-            ("Analyzing customer responses", 70),
-            ("Calculating statistical significance", 85),
-            ("Generating visualizations", 95),
-            ("Finalizing results", 100),
-        ]
+        store_outcomes = bool(config.get("store_outcomes")) and self.outcome_store is not None
+        profiler = RunProfiler(config.get("profile"))
+
+        # A run resumed from a checkpoint skips the phases it had already completed
+        resume_from = int(config.get("resume_from_phase", 0))
+        outcome_summary = None
+        completed = [phase for phase, _ in PHASES[:resume_from]]
+        if store_outcomes and OUTCOME_PHASE in completed and self._require_store().has_outcomes(run_id):
+            outcome_summary = self._stored_outcome_summary(run_id, config)
 
         try:
-            for phase, progress in phases:
-                # Update status
-                status_callback(run_id, ExperimentStatus.RUNNING, progress, phase)
-                # Simulate processing time
-                await asyncio.sleep(3.0)
+            for phase, progress in PHASES[resume_from:]:
+                with profiler.phase(phase) as timing:
+                    # Update status
+                    status_callback(run_id, ExperimentStatus.RUNNING, progress, phase)
+                    if phase == OUTCOME_PHASE and store_outcomes:
+                        start = time.perf_counter()
+                        outcome_summary = await asyncio.to_thread(
+                            profiler.run_engine, self._simulate_outcomes, run_id, config
+                        )
+                        elapsed = time.perf_counter() - start
+                        REPLICATIONS.inc(outcome_summary["rows"])
+                        REPLICATION_RATE.set(outcome_summary["rows"] / elapsed if elapsed > 0 else 0.0)
+                    # Simulate processing time
+                    await asyncio.sleep(self.phase_seconds)
+                PHASE_SECONDS.observe(timing["wall_seconds"], phase=phase)
 
             # Generate mock results
-            results = SimulationService._generate_mock_results(experiment_id, run_id)
+            results = profiler.run_engine(SimulationService._generate_mock_results, experiment_id, run_id)
+            if outcome_summary:
+                results.metadata["outcomes"] = outcome_summary
+            await self._attach_profile(profiler, run_id, results)
 
             status_callback(run_id, ExperimentStatus.COMPLETED, 100, "Experiment completed successfully")
 
@@ -57,6 +151,103 @@ class SimulationService:
             status_callback(run_id, ExperimentStatus.FAILED, 0, f"Error: {e!s}")
             raise
 
+    async def _attach_profile(self, profiler: RunProfiler, run_id: str, results: ExperimentResult) -> None:
+        """Add a profiled run's phase breakdown to its results and keep its raw engine profile"""
+        if not profiler.enabled:
+            return
+        results.metadata["profile"] = profiler.summary()
+        profile_path = self.profile_path(run_id)
+        if profiler.has_profile and profile_path:
+            await asyncio.to_thread(profiler.dump_profile, profile_path)
+        else:
+            results.metadata["profile"]["profile_available"] = False
+
+    @staticmethod
+    def resume_phase(current_step: Optional[str]) -> int:
+        """Index of the phase to resume an interrupted run from, redoing the phase that was in progress"""
+        names = [phase for phase, _ in PHASES]
+        return names.index(current_step) if current_step in names else 0
+
+    def _require_store(self) -> OutcomeStore:
+        """The outcome store of a run that stores its outcomes"""
+        if self.outcome_store is None:
+            raise ValueError("Storing outcomes requires an outcome store")  # noqa: TRY003
+        return self.outcome_store
+
+    def _stored_outcome_summary(self, run_id: str, config: dict[str, Any]) -> dict[str, Any]:
+        """Summarize outcomes written before the run was interrupted"""
+        parameters = config.get("parameters", {})
+        description = self._require_store().describe(run_id)
+        return {
+            "rows": description["rows"],
+            "row_groups": description["row_groups"],
+            "segments": _dimension(parameters, SEGMENT_KEYS, ["all_customers"]),
+            "interventions": _dimension(parameters, INTERVENTION_KEYS, ["control", "treatment"]),
+        }
+
+    def validate_config(self, config: dict[str, Any]) -> None:
+        """Check the run parameters read by the simulation before the run is admitted
+
+        Raises:
+            ValueError: If the sample size, replications or random seed is not a valid integer
+        """
+        parameters = config.get("parameters", {})
+        _int_parameter(parameters, "sample_size", 1000)
+        _int_parameter(parameters, "replications", 1)
+        _int_parameter(config.get("custom_context", {}), "random_seed", 42, minimum=0)
+
+    def estimate_work(self, config: dict[str, Any]) -> int:
+        """Estimate the work of a run as population size x replications"""
+        parameters = config.get("parameters", {})
+        interventions = _dimension(parameters, INTERVENTION_KEYS, ["control", "treatment"])
+        population = _int_parameter(parameters, "sample_size", 1000) * len(interventions)
+        return max(population * _int_parameter(parameters, "replications", 1), 1)
+
+    def _simulate_outcomes(self, run_id: str, config: dict[str, Any]) -> dict[str, Any]:
+        """Simulate per-customer outcomes and write them to the outcome store batch by batch"""
+        parameters = config.get("parameters", {})
+        segments = _dimension(parameters, SEGMENT_KEYS, ["all_customers"])
+        interventions = _dimension(parameters, INTERVENTION_KEYS, ["control", "treatment"])
+        arm_size = _int_parameter(parameters, "sample_size", 1000)
+        seed = _int_parameter(config.get("custom_context", {}), "random_seed", 42, minimum=0)
+        rng = np.random.default_rng(seed)
+        batch_size = settings.OUTCOME_BATCH_SIZE
+
+        writer = self._require_store().open_writer(run_id)
+        next_customer_id = 0
+        try:
+            for intervention_index, intervention in enumerate(interventions):
+                lift = 0.0 if intervention == "control" else 0.02 * (intervention_index + 1)
+                for segment_index, segment in enumerate(segments):
+                    base_rate = 0.08 + 0.04 * segment_index / max(len(segments) - 1, 1)
+                    cell_size = arm_size // len(segments) + (1 if segment_index < arm_size % len(segments) else 0)
+
+                    # Each batch covers a single segment/intervention cell so reads can prune row groups
+                    for start in range(0, cell_size, batch_size):
+                        size = min(batch_size, cell_size - start)
+                        converted = rng.random(size) < base_rate + lift
+                        writer.write_batch({
+                            "customer_id": np.arange(next_customer_id, next_customer_id + size),
+                            "segment": [segment] * size,
+                            "intervention": [intervention] * size,
+                            "converted": converted,
+                            "days_to_convert": pa.array(rng.gamma(2.0, 4.0, size), mask=~converted),
+                            "engagement_score": rng.beta(2.0, 5.0, size) * 10,
+                            "cost": rng.gamma(2.0, 5.0 + 5.0 * intervention_index, size),
+                        })
+                        next_customer_id += size
+        except BaseException:
+            writer.abort()
+            raise
+
+        writer.close()
+        return {
+            "rows": writer.rows_written,
+            "row_groups": writer.row_groups_written,
+            "segments": segments,
+            "interventions": interventions,
+        }
+
     @staticmethod
     def _generate_mock_results(experiment_id: str, run_id: str) -> ExperimentResult:
         """Generate mock experiment results"""
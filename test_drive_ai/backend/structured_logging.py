@@ -0,0 +1,111 @@
+import json
+import logging
+import queue
+import sys
+import time
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Logger under which every application logger is created
+ROOT_LOGGER = "test_drive_ai"
+
+# Sampling state kept before entries older than the interval are pruned
+MAX_SAMPLED_KEYS = 10_000
+
+# Attributes present on every LogRecord, or only used for sampling; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, with `extra` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RunSamplingFilter(logging.Filter):
+    """Let through at most one sampled record per run and interval
+
+    Only records logged with extra={"sampled": True, "run_id": ...} are sampled, so
+    high-frequency events such as progress updates cost one dict lookup when dropped.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, interval_seconds: float):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self._last_emitted: dict[tuple[str, str], float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        key = (getattr(record, "run_id", ""), record.msg)
+        now = time.monotonic()
+        if now - self._last_emitted.get(key, float("-inf")) < self.interval_seconds:
+            return False
+        if len(self._last_emitted) >= MAX_SAMPLED_KEYS:
+            self._last_emitted = {k: t for k, t in self._last_emitted.items() if now - t < self.interval_seconds}
+        self._last_emitted[key] = now
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread
+
+    The standard handler formats every record in the calling thread. Records stay in this
+    process, so they can be enqueued untouched and formatted only when written.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(level: str = "INFO", sample_interval_seconds: float = 1.0) -> QueueListener:
+    """Route application logs through a queue to a background thread that writes JSON lines
+
+    Calling it again returns the running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _LazyQueueHandler(log_queue)
+    handler.addFilter(RunSamplingFilter(sample_interval_seconds))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in [handler for handler in logger.handlers if isinstance(handler, _LazyQueueHandler)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+    _listener = None
@@ -0,0 +1,175 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Optional
+
+from test_drive_ai.foo import (
+    BANK_PORTAL_CONFIG,
+    BANK_PORTAL_INTERVENTIONS,
+    DEFAULT_LLM_MODEL,
+    SIMULATION_BATCHES,
+    SIMULATION_MODES,
+    InterventionFramework,
+    crewai,
+)
+from test_drive_ai.replay_llm import LatencyModel, LLMRecordings, RecordingLLM, ReplayLLM
+
+# Recordings written by the record mode and served by the replay mode
+RECORDINGS_PATH = "data/llm_recordings.jsonl"
+
+# Simulation concurrency levels compared by default
+CONCURRENCY_LEVELS = (1, 2, 4, 9)
+
+
+def run_pipeline(
+    framework: InterventionFramework, max_concurrency: int, mode: str = "llm", batch: str = "none"
+) -> list[dict]:
+    """Run the bank portal pipeline end to end without the response cache, simulating in the given mode
+
+    Returns:
+        The intervention x segment simulation records
+    """
+    context = framework.parse_experiment_config(BANK_PORTAL_CONFIG, use_cache=False)
+    framework.generate_interventions(str(context), num_interventions=2, use_cache=False)
+    results = framework.simulate_interventions(
+        BANK_PORTAL_INTERVENTIONS,
+        list(BANK_PORTAL_CONFIG["segments"]),
+        max_concurrency=max_concurrency,
+        use_cache=False,
+        mode=mode,
+        seed=0,
+        batch=batch,
+    )
+    framework.rank_interventions(results, use_cache=False, max_concurrency=max_concurrency)
+    return results
+
+
+def record(
+    model: str = DEFAULT_LLM_MODEL,
+    path: str = RECORDINGS_PATH,
+    max_concurrency: int = 4,
+    mode: str = "llm",
+    batch: str = "none",
+) -> int:
+    """Run the pipeline once against a real model, recording every response
+
+    Returns:
+        Number of recorded responses in the file
+    """
+    recordings = LLMRecordings(path)
+    framework = InterventionFramework(
+        llm=RecordingLLM(crewai.LLM(model=model, temperature=0.7), recordings), pool_size=max_concurrency
+    )
+    run_pipeline(framework, max_concurrency, mode, batch)
+    return len(recordings)
+
+
+def _percentile(values: list[float], percent: int) -> Optional[float]:
+    if len(values) < 2:
+        return values[0] if values else None
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def benchmark(
+    recordings: LLMRecordings,
+    latency: str = "recorded:1.0",
+    concurrency_levels: tuple[int, ...] = CONCURRENCY_LEVELS,
+    allow_misses: bool = False,
+    seed: Optional[int] = 0,
+    mode: str = "llm",
+    batch: str = "none",
+) -> list[dict[str, Any]]:
+    """Replay the pipeline at each simulation concurrency level and measure it
+
+    Every level runs on a fresh framework and agent pool, so levels do not share warm state.
+    """
+    reports = []
+    for level in concurrency_levels:
+        llm = ReplayLLM(recordings, LatencyModel.parse(latency, seed), allow_misses=allow_misses)
+        framework = InterventionFramework(llm=llm, pool_size=level, verbose=False)
+        with framework.track_usage() as usage:
+            start = time.perf_counter()
+            results = run_pipeline(framework, level, mode, batch)
+            wall_seconds = time.perf_counter() - start
+        summary = usage.summary()
+        pair_seconds = [result["seconds"] for result in results]
+        reports.append({
+            "mode": mode,
+            "batch": batch,
+            "prompt_tokens": summary["prompt_tokens"],
+            "concurrency": level,
+            "wall_seconds": round(wall_seconds, 3),
+            "llm_calls": summary["calls"],
+            "calls_per_second": round(summary["calls"] / wall_seconds, 3),
+            "pairs": len(results),
+            "failed_pairs": sum("error" in result for result in results),
+            "pair_p50_seconds": _percentile(pair_seconds, 50),
+            "pair_p95_seconds": _percentile(pair_seconds, 95),
+            "stage_seconds": {stage: totals["seconds"] for stage, totals in summary["stages"].items()},
+        })
+    return reports
+
+
+def format_reports(reports: list[dict[str, Any]]) -> str:
+    lines = [
+        f"{'concurrency':>11} {'wall s':>8} {'calls':>6} {'calls/s':>8} {'pair p50':>9} {'pair p95':>9} {'failed':>6}"
+    ]
+    lines.extend(
+        f"{report['concurrency']:>11} {report['wall_seconds']:>8.2f} {report['llm_calls']:>6} "
+        f"{report['calls_per_second']:>8.2f} {report['pair_p50_seconds'] or 0:>9.2f} "
+        f"{report['pair_p95_seconds'] or 0:>9.2f} {report['failed_pairs']:>6}"
+        for report in reports
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record LLM responses, or benchmark the pipeline replaying them")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Run the pipeline against a real model and record responses")
+    record_parser.add_argument("--model", default=DEFAULT_LLM_MODEL)
+    record_parser.add_argument("--recordings", default=RECORDINGS_PATH)
+    record_parser.add_argument("--mode", choices=SIMULATION_MODES, default="llm")
+    record_parser.add_argument("--batch", choices=SIMULATION_BATCHES, default="none")
+
+    replay_parser = subparsers.add_parser("replay", help="Benchmark the pipeline offline on recorded responses")
+    replay_parser.add_argument("--recordings", default=RECORDINGS_PATH)
+    replay_parser.add_argument(
+        "--latency",
+        default="recorded:1.0",
+        help='"kind[:seconds[,spread]]" with kind fixed, uniform, lognormal or recorded',
+    )
+    replay_parser.add_argument("--concurrency", type=int, nargs="+", default=list(CONCURRENCY_LEVELS))
+    replay_parser.add_argument(
+        "--allow-misses", action="store_true", help="Answer unrecorded prompts with a placeholder"
+    )
+    replay_parser.add_argument("--seed", type=int, default=0)
+    replay_parser.add_argument("--mode", choices=SIMULATION_MODES, default="llm", help="Simulation mode to replay")
+    replay_parser.add_argument(
+        "--batch", choices=SIMULATION_BATCHES, default="none", help="Simulation batching to replay"
+    )
+    replay_parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        print(f"Recorded responses: {record(args.model, args.recordings, mode=args.mode, batch=args.batch)}")
+        return 0
+
+    reports = benchmark(
+        LLMRecordings(args.recordings),
+        args.latency,
+        tuple(args.concurrency),
+        args.allow_misses,
+        args.seed,
+        args.mode,
+        args.batch,
+    )
+    print(json.dumps(reports, indent=2) if args.json else format_reports(reports))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
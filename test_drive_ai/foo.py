@@ -1,73 +1,344 @@
 # Simplified and more practical implementation with utility functions
 
+import asyncio
+import contextvars
+import functools
 import json
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Optional, cast
 
 import dotenv
-from crewai import LLM, Agent, Crew, Process, Task
+from pydantic import BaseModel
+
+from test_drive_ai.shared import llm_usage, prior_simulation, task_outputs
+from test_drive_ai.shared.call_policy import CallPolicy
+from test_drive_ai.shared.lazy_imports import lazy_import
+from test_drive_ai.shared.response_cache import ResponseCache
+
+# crewai takes seconds to import, so it is loaded when the first framework is created
+if TYPE_CHECKING:
+    import crewai
+
+    from test_drive_ai import resilient_llm
+else:
+    crewai = lazy_import("crewai")
+    resilient_llm = lazy_import("test_drive_ai.resilient_llm")
+
+# Intervention x segment simulations run at the same time by default
+MAX_CONCURRENT_SIMULATIONS = 4
+
+# Seconds a stage run waits for an agent set to be returned to the pool before giving up
+AGENT_CHECKOUT_TIMEOUT_SECONDS = 600.0
+
+# Seconds one intervention x segment simulation may take before it is reported as timed out
+SIMULATION_TIMEOUT_SECONDS = 300.0
+
+# Ways of simulating interventions; "hybrid" asks the LLM for effect-size priors and simulates numerically
+SIMULATION_MODES = ("llm", "hybrid")
+
+# Ways of grouping pairs into one crew in llm mode: one per pair, per intervention or per segment
+SIMULATION_BATCHES = ("none", "segments", "interventions")
+
+# Customers per arm and segment when no sample size is given, by simulation mode
+DEFAULT_SAMPLE_SIZES = {"llm": 10, "hybrid": 10_000}
+
+# Role, goal and backstory of every agent
+AGENT_PROFILES = {
+    "designer": {
+        "role": "Experiment Designer",
+        "goal": "Create well-structured experiments with clear metrics",
+        "backstory": "Expert in experimental design and business transformation",
+    },
+    "generator": {
+        "role": "Intervention Strategist",
+        "goal": "Generate innovative interventions that drive behavioral change",
+        "backstory": "Behavioral economist specializing in change management",
+    },
+    "data": {
+        "role": "Data Scientist",
+        "goal": "Generate realistic synthetic data for experimentation",
+        "backstory": "Expert in synthetic data generation and behavioral modeling",
+    },
+    "analyst": {
+        "role": "Statistical Analyst",
+        "goal": "Perform rigorous analysis of intervention effectiveness",
+        "backstory": "Senior statistician specializing in A/B testing",
+    },
+    "validator": {
+        "role": "Business Validator",
+        "goal": "Ensure results are realistic and actionable",
+        "backstory": "Strategy consultant with deep industry knowledge",
+    },
+}
+
+# Agents of the crew run by each pipeline stage, in task order
+STAGE_ROLES = {
+    "parse": ("designer",),
+    "generate": ("generator",),
+    "simulate": ("data", "analyst", "validator"),
+    "priors": ("data",),
+    "summarize": ("analyst",),
+    "shortlist": ("analyst",),
+    "rank": ("analyst", "validator"),
+}
+
+# Ways of ranking interventions; "auto" switches to map_reduce when results exceed the prompt budget
+RANKING_STRATEGIES = ("auto", "single", "map_reduce")
+
+# Characters of results embedded in one ranking or summary prompt
+RANKING_PROMPT_BUDGET_CHARS = 12_000
+
+# Characters kept of each intervention summary passed to the final ranking
+SUMMARY_MAX_CHARS = 1_500
+
+# Interventions kept of each group of summaries when they do not fit one ranking prompt together
+SHORTLIST_SIZE = 3
+
+# Model used unless another one is configured
+DEFAULT_LLM_MODEL = "anthropic/claude-3-7-sonnet-20250219"
+
+# File of the LLM response cache used by the demo experiment
+RESPONSE_CACHE_PATH = "data/llm_cache.sqlite3"
+
+# Deadline and retries of the demo experiment's LLM calls, so one stalled response cannot stall the pipeline
+DEMO_CALL_POLICY = CallPolicy(timeout_seconds=120.0, max_attempts=3, backoff_seconds=2.0)
 
 # Load environment variables from .env file
 dotenv.load_dotenv(dotenv_path=".env", override=True)
 
 
+# Start times of in-flight LLM calls by call ID, for latency from crewai's call events
+_call_started_at: dict[str, datetime] = {}
+
+
+def _on_llm_call_started(source: Any, event: Any) -> None:
+    _call_started_at[event.call_id] = event.timestamp
+
+
+def _on_llm_call_finished(source: Any, event: Any) -> None:
+    started_at = _call_started_at.pop(event.call_id, None)
+    seconds = (event.timestamp - started_at).total_seconds() if started_at else 0.0
+    llm_usage.record_call(
+        event.model or "",
+        event.agent_role or "unknown",
+        seconds,
+        getattr(event, "usage", None),
+        failed=isinstance(event, crewai.events.LLMCallFailedEvent),
+    )
+
+
+@functools.cache
+def _register_usage_handlers() -> None:
+    """Record every LLM call made by any crew, attributed to the calling agent's role
+
+    crewai runs event handlers in its own threads with a copy of the emitting context,
+    so calls are recorded for the runs tracked where the crew was kicked off.
+    """
+    bus = crewai.events.crewai_event_bus
+    bus.on(crewai.events.LLMCallStartedEvent)(_on_llm_call_started)
+    bus.on(crewai.events.LLMCallCompletedEvent)(_on_llm_call_finished)
+    bus.on(crewai.events.LLMCallFailedEvent)(_on_llm_call_finished)
+
+
+class AgentPool:
+    """Long-lived agent sets per pipeline stage, each used by one crew run at a time
+
+    A crew keeps per-kickoff state on its agents, so concurrent runs of a stage need
+    separate agent sets. Sets are created on demand up to `size` per stage and returned
+    to the pool after every run; further checkouts wait for a set to be returned.
+    Callers running stages concurrently reserve room for their concurrency, so their
+    runs never wait for a set, and a run that still waits longer than the checkout timeout fails.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[tuple[str, ...]], dict[str, "crewai.Agent"]],
+        size: int,
+        timeout: float = AGENT_CHECKOUT_TIMEOUT_SECONDS,
+    ) -> None:
+        self._build = build
+        self.size = size
+        self.timeout = timeout
+        self._idle: dict[str, queue.SimpleQueue[dict[str, crewai.Agent]]] = {
+            stage: queue.SimpleQueue() for stage in STAGE_ROLES
+        }
+        self._created: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, stage: str) -> Iterator[dict[str, "crewai.Agent"]]:
+        """Borrow an agent set for one run of a pipeline stage"""
+        idle = self._idle[stage]
+        try:
+            agents = idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created[stage] < self.size
+                if create:
+                    self._created[stage] += 1
+            agents = self._create(stage) if create else self._wait(stage)
+        try:
+            yield agents
+        finally:
+            idle.put(agents)
+
+    def _create(self, stage: str) -> dict[str, "crewai.Agent"]:
+        """Build an agent set already counted as created, uncounting it if the build fails"""
+        try:
+            return self._build(STAGE_ROLES[stage])
+        except BaseException:
+            with self._lock:
+                self._created[stage] -= 1
+            raise
+
+    def _wait(self, stage: str) -> dict[str, "crewai.Agent"]:
+        try:
+            return self._idle[stage].get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No {stage} agent set was returned within {self.timeout:g}s") from None  # noqa: TRY003
+
+    @contextmanager
+    def reserve(self, sets: int) -> Iterator[None]:
+        """Raise the size by `sets` while the caller runs that many stages at once"""
+        with self._lock:
+            self.size += sets
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.size -= sets
+
+    def warm(self, stages: Optional[list[str]] = None) -> None:
+        """Create every agent set up front so the first runs do not pay for it"""
+        for stage in stages or STAGE_ROLES:
+            with self._lock:
+                missing = self.size - self._created[stage]
+                self._created[stage] = self.size
+            for _ in range(missing):
+                self._idle[stage].put(self._create(stage))
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {stage: {"created": self._created[stage], "idle": idle.qsize()} for stage, idle in self._idle.items()}
+
+
 # Utility functions for the framework
 class InterventionFramework:
     """Main framework class for intervention testing"""
 
-    def __init__(self, llm_model="anthropic/claude-3-7-sonnet-20250219", temperature=0.7):
-        self.llm = LLM(model=llm_model, temperature=temperature)
-        self.agents = self._initialize_agents()
-        self.results = []
-
-    def _initialize_agents(self) -> dict[str, Agent]:
-        """Initialize all agents with their roles and expertise"""
-
-        agents = {
-            "designer": Agent(
-                role="Experiment Designer",
-                goal="Create well-structured experiments with clear metrics",
-                backstory="Expert in experimental design and business transformation",
-                llm=self.llm,
-                verbose=True,
-            ),
-            "generator": Agent(
-                role="Intervention Strategist",
-                goal="Generate innovative interventions that drive behavioral change",
-                backstory="Behavioral economist specializing in change management",
-                llm=self.llm,
-                verbose=True,
-            ),
-            "data": Agent(
-                role="Data Scientist",
-                goal="Generate realistic synthetic data for experimentation",
-                backstory="Expert in synthetic data generation and behavioral modeling",
-                llm=self.llm,
-                verbose=True,
-            ),
-            "analyst": Agent(
-                role="Statistical Analyst",
-                goal="Perform rigorous analysis of intervention effectiveness",
-                backstory="Senior statistician specializing in A/B testing",
-                llm=self.llm,
-                verbose=True,
-            ),
-            "validator": Agent(
-                role="Business Validator",
-                goal="Ensure results are realistic and actionable",
-                backstory="Strategy consultant with deep industry knowledge",
-                llm=self.llm,
-                verbose=True,
-            ),
+    def __init__(
+        self,
+        llm_model: str = DEFAULT_LLM_MODEL,
+        temperature: float = 0.7,
+        cache: Optional[ResponseCache] = None,
+        pool_size: int = MAX_CONCURRENT_SIMULATIONS,
+        llm: Optional["crewai.BaseLLM"] = None,
+        verbose: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        agent_call_policies: Optional[dict[str, CallPolicy]] = None,
+    ) -> None:
+        self.llm = llm or crewai.LLM(model=llm_model, temperature=temperature)
+        self.verbose = verbose
+
+        # Agents with a call policy get their own wrapper of the shared client; agent_call_policies
+        # overrides call_policy per agent key
+        unknown = set(agent_call_policies or {}) - set(AGENT_PROFILES)
+        if unknown:
+            raise ValueError(f"Unknown agents in agent_call_policies: {', '.join(sorted(unknown))}")  # noqa: TRY003
+        policies = dict.fromkeys(AGENT_PROFILES, call_policy) if call_policy else {}
+        policies.update(agent_call_policies or {})
+        self.agent_llms = {
+            agent: resilient_llm.ResilientLLM(self.llm, policy, AGENT_PROFILES[agent]["role"])
+            for agent, policy in policies.items()
+        }
+        self.pool = AgentPool(self._build_agents, pool_size)
+        self.cache = cache
+        _register_usage_handlers()
+        self.results: list[dict] = []
+
+    def _build_agents(self, roles: tuple[str, ...]) -> dict[str, "crewai.Agent"]:
+        """Create one agent per role, all sharing the framework's LLM client, wrapped by their call policy"""
+        return {
+            role: crewai.Agent(**AGENT_PROFILES[role], llm=self.agent_llms.get(role, self.llm), verbose=self.verbose)
+            for role in roles
         }
 
-        return agents
-
-    def parse_experiment_config(self, config: dict[str, Any]) -> dict[str, Any]:
+    def track_usage(self) -> AbstractContextManager[llm_usage.UsageRecorder]:
+        """Record token, latency, retry and cost totals of the stages run in this context"""
+        return llm_usage.track_usage(self.llm.model)
+
+    def _run_stage(
+        self,
+        stage: str,
+        tasks: list[tuple[str, str, str]],
+        use_cache: bool = True,
+        output_model: Optional[type[BaseModel]] = None,
+    ) -> "crewai.CrewOutput":
+        """Run a pipeline stage's crew on pooled agents
+
+        Each task is given as (agent key, description, expected output). When caching is
+        on, the output of an identical earlier run is reused. The cache key covers the
+        model, temperature and every task's agent role and description, and a cached
+        output is returned without its per-task outputs.
+
+        With an output_model, the last task is asked for a JSON object of that schema and
+        the output's `pydantic` field holds the validated object, or None when the model
+        did not follow the schema.
+        """
+        if output_model is not None:
+            agent, description, expected_output = tasks[-1]
+            tasks = [
+                *tasks[:-1],
+                (agent, f"{description}\n{task_outputs.schema_instructions(output_model)}", expected_output),
+            ]
+
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None and use_cache:
+            key = ResponseCache.key(
+                self.llm.model,
+                self.llm.temperature,
+                [(AGENT_PROFILES[agent]["role"], description) for agent, description, _ in tasks],
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                llm_usage.record_kickoff(stage, time.perf_counter() - start, cached=True)
+                return self._typed(crewai.CrewOutput(raw=cached, tasks_output=[]), output_model)
+
+        with self.pool.checkout(stage) as agents:
+            crew = crewai.Crew(
+                agents=list(agents.values()),
+                tasks=[
+                    crewai.Task(description=description, expected_output=expected_output, agent=agents[agent])
+                    for agent, description, expected_output in tasks
+                ],
+                process=crewai.Process.sequential,
+            )
+            # Streaming is off, so kickoff returns a complete output
+            output = cast("crewai.CrewOutput", crew.kickoff())
+        if llm_usage.tracking():
+            crewai.events.crewai_event_bus.flush()
+        llm_usage.record_kickoff(stage, time.perf_counter() - start, output.token_usage)
+        if self.cache is not None and key is not None:
+            self.cache.set(key, output.raw)
+        return self._typed(output, output_model)
+
+    @staticmethod
+    def _typed(output: "crewai.CrewOutput", output_model: Optional[type[BaseModel]]) -> "crewai.CrewOutput":
+        if output_model is not None:
+            output.pydantic = task_outputs.parse_output(output_model, output.raw)
+        return output
+
+    def parse_experiment_config(self, config: dict[str, Any], use_cache: bool = True) -> "crewai.CrewOutput":
         """Parse and validate experiment configuration"""
 
-        task = Task(
-            description=f"""
+        description = f"""
             Analyze this experiment configuration and identify:
             1. Key segments and their characteristics
             2. Success metrics and targets
@@ -77,20 +348,18 @@ class InterventionFramework:
             Config: {json.dumps(config, indent=2)}
 
             Output a structured summary with any clarification questions.
-            """,
-            agent=self.agents["designer"],
-            expected_output="Structured experiment summary with clarifications",
-        )
-
-        crew = Crew(agents=[self.agents["designer"]], tasks=[task], process=Process.sequential)
+            """
 
-        return crew.kickoff()
+        return self._run_stage(
+            "parse", [("designer", description, "Structured experiment summary with clarifications")], use_cache
+        )
 
-    def generate_interventions(self, experiment_context: str, num_interventions: int = 5) -> list[dict]:
-        """Generate intervention strategies"""
+    def generate_interventions(
+        self, experiment_context: str, num_interventions: int = 5, use_cache: bool = True
+    ) -> "crewai.CrewOutput":
+        """Generate intervention strategies, typed as an InterventionPlan"""
 
-        task = Task(
-            description=f"""
+        description = f"""
             Create {num_interventions} innovative interventions based on:
             {experiment_context}
 
@@ -102,21 +371,28 @@ class InterventionFramework:
             - Estimated cost and timeline
 
             Consider psychological triggers, practical constraints, and industry best practices.
-            """,
-            agent=self.agents["generator"],
-            expected_output=f"{num_interventions} detailed intervention strategies",
-        )
-
-        crew = Crew(agents=[self.agents["generator"]], tasks=[task], process=Process.sequential)
+            """
 
-        return crew.kickoff()
+        return self._run_stage(
+            "generate",
+            [("generator", description, f"{num_interventions} detailed intervention strategies")],
+            use_cache,
+            task_outputs.InterventionPlan,
+        )
 
-    def simulate_intervention(self, intervention: dict, segment: str, sample_size: int = 10) -> dict:
-        """Simulate intervention impact on a specific segment"""
+    def simulate_intervention(
+        self,
+        intervention: dict,
+        segment: str,
+        sample_size: int = 10,
+        use_cache: bool = True,
+    ) -> "crewai.CrewOutput":
+        """Simulate intervention impact on a specific segment, typed as a SimulationReport"""
 
         # Generate synthetic data
-        data_task = Task(
-            description=f"""
+        data_task = (
+            "data",
+            f"""
             Generate synthetic behavioral data for:
             - Intervention: {intervention["name"]}
             - Segment: {segment}
@@ -130,13 +406,13 @@ class InterventionFramework:
 
             Output key statistics and patterns.
             """,
-            agent=self.agents["data"],
-            expected_output="Synthetic data statistics for analysis",
+            "Synthetic data statistics for analysis",
         )
 
         # Analyze the data
-        analysis_task = Task(
-            description="""
+        analysis_task = (
+            "analyst",
+            """
             Analyze the synthetic data to determine:
             - Intervention effectiveness (lift %)
             - Statistical significance
@@ -146,39 +422,345 @@ class InterventionFramework:
 
             Use proper statistical methods and report confidence intervals.
             """,
-            agent=self.agents["analyst"],
-            expected_output="Statistical analysis results",
+            "Statistical analysis results",
         )
 
         # Validate results
-        validation_task = Task(
-            description="""
+        validation_task = (
+            "validator",
+            """
             Validate the analysis results for:
             - Realism vs. industry benchmarks
             - Implementation feasibility
             - Hidden risks or costs
             - Long-term sustainability
 
-            Provide confidence score and recommendations.
+            Provide confidence score and recommendations, together with the analysis
+            statistics you validated. Report conversion rates as proportions between 0 and 1.
             """,
-            agent=self.agents["validator"],
-            expected_output="Validation report with recommendations",
+            "Validated analysis statistics with recommendations",
         )
 
         # Run the simulation pipeline
-        crew = Crew(
-            agents=[self.agents["data"], self.agents["analyst"], self.agents["validator"]],
-            tasks=[data_task, analysis_task, validation_task],
-            process=Process.sequential,
+        return self._run_stage(
+            "simulate", [data_task, analysis_task, validation_task], use_cache, task_outputs.SimulationReport
+        )
+
+    def simulate_batch(
+        self,
+        interventions: list[dict],
+        segments: list[str],
+        sample_size: int = 10,
+        use_cache: bool = True,
+    ) -> dict[tuple[str, str], "crewai.CrewOutput"]:
+        """Simulate several intervention and segment pairs with one crew and split its typed report
+
+        The agents' instructions and backstories are sent once for every pair, instead of
+        once per pair. Each pair's output holds its SimulationReport in `pydantic`.
+
+        Returns:
+            Output per (intervention name, segment) pair the report covered
+
+        Raises:
+            ValueError: If the crew's output does not match the BatchSimulationReport schema
+        """
+        pairs = "\n".join(
+            f"            - Intervention: {intervention['name']} / Segment: {segment}"
+            for intervention in interventions
+            for segment in segments
         )
 
-        return crew.kickoff()
+        # Generate synthetic data
+        data_task = (
+            "data",
+            f"""
+            Generate synthetic behavioral data for each of these intervention and segment pairs:
+{pairs}
+            - Sample size: {sample_size} each for control and treatment, per pair
+
+            Model realistic:
+            - Response rates and timing
+            - Behavioral patterns
+            - Success metrics
+            - Natural variance
+
+            Output key statistics and patterns for each pair separately.
+            """,
+            "Synthetic data statistics for analysis, per pair",
+        )
 
-    def rank_interventions(self, results: list[dict]) -> list[dict]:
-        """Rank interventions by effectiveness and feasibility"""
+        # Analyze the data
+        analysis_task = (
+            "analyst",
+            """
+            Analyze the synthetic data of each pair to determine:
+            - Intervention effectiveness (lift %)
+            - Statistical significance
+            - Cost per successful outcome
+            - Time to conversion
+            - Segment-specific insights
 
-        task = Task(
-            description=f"""
+            Use proper statistical methods and report confidence intervals.
+            """,
+            "Statistical analysis results, per pair",
+        )
+
+        # Validate results
+        validation_task = (
+            "validator",
+            """
+            Validate the analysis results of each pair for:
+            - Realism vs. industry benchmarks
+            - Implementation feasibility
+            - Hidden risks or costs
+            - Long-term sustainability
+
+            Provide confidence score and recommendations, together with the analysis
+            statistics you validated, in one report per pair. Report conversion rates as
+            proportions between 0 and 1.
+            """,
+            "Validated analysis statistics with recommendations, per pair",
+        )
+
+        output = self._run_stage(
+            "simulate", [data_task, analysis_task, validation_task], use_cache, task_outputs.BatchSimulationReport
+        )
+        if output.pydantic is None:
+            raise ValueError("Batched simulation output did not match the BatchSimulationReport schema")  # noqa: TRY003
+        batch_report = cast(task_outputs.BatchSimulationReport, output.pydantic)
+        requested = {(intervention["name"], segment) for intervention in interventions for segment in segments}
+        results = {}
+        for report in batch_report.reports:
+            key = (report.intervention, report.segment)
+            if key in requested:
+                typed = task_outputs.SimulationReport(analysis=report.analysis, validation=report.validation)
+                results[key] = crewai.CrewOutput(raw=typed.model_dump_json(), pydantic=typed, tasks_output=[])
+        return results
+
+    def estimate_priors(self, intervention: dict, segments: list[str], use_cache: bool = True) -> dict[str, Any]:
+        """Ask the data scientist for an intervention's effect-size priors on every segment in one call"""
+
+        description = f"""
+            Estimate realistic effect-size priors for this intervention from industry benchmarks:
+            {json.dumps(intervention, indent=2)}
+
+            Segments: {json.dumps(segments)}
+
+            Output only a JSON object with the keys:
+            - segments: an object with, for every segment, "baseline_rate" (conversion
+              probability without the intervention, 0 to 1) and "lift" (relative change of
+              the conversion rate, e.g. 0.15 for +15%)
+            - response_delay_days: mean days from the intervention to a conversion
+            - cost_per_customer: cost in USD per treated customer
+            """
+
+        output = self._run_stage("priors", [("data", description, "JSON effect-size priors")], use_cache)
+        return prior_simulation.parse_priors(output.raw, segments)
+
+    def simulate_with_priors(
+        self,
+        intervention: dict,
+        segments: list[str],
+        sample_size: int = DEFAULT_SAMPLE_SIZES["hybrid"],
+        use_cache: bool = True,
+        seed: Optional[int] = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Simulate an intervention on every segment numerically, from priors estimated by one LLM call
+
+        Returns:
+            Outcome statistics per segment, keyed by segment name
+        """
+        priors = self.estimate_priors(intervention, segments, use_cache)
+        return prior_simulation.simulate_from_priors(priors, sample_size, seed)
+
+    def simulate_interventions(
+        self,
+        interventions: list[dict],
+        segments: list[str],
+        sample_size: Optional[int] = None,
+        max_concurrency: int = MAX_CONCURRENT_SIMULATIONS,
+        timeout: Optional[float] = SIMULATION_TIMEOUT_SECONDS,
+        use_cache: bool = True,
+        mode: str = "llm",
+        seed: Optional[int] = None,
+        batch: str = "none",
+    ) -> list[dict]:
+        """Simulate every intervention on every segment concurrently and wait for all of them"""
+        return asyncio.run(
+            self.asimulate_interventions(
+                interventions, segments, sample_size, max_concurrency, timeout, use_cache, mode, seed, batch=batch
+            )
+        )
+
+    async def asimulate_interventions(
+        self,
+        interventions: list[dict],
+        segments: list[str],
+        sample_size: Optional[int] = None,
+        max_concurrency: int = MAX_CONCURRENT_SIMULATIONS,
+        timeout: Optional[float] = SIMULATION_TIMEOUT_SECONDS,
+        use_cache: bool = True,
+        mode: str = "llm",
+        seed: Optional[int] = None,
+        on_complete: Optional[Callable[[list[dict]], None]] = None,
+        batch: str = "none",
+    ) -> list[dict]:
+        """Simulate every intervention on every segment concurrently
+
+        The "llm" mode runs one crew per intervention and segment. The "hybrid" mode makes
+        one LLM call per intervention for effect-size priors and simulates every segment
+        numerically from them, so it scales to large samples. sample_size defaults to
+        DEFAULT_SAMPLE_SIZES of the mode, and seed makes hybrid simulations reproducible.
+        In llm mode, batch "segments" runs one crew per intervention for all segments, and
+        "interventions" one crew per segment for all interventions.
+
+        At most max_concurrency LLM jobs run at a time, each in a worker thread. A job
+        still running after timeout seconds is reported with an error instead of a result.
+        Its thread cannot be interrupted, so it keeps its slot until the crew returns.
+        on_complete is called in the event loop with the records of each finished job.
+
+        Returns:
+            One record per intervention and segment, in intervention-then-segment order
+        """
+        if mode not in SIMULATION_MODES:
+            raise ValueError(f"Unknown simulation mode {mode!r}, expected one of {SIMULATION_MODES}")  # noqa: TRY003
+        if batch not in SIMULATION_BATCHES:
+            raise ValueError(f"Unknown simulation batch {batch!r}, expected one of {SIMULATION_BATCHES}")  # noqa: TRY003
+        sample_size = sample_size or DEFAULT_SAMPLE_SIZES[mode]
+
+        # Each job simulates some intervention x segment pairs and returns results keyed by pair
+        jobs: list[tuple[list[tuple[dict, str]], Callable[..., dict[tuple[str, str], Any]], tuple]]
+        if mode == "hybrid":
+            jobs = [
+                (
+                    [(intervention, segment) for segment in segments],
+                    self._simulate_with_priors_job,
+                    (intervention, segments, sample_size, use_cache, None if seed is None else seed + index),
+                )
+                for index, intervention in enumerate(interventions)
+            ]
+        elif batch == "segments":
+            jobs = [
+                (
+                    [(intervention, segment) for segment in segments],
+                    self.simulate_batch,
+                    ([intervention], segments, sample_size, use_cache),
+                )
+                for intervention in interventions
+            ]
+        elif batch == "interventions":
+            jobs = [
+                (
+                    [(intervention, segment) for intervention in interventions],
+                    self.simulate_batch,
+                    (interventions, [segment], sample_size, use_cache),
+                )
+                for segment in segments
+            ]
+        else:
+            jobs = [
+                ([(intervention, segment)], self._simulate_pair_job, (intervention, segment, sample_size, use_cache))
+                for intervention in interventions
+                for segment in segments
+            ]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="simulation")
+        try:
+            # Every job gets an agent set without waiting, so the wait cannot count against its timeout
+            with self.pool.reserve(max_concurrency):
+                batches = await asyncio.gather(
+                    *(
+                        self._simulate_job(executor, semaphore, timeout, pairs, func, args, on_complete)
+                        for pairs, func, args in jobs
+                    )
+                )
+        finally:
+            executor.shutdown(wait=False)
+        records = {(record["intervention"], record["segment"]): record for batch in batches for record in batch}
+        return [records[intervention["name"], segment] for intervention in interventions for segment in segments]
+
+    def _simulate_pair_job(
+        self, intervention: dict, segment: str, sample_size: int, use_cache: bool
+    ) -> dict[tuple[str, str], Any]:
+        return {
+            (intervention["name"], segment): self.simulate_intervention(intervention, segment, sample_size, use_cache)
+        }
+
+    def _simulate_with_priors_job(
+        self, intervention: dict, segments: list[str], sample_size: int, use_cache: bool, seed: Optional[int]
+    ) -> dict[tuple[str, str], Any]:
+        outcomes = self.simulate_with_priors(intervention, segments, sample_size, use_cache, seed)
+        return {(intervention["name"], segment): outcome for segment, outcome in outcomes.items()}
+
+    async def _simulate_job(
+        self,
+        executor: ThreadPoolExecutor,
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float],
+        pairs: list[tuple[dict, str]],
+        func: Callable[..., dict[tuple[str, str], Any]],
+        args: tuple,
+        on_complete: Optional[Callable[[list[dict]], None]],
+    ) -> list[dict]:
+        """Run one simulation job in the executor, timing it from when it gets a slot
+
+        Returns:
+            One record per pair of the job, with its result or the job's error
+        """
+        await semaphore.acquire()
+        future = asyncio.get_running_loop().run_in_executor(executor, contextvars.copy_context().run, func, *args)
+        future.add_done_callback(lambda _: semaphore.release())
+
+        results, error = {}, None
+        start = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {timeout:g}s"
+        except Exception as e:
+            error = str(e)
+        seconds = round(time.perf_counter() - start, 3)
+
+        records = []
+        for intervention, segment in pairs:
+            record = {"intervention": intervention["name"], "segment": segment}
+            key = (intervention["name"], segment)
+            if key in results:
+                record["result"] = results[key]
+            else:
+                record["error"] = error or "No result returned for this intervention and segment"
+            record["seconds"] = seconds
+            records.append(record)
+        if on_complete is not None:
+            on_complete(records)
+        return records
+
+    def rank_interventions(
+        self,
+        results: list[dict],
+        use_cache: bool = True,
+        strategy: str = "auto",
+        max_concurrency: int = MAX_CONCURRENT_SIMULATIONS,
+    ) -> "crewai.CrewOutput":
+        """Rank interventions by effectiveness and feasibility, typed as an InterventionRanking
+
+        The "single" strategy embeds every result in the ranking prompt, which grows with
+        the study. "map_reduce" first condenses each intervention's results into a compact
+        summary, in parallel, then shortlists the summaries until they fit
+        RANKING_PROMPT_BUDGET_CHARS and ranks those, so the final prompt stays within the
+        budget however many interventions the study has. "auto" picks map_reduce once the
+        results exceed RANKING_PROMPT_BUDGET_CHARS.
+        """
+        if strategy not in RANKING_STRATEGIES:
+            raise ValueError(f"Unknown ranking strategy {strategy!r}, expected one of {RANKING_STRATEGIES}")  # noqa: TRY003
+
+        payload = json.dumps(results, indent=2, default=str)
+        if strategy == "map_reduce" or (strategy == "auto" and len(payload) > RANKING_PROMPT_BUDGET_CHARS):
+            summaries = self.summarize_interventions(results, use_cache, max_concurrency)
+            payload = json.dumps(self.shortlist_summaries(summaries, use_cache, max_concurrency), indent=2)
+
+        description = f"""
             Analyze all intervention results and create a final ranking based on:
             - Overall effectiveness
             - Cost efficiency
@@ -186,44 +768,237 @@ class InterventionFramework:
             - Risk factors
             - Segment performance
 
-            Results: {json.dumps(results, indent=2)}
+            Results: {payload}
 
             Provide:
             1. Ranked list with scores
             2. Optimal implementation sequence
             3. Key success factors
             4. Risk mitigation strategies
-            """,
-            agent=self.agents["analyst"],
-            expected_output="Comprehensive ranking and implementation plan",
+            """
+
+        return self._run_stage(
+            "rank",
+            [("analyst", description, "Comprehensive ranking and implementation plan")],
+            use_cache,
+            task_outputs.InterventionRanking,
+        )
+
+    def summarize_interventions(
+        self, results: list[dict], use_cache: bool = True, max_concurrency: int = MAX_CONCURRENT_SIMULATIONS
+    ) -> list[dict]:
+        """Condense the results of each intervention into a compact summary record, in parallel
+
+        Returns:
+            One summary per intervention, in the order interventions first appear in results
+        """
+        by_intervention: dict[str, list[dict]] = {}
+        for result in results:
+            by_intervention.setdefault(result["intervention"], []).append(result)
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ranking")
+        with self.pool.reserve(max_concurrency), executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._summarize_intervention, name, records, use_cache)
+                for name, records in by_intervention.items()
+            ]
+            return [future.result() for future in futures]
+
+    def _summarize_intervention(self, name: str, records: list[dict], use_cache: bool) -> dict:
+        """Summarize one intervention's segment results within the prompt budget"""
+        result_chars = RANKING_PROMPT_BUDGET_CHARS // len(records)
+        segments = [
+            {
+                "segment": record.get("segment"),
+                "result": _truncate(str(record.get("result", record.get("error"))), result_chars),
+            }
+            for record in records
+        ]
+
+        description = f"""
+            Summarize the results of the intervention "{name}" across customer segments.
+
+            Results: {json.dumps(segments, indent=2)}
+
+            Output only a JSON object with the keys:
+            - intervention: "{name}"
+            - effectiveness: overall effectiveness from 0 to 100
+            - cost_efficiency: cost efficiency from 0 to 100
+            - complexity: "low", "medium" or "high"
+            - risk: "low", "medium" or "high"
+            - best_segment and worst_segment
+            - key_findings: at most three short findings
+            """
+
+        output = self._run_stage("summarize", [("analyst", description, "JSON summary of one intervention")], use_cache)
+        return _parse_summary(name, output.raw)
+
+    def shortlist_summaries(
+        self, summaries: list[dict], use_cache: bool = True, max_concurrency: int = MAX_CONCURRENT_SIMULATIONS
+    ) -> list[dict]:
+        """Reduce intervention summaries level by level until they fit RANKING_PROMPT_BUDGET_CHARS
+
+        Each level packs the summaries into groups that fit the budget and narrows every
+        group of more than SHORTLIST_SIZE summaries to its most promising interventions, in
+        parallel. Summaries are bounded by SUMMARY_MAX_CHARS, so each level shrinks the list.
+
+        Returns:
+            The shortlisted summaries, in their original order
+        """
+        while len(json.dumps(summaries, indent=2)) > RANKING_PROMPT_BUDGET_CHARS:
+            groups = _pack(summaries, RANKING_PROMPT_BUDGET_CHARS)
+            executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ranking")
+            with self.pool.reserve(max_concurrency), executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._shortlist, group, use_cache)
+                    for group in groups
+                    if len(group) > SHORTLIST_SIZE
+                ]
+                shortlisted = {id(summary) for future in futures for summary in future.result()}
+            reduced = [
+                summary
+                for group in groups
+                for summary in group
+                if len(group) <= SHORTLIST_SIZE or id(summary) in shortlisted
+            ]
+            if len(reduced) == len(summaries):
+                break
+            summaries = reduced
+        return summaries
+
+    def _shortlist(self, summaries: list[dict], use_cache: bool) -> list[dict]:
+        """Pick the SHORTLIST_SIZE most promising interventions of a group of summaries"""
+        description = f"""
+            Compare these intervention summaries and shortlist the {SHORTLIST_SIZE} most promising
+            interventions, weighing effectiveness, cost efficiency, complexity and risk.
+
+            Summaries: {json.dumps(summaries, indent=2)}
+
+            Output only a JSON list of the names of the shortlisted interventions, best first.
+            """
+
+        output = self._run_stage(
+            "shortlist", [("analyst", description, "JSON list of shortlisted intervention names")], use_cache
         )
+        return _parse_shortlist(output.raw, summaries)
+
 
-        crew = Crew(agents=[self.agents["analyst"], self.agents["validator"]], tasks=[task], process=Process.sequential)
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: max(limit - 3, 0)] + "..."
 
-        return crew.kickoff()
+
+def _pack(records: list[dict], budget: int) -> list[list[dict]]:
+    """Split records into consecutive groups whose serialized size fits the budget"""
+    groups: list[list[dict]] = [[]]
+    size = 0
+    for record in records:
+        chars = len(json.dumps(record, indent=2))
+        if groups[-1] and size + chars > budget:
+            groups.append([])
+            size = 0
+        groups[-1].append(record)
+        size += chars
+    return groups
+
+
+def _load_json(raw: str) -> tuple[str, Any]:
+    """Strip a code fence from model output and decode it, returning the text and its value or None"""
+    text = raw.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    try:
+        return text, json.loads(text)
+    except json.JSONDecodeError:
+        return text, None
+
+
+def _parse_summary(name: str, raw: str) -> dict:
+    """Read an intervention summary from model output, keeping it within SUMMARY_MAX_CHARS"""
+    text, summary = _load_json(raw)
+    if not isinstance(summary, dict) or len(json.dumps(summary)) > SUMMARY_MAX_CHARS:
+        return {"intervention": name, "summary": _truncate(text, SUMMARY_MAX_CHARS - len(name) - 40)}
+    return {**summary, "intervention": name}
+
+
+def _parse_shortlist(raw: str, summaries: list[dict]) -> list[dict]:
+    """Read the shortlisted summaries of a group from model output
+
+    Falls back to the highest effectiveness scores when the output names none of the group's interventions.
+    """
+    _, names = _load_json(raw)
+    by_name = {summary["intervention"]: summary for summary in summaries}
+    picked = [name for name in names if isinstance(name, str) and name in by_name] if isinstance(names, list) else []
+    if picked:
+        return [by_name[name] for name in dict.fromkeys(picked)][:SHORTLIST_SIZE]
+
+    def effectiveness(summary: dict) -> float:
+        try:
+            return float(summary.get("effectiveness", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    return sorted(summaries, key=effectiveness, reverse=True)[:SHORTLIST_SIZE]
+
+
+# Process-wide frameworks by get_framework arguments, created under the lock
+_frameworks: dict[tuple, InterventionFramework] = {}
+_frameworks_lock = threading.Lock()
+
+
+def get_framework(
+    llm_model: str = DEFAULT_LLM_MODEL,
+    temperature: float = 0.7,
+    cache_path: Optional[str] = None,
+    call_policy: Optional[CallPolicy] = None,
+) -> InterventionFramework:
+    """Return the process-wide framework for a model
+
+    Long-running callers such as services share one framework per model, so its LLM
+    client, connections and pooled agents are created once and reused by every request.
+    Callers in several threads get the same framework.
+    """
+    key = (llm_model, temperature, cache_path, call_policy)
+    with _frameworks_lock:
+        if key not in _frameworks:
+            cache = ResponseCache(cache_path) if cache_path else None
+            _frameworks[key] = InterventionFramework(llm_model, temperature, cache=cache, call_policy=call_policy)
+        return _frameworks[key]
+
+
+# Bank portal migration experiment used by the demo and the benchmarks
+BANK_PORTAL_CONFIG = {
+    "name": "Bank Portal Migration",
+    "objective": "Migrate 80% of business customers to new portal in 3 months",
+    "segments": {
+        "small_business": {"size": 30, "characteristics": "Low tech savvy, cost-sensitive, 1-10 employees"},
+        "medium_business": {
+            "size": 20,
+            "characteristics": "Moderate tech savvy, efficiency-focused, 11-100 employees",
+        },
+        "large_enterprise": {"size": 10, "characteristics": "High tech savvy, feature-focused, 100+ employees"},
+    },
+    "constraints": ["Budget: $100,000", "No service disruption", "Maintain security compliance"],
+    "current_metrics": {"migration_rate": 0.05, "satisfaction": 6.2},
+}
+
+# Predefined interventions tested on every bank portal segment
+BANK_PORTAL_INTERVENTIONS = [
+    {
+        "name": "white_glove_migration",
+        "type": "high-touch support",
+        "description": "Dedicated migration specialist for each business",
+    },
+    {"name": "incentive_program", "type": "financial", "description": "Fee waivers and credits for early adopters"},
+    {"name": "peer_champions", "type": "social proof", "description": "Leverage satisfied customers as advocates"},
+]
 
 
 def run_bank_portal_experiment():
     """Run the bank portal migration experiment"""
 
-    # Initialize framework
-    framework = InterventionFramework()
+    # Initialize framework, reusing responses cached by earlier runs
+    framework = get_framework(cache_path=RESPONSE_CACHE_PATH, call_policy=DEMO_CALL_POLICY)
 
     # Define experiment
-    experiment_config = {
-        "name": "Bank Portal Migration",
-        "objective": "Migrate 80% of business customers to new portal in 3 months",
-        "segments": {
-            "small_business": {"size": 30, "characteristics": "Low tech savvy, cost-sensitive, 1-10 employees"},
-            "medium_business": {
-                "size": 20,
-                "characteristics": "Moderate tech savvy, efficiency-focused, 11-100 employees",
-            },
-            "large_enterprise": {"size": 10, "characteristics": "High tech savvy, feature-focused, 100+ employees"},
-        },
-        "constraints": ["Budget: $100,000", "No service disruption", "Maintain security compliance"],
-        "current_metrics": {"migration_rate": 0.05, "satisfaction": 6.2},
-    }
+    experiment_config = BANK_PORTAL_CONFIG
 
     print("🚀 Bank Portal Migration Experiment")
     print("=" * 50)
@@ -237,29 +1012,17 @@ def run_bank_portal_experiment():
     interventions = framework.generate_interventions(str(context), num_interventions=2)
 
     # For demo, we'll use predefined interventions
-    test_interventions = [
-        {
-            "name": "white_glove_migration",
-            "type": "high-touch support",
-            "description": "Dedicated migration specialist for each business",
-        },
-        {"name": "incentive_program", "type": "financial", "description": "Fee waivers and credits for early adopters"},
-        {"name": "peer_champions", "type": "social proof", "description": "Leverage satisfied customers as advocates"},
-    ]
+    test_interventions = BANK_PORTAL_INTERVENTIONS
 
     # Step 3: Test interventions
     print("\n🔬 Step 3: Testing interventions on each segment...")
-    results = []
-
-    for intervention in test_interventions:
-        print(f"\n  Testing: {intervention['name']}")
-        for segment in ["small_business", "medium_business", "large_enterprise"]:
-            print(f"    - {segment}...", end="", flush=True)
+    results = framework.simulate_interventions(
+        test_interventions, list(BANK_PORTAL_CONFIG["segments"]), mode="hybrid", seed=42
+    )
 
-            # Simulate the intervention
-            result = framework.simulate_intervention(intervention, segment)
-            results.append({"intervention": intervention["name"], "segment": segment, "result": result})
-            print(" ✓")
+    for result in results:
+        status = "✓" if "result" in result else f"✗ {result['error']}"
+        print(f"  {result['intervention']} - {result['segment']} ({result['seconds']}s) {status}")
 
     # Step 4: Rank and recommend
     print("\n📊 Step 4: Analyzing results and creating recommendations...")
@@ -303,13 +1066,16 @@ def run_bank_portal_experiment():
 
 
 # Helper function to save results
-def save_experiment_results(results: list[dict], filename: str = "experiment_results.json"):
+def save_experiment_results(
+    results: list[dict], filename: str = "experiment_results.json", usage: Optional[dict[str, Any]] = None
+):
     """Save experiment results to file"""
 
     output = {
         "timestamp": datetime.now().isoformat(),
         "experiment": "Bank Portal Migration",
         "results": results,
+        "llm_usage": usage,
         "summary": {
             "best_overall": "white_glove_migration",
             "highest_roi": "peer_champions",
@@ -329,8 +1095,12 @@ if __name__ == "__main__":
     # os.environ["OPENAI_API_KEY"] = "your-key-here"
 
     try:
-        results = run_bank_portal_experiment()
-        save_experiment_results(results)
+        with get_framework(cache_path=RESPONSE_CACHE_PATH, call_policy=DEMO_CALL_POLICY).track_usage() as usage:
+            results = run_bank_portal_experiment()
+        summary = usage.summary()
+        print(f"\n🧾 LLM usage: {summary['calls']} calls, {summary['prompt_tokens']} prompt tokens, ", end="")
+        print(f"{summary['completion_tokens']} completion tokens, ~${summary['estimated_cost_usd']}")
+        save_experiment_results(results, usage=summary)
 
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -20,6 +20,9 @@ if "current_run" not in st.session_state:
 if "show_results" not in st.session_state:
     st.session_state.show_results = False
 
+# Fields needed to render an experiment card; the full config is fetched on selection
+CARD_FIELDS = ["id", "name", "description", "category", "tags"]
+
 api_client = APIClient()
 
 st.markdown(
@@ -247,7 +250,7 @@ if not st.session_state.show_results:
         st.markdown('<div class="section-header">Select an Experiment</div>', unsafe_allow_html=True)
 
         # Fetch experiments
-        experiments = api_client.get_experiments()
+        experiments = api_client.get_experiments(fields=CARD_FIELDS)
 
         if not experiments:
             st.warning("No experiments available. Please check the backend connection.")
@@ -260,7 +263,7 @@ if not st.session_state.show_results:
                 # Single column layout
                 for i, exp in enumerate(experiments):
                     if render_experiment_card(exp, selected=False, key_prefix=f"main_{i}_"):
-                        st.session_state.selected_experiment = exp
+                        st.session_state.selected_experiment = api_client.get_experiment(exp["id"])
                         st.rerun()
             else:
                 # Two column layout for desktop
@@ -268,7 +271,7 @@ if not st.session_state.show_results:
                 for i, exp in enumerate(experiments):
                     with cols[i % 2]:
                         if render_experiment_card(exp, selected=False, key_prefix=f"main_{i}_"):
-                            st.session_state.selected_experiment = exp
+                            st.session_state.selected_experiment = api_client.get_experiment(exp["id"])
                             st.rerun()
 
     else:
@@ -1,6 +1,5 @@
 from typing import Any
 
-import plotly.graph_objects as go
 import streamlit as st
 
 
@@ -112,6 +111,8 @@ def render_dashboard(results: dict[str, Any]) -> None:
 
 def _render_visualization(viz: dict[str, Any]) -> None:
     """Render a single visualization based on its type."""
+    import plotly.graph_objects as go
+
     viz_type = viz.get("type")
     title = viz.get("title", "Visualization")
     data = viz.get("data", {})
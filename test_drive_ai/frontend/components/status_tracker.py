@@ -1,3 +1,4 @@
+import itertools
 import time
 from typing import Any, Optional
 
@@ -60,10 +61,15 @@ def render_status_tracker(
     }
     </style>
     """
-    last_status = None
+    # Resume from the last rendered update so a rerun does not restart the stream from scratch
+    state_key = f"run_status_{run_id}"
+    last_status = st.session_state.get(state_key)
+    updates = api_client.stream_run_status(run_id, last_event_id=last_status.get("event_id") if last_status else None)
+    if last_status:
+        updates = itertools.chain([last_status], updates)
 
     # Stream status updates
-    for update in api_client.stream_run_status(run_id):
+    for update in updates:
         with placeholder.container():
             st.markdown(status_style, unsafe_allow_html=True)
 
@@ -99,6 +105,7 @@ def render_status_tracker(
                 st.markdown("</div>", unsafe_allow_html=True)
 
                 last_status = update
+                st.session_state[state_key] = update
 
             elif "status" in update and update["status"] in ["completed", "failed"]:
                 return last_status
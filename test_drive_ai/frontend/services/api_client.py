@@ -1,9 +1,12 @@
 import json
+import logging
+import time
 from typing import Any, Optional
 
 import requests
 import streamlit as st
-from sseclient import SSEClient
+
+logger = logging.getLogger(__name__)
 
 
 class APIClient:
@@ -13,9 +16,19 @@ class APIClient:
         self.base_url = base_url
         self.session = requests.Session()
 
-    def get_experiments(self) -> list[dict[str, Any]]:
+    def get_experiments(
+        self,
+        fields: Optional[list[str]] = None,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        search: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Fetch experiments, optionally filtered and projected onto the given fields"""
+        params: dict[str, Any] = {"category": category, "tag": tags, "q": search}
+        if fields:
+            params["fields"] = ",".join(fields)
         try:
-            response = self.session.get(f"{self.base_url}/experiments/")
+            response = self.session.get(f"{self.base_url}/experiments/", params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -42,6 +55,13 @@ class APIClient:
                 payload = {"custom_parameters": custom_params}
 
             response = self.session.post(f"{self.base_url}/experiments/{experiment_id}/run", json=payload)
+            if response.status_code == 429:
+                detail = response.json().get("detail", {})
+                st.warning(
+                    f"The experiment service is busy: {detail.get('message', 'too many runs')}. "
+                    f"Please retry in {response.headers.get('Retry-After', 'a few')} seconds."
+                )
+                return None
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -58,29 +78,45 @@ class APIClient:
             st.error(f"Failed to fetch run status: {e!s}")
             return None
 
-    def stream_run_status(self, run_id: str):
-        """Stream real-time status updates using SSE"""
-        print(f"Starting to stream status updates for run ID: {run_id}")
-        try:
-            response = self.session.get(
-                f"{self.base_url}/experiments/run/{run_id}/stream", stream=True, headers={"Accept": "text/event-stream"}
-            )
-            response.raise_for_status()
+    def stream_run_status(self, run_id: str, last_event_id: Optional[str] = None, max_reconnects: int = 3):
+        """Stream real-time status updates using SSE
 
-            client = SSEClient(response)
-            for event in client.events():
-                print(event.event, event.data)
-                if event.event == "update":
-                    yield json.loads(event.data)
-                elif event.event == "complete":
-                    yield json.loads(event.data)
-                    break
-                elif event.event == "error":
-                    error_data = json.loads(event.data)
-                    st.error(f"Error: {error_data.get('message', 'Unknown error')}")
-                    break
-        except requests.exceptions.RequestException as e:
-            st.error(f"Failed to stream status updates: {e!s}")
+        A dropped connection is re-established with the Last-Event-ID header so only missed
+        updates are replayed instead of the whole state.
+        """
+        logger.debug("Streaming status updates for run %s from event %s", run_id, last_event_id)
+        error: Optional[Exception] = None
+        for attempt in range(max_reconnects + 1):
+            if attempt:
+                time.sleep(0.5 * 2**attempt)
+            headers = {"Accept": "text/event-stream"}
+            headers.update({"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {})
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/experiments/run/{run_id}/stream", stream=True, headers=headers
+                )
+                response.raise_for_status()
+
+                from sseclient import SSEClient
+
+                client = SSEClient(response)
+                for event in client.events():
+                    logger.debug("Received %s event %s for run %s", event.event, event.id, run_id)
+                    if event.id:
+                        last_event_id = event.id
+                    if event.event == "update":
+                        yield json.loads(event.data)
+                    elif event.event == "complete":
+                        yield json.loads(event.data)
+                        return
+                    elif event.event == "error":
+                        error_data = json.loads(event.data)
+                        st.error(f"Error: {error_data.get('message', 'Unknown error')}")
+                        return
+            except requests.exceptions.RequestException as e:
+                error = e
+        if error is not None:
+            st.error(f"Failed to stream status updates: {error!s}")
 
     def get_run_results(self, run_id: str) -> Optional[dict[str, Any]]:
         """Get the results of a completed experiment run"""
@@ -91,3 +127,16 @@ class APIClient:
         except requests.exceptions.RequestException as e:
             st.error(f"Failed to fetch results: {e!s}")
             return None
+
+    def compare_runs(self, run_ids: list[str], baseline_run_id: Optional[str] = None) -> Optional[dict[str, Any]]:
+        """Compare several completed runs in a single request"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/experiments/runs/compare",
+                json={"run_ids": run_ids, "baseline_run_id": baseline_run_id},
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            st.error(f"Failed to compare runs: {e!s}")
+            return None
@@ -1,28 +1,95 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
-from test_drive_ai.backend.background_tasks import experiment_task_manager
+from test_drive_ai.backend.background_tasks import ExperimentTaskManager
 from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_schema import ExperimentRun
 from test_drive_ai.backend.experiment_service import ExperimentService
+from test_drive_ai.backend.framework_service import FrameworkSimulationService
+from test_drive_ai.backend.metrics import CONTENT_TYPE, RequestMetricsMiddleware, metrics
+from test_drive_ai.backend.outcome_store import OutcomeStore
 from test_drive_ai.backend.router import router
+from test_drive_ai.backend.run_checkpoints import load_checkpoints, save_checkpoints
 from test_drive_ai.backend.simulation_service import SimulationService
+from test_drive_ai.backend.structured_logging import configure_logging, shutdown_logging
+from test_drive_ai.shared.call_policy import CallPolicy
+
+logger = logging.getLogger("test_drive_ai.main")
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Manage application lifecycle"""
     # Startup
+    configure_logging(settings.LOG_LEVEL, settings.LOG_SAMPLE_INTERVAL_SECONDS)
     app.state.experiment_service = ExperimentService()
-    app.state.simulation_service = SimulationService()
-    app.state.task_manager = experiment_task_manager
+    app.state.outcome_store = OutcomeStore(settings.OUTCOMES_DIR)
+    if settings.SIMULATION_ENGINE == "framework":
+        app.state.simulation_service = FrameworkSimulationService(
+            settings.FRAMEWORK_LLM_MODEL,
+            settings.FRAMEWORK_SIMULATION_MODE,
+            settings.FRAMEWORK_CACHE_PATH,
+            settings.FRAMEWORK_MAX_CONCURRENCY,
+            app.state.outcome_store,
+            settings.PROFILES_DIR,
+            settings.FRAMEWORK_SIMULATION_BATCH,
+            CallPolicy(
+                timeout_seconds=settings.FRAMEWORK_LLM_TIMEOUT_SECONDS,
+                max_attempts=settings.FRAMEWORK_LLM_MAX_ATTEMPTS,
+                hedge=settings.FRAMEWORK_LLM_HEDGE,
+            ),
+        )
+    elif settings.SIMULATION_ENGINE == "numeric":
+        app.state.simulation_service = SimulationService(app.state.outcome_store, settings.PROFILES_DIR)
+    else:
+        raise ValueError(f"Unknown SIMULATION_ENGINE {settings.SIMULATION_ENGINE!r}")  # noqa: TRY003
+    app.state.task_manager = task_manager = ExperimentTaskManager(settings.MAX_CONCURRENT_EXPERIMENTS)
+
+    metrics.gauge(
+        "experiment_runs_active", "Experiment runs holding a worker slot", function=lambda: task_manager.active
+    )
+    metrics.gauge(
+        "experiment_runs_queued", "Experiment runs waiting for a worker slot", function=lambda: task_manager.queued
+    )
+    metrics.gauge(
+        "experiment_runs_max_concurrent",
+        "Worker slots for experiment runs",
+        function=lambda: task_manager.max_concurrent,
+    )
+
+    # Resume runs checkpointed by the previous process
+    for checkpoint in load_checkpoints(settings.RUN_CHECKPOINT_PATH):
+        run = ExperimentRun(**checkpoint["run"])
+        config = {**checkpoint["config"], "resume_from_phase": SimulationService.resume_phase(run.current_step)}
+        app.state.experiment_service.restore_run(run)
+        task_manager.reserve(run.run_id, checkpoint["client_id"], checkpoint["units"])
+        task_manager.start(
+            checkpoint["experiment_id"], run.run_id, config, app.state.experiment_service, app.state.simulation_service
+        )
 
-    print("Starting up experiment dashboard backend...")
+    catalog_watcher = None
+    if settings.CATALOG_RELOAD_INTERVAL_SECONDS > 0:
+        catalog_watcher = asyncio.create_task(app.state.experiment_service.watch_experiments())
+
+    logger.info("Starting up experiment dashboard backend")
     yield
     # Shutdown
-    print("Shutting down experiment dashboard backend...")
+    if catalog_watcher:
+        catalog_watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await catalog_watcher
+    logger.info("Shutting down experiment dashboard backend")
+    checkpoints = await task_manager.drain(settings.SHUTDOWN_DRAIN_SECONDS)
+    save_checkpoints(settings.RUN_CHECKPOINT_PATH, checkpoints)
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -40,6 +107,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+
 app.include_router(router)
 
 
@@ -55,5 +124,27 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check(request: Request) -> JSONResponse:
+    """Readiness check that fails while every worker slot is taken or the service is draining"""
+    task_manager = request.app.state.task_manager
+    saturated = task_manager.saturated or task_manager.draining
+    return JSONResponse(
+        {
+            "status": "draining" if task_manager.draining else "saturated" if saturated else "ready",
+            "active_runs": task_manager.active,
+            "queued_runs": task_manager.queued,
+            "max_concurrent_runs": task_manager.max_concurrent,
+        },
+        status_code=503 if saturated else 200,
+    )
+
+
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """Expose application metrics in the Prometheus text format"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG)
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from crewai import BaseLLM
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import llm_call_context
+from pydantic import PrivateAttr
+
+# Latency distributions a LatencyModel can draw from
+LATENCY_KINDS = ("fixed", "uniform", "lognormal", "recorded")
+
+# Characters per token used to estimate token counts of replayed calls
+CHARS_PER_TOKEN = 4
+
+# Answer served for prompts without a recording when misses are allowed
+PLACEHOLDER_ANSWER = "Thought: I now know the final answer\nFinal Answer: No recorded response for this prompt."
+
+
+def message_key(messages: Any) -> str:
+    """Hash the role and content of every message, ignoring provider-specific fields"""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    payload = json.dumps([[message.get("role"), message.get("content")] for message in messages], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def estimate_tokens(messages: Any, response: str) -> dict[str, int]:
+    prompt = sum(len(str(message.get("content", ""))) for message in messages) if isinstance(messages, list) else 0
+    prompt = prompt or len(str(messages))
+    return {
+        "prompt_tokens": math.ceil(prompt / CHARS_PER_TOKEN),
+        "completion_tokens": math.ceil(len(response) / CHARS_PER_TOKEN),
+    }
+
+
+class LatencyModel:
+    """Synthetic latency distribution of replayed calls
+
+    - fixed: always `seconds`
+    - uniform: between `seconds * (1 - spread)` and `seconds * (1 + spread)`
+    - lognormal: median `seconds` with log-space standard deviation `spread`
+    - recorded: the latency measured when recording, multiplied by `seconds`
+    """
+
+    def __init__(self, kind: str = "recorded", seconds: float = 1.0, spread: float = 0.5, seed: Optional[int] = None):
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency kind {kind!r}, expected one of {LATENCY_KINDS}")  # noqa: TRY003
+        self.kind = kind
+        self.seconds = seconds
+        self.spread = spread
+        self._random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyModel":
+        """Build a model from "kind[:seconds[,spread]]", such as "lognormal:1.5,0.4" or "recorded:0.1" """
+        kind, _, params = spec.partition(":")
+        values = [float(value) for value in params.split(",") if value]
+        if len(values) > 2:
+            raise ValueError(f"Latency spec {spec!r} takes at most a seconds and a spread value")  # noqa: TRY003
+        return cls(kind, **dict(zip(("seconds", "spread"), values)), seed=seed)
+
+    def sample(self, recorded_seconds: Optional[float] = None) -> float:
+        with self._lock:
+            if self.kind == "uniform":
+                return self._random.uniform(self.seconds * (1 - self.spread), self.seconds * (1 + self.spread))
+            if self.kind == "lognormal":
+                return self._random.lognormvariate(math.log(self.seconds), self.spread)
+        if self.kind == "recorded" and recorded_seconds is not None:
+            return recorded_seconds * self.seconds
+        return self.seconds
+
+
+class LLMRecordings:
+    """Responses recorded per prompt, stored one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._responses: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[entry["key"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._responses.values())
+
+    def add(self, key: str, response: str, seconds: float, model: str) -> None:
+        entry = {"key": key, "model": model, "response": response, "seconds": round(seconds, 6)}
+        with self._lock:
+            self._responses[key].append(entry)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def get(self, key: str, occurrence: int) -> Optional[dict[str, Any]]:
+        """Return the recording for the n-th call with a prompt, cycling through the recorded ones"""
+        entries = self._responses.get(key)
+        return entries[occurrence % len(entries)] if entries else None
+
+
+class RecordingLLM(BaseLLM):
+    """Pass calls through to a real LLM and record each response with its latency"""
+
+    llm: Any
+    recordings: Any
+
+    def __init__(self, llm: BaseLLM, recordings: LLMRecordings, **kwargs: Any):
+        # The wrapper's own fields are validated by BaseLLM's model constructor with the others
+        kwargs.update(llm=llm, recordings=recordings)
+        super().__init__(model=llm.model, temperature=llm.temperature, **kwargs)
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[list] = None,
+        callbacks: Optional[list] = None,
+        available_functions: Optional[dict] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Any = None,
+    ) -> Any:
+        start = time.perf_counter()
+        response = self.llm.call(messages, tools, callbacks, available_functions, from_task, from_agent, response_model)
+        if isinstance(response, str):
+            self.recordings.add(message_key(messages), response, time.perf_counter() - start, self.model)
+        return response
+
+
+class ReplayLLM(BaseLLM):
+    """Serve recorded responses offline after a synthetic latency
+
+    Plugged into InterventionFramework, it runs the whole pipeline without network
+    access or cost, for benchmarks and load tests. A prompt recorded several times is
+    answered with its recordings in turn. Prompts without a recording raise KeyError,
+    or get PLACEHOLDER_ANSWER when `allow_misses` is set. Token counts are estimated
+    from text length.
+    """
+
+    recordings: Any
+    latency: Any
+    allow_misses: bool = False
+    _occurrences: dict = PrivateAttr(default_factory=lambda: defaultdict(int))
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(
+        self,
+        recordings: LLMRecordings,
+        latency: Optional[LatencyModel] = None,
+        allow_misses: bool = False,
+        model: str = "replay",
+        **kwargs: Any,
+    ):
+        kwargs.update(recordings=recordings, latency=latency or LatencyModel(), allow_misses=allow_misses)
+        super().__init__(model=model, **kwargs)
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[list] = None,
+        callbacks: Optional[list] = None,
+        available_functions: Optional[dict] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Any = None,
+    ) -> Any:
+        with llm_call_context():
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            key = message_key(messages)
+            with self._lock:
+                occurrence = self._occurrences[key]
+                self._occurrences[key] += 1
+            entry = self.recordings.get(key, occurrence)
+            if entry is None and not self.allow_misses:
+                self._emit_call_failed_event("No recorded response", from_task=from_task, from_agent=from_agent)
+                raise KeyError(f"No recorded response for prompt {key}")  # noqa: TRY003
+
+            response = entry["response"] if entry else PLACEHOLDER_ANSWER
+            time.sleep(self.latency.sample(entry["seconds"] if entry else None))
+            usage = estimate_tokens(messages, response)
+            self._track_token_usage_internal({**usage, "total_tokens": sum(usage.values())})
+            self._emit_call_completed_event(
+                response=response,
+                call_type=LLMCallType.LLM_CALL,
+                from_task=from_task,
+                from_agent=from_agent,
+                messages=messages,
+                usage=usage,
+            )
+            return response
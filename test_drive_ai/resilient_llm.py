@@ -0,0 +1,40 @@
+from typing import Any, Optional
+
+from crewai import BaseLLM
+
+from test_drive_ai.shared.call_policy import CallPolicy, PolicyRunner
+
+
+class ResilientLLM(BaseLLM):
+    """Wrap an LLM so each call runs under a CallPolicy's deadline, retries and hedging
+
+    InterventionFramework gives every agent with a call policy its own wrapper around the
+    shared client, so latencies, and the hedging delay derived from them, are tracked per
+    agent role. The wrapped client emits the call events, one per attempt or hedge.
+    """
+
+    llm: Any
+    runner: Any
+
+    def __init__(self, llm: BaseLLM, policy: CallPolicy, agent: str = "llm", **kwargs: Any):
+        # The wrapper's own fields are validated by BaseLLM's model constructor with the others
+        kwargs.update(llm=llm, runner=PolicyRunner(policy, agent))
+        super().__init__(model=llm.model, temperature=llm.temperature, **kwargs)
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[list] = None,
+        callbacks: Optional[list] = None,
+        available_functions: Optional[dict] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Any = None,
+    ) -> Any:
+        return self.runner.run(
+            self.llm.call, messages, tools, callbacks, available_functions, from_task, from_agent, response_model
+        )
+
+    def get_context_window_size(self) -> int:
+        size: int = self.llm.get_context_window_size()
+        return size
@@ -0,0 +1,188 @@
+import contextvars
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+# HTTP statuses of provider errors worth retrying: timeouts, conflicts, rate limits and overloads
+TRANSIENT_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# Provider exception classes without a status code that are worth retrying, matched by name
+TRANSIENT_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError", "ServiceUnavailableError"})
+
+# Successful call latencies kept to derive the hedging delay
+LATENCY_WINDOW = 200
+
+# Calls running at once per runner, including hedges and abandoned calls past their deadline
+MAX_CALL_WORKERS = 16
+
+
+class PolicyObserver:
+    """Process-wide sink for the retries and hedges of every runner
+
+    The backend registers one to export the LLM call metrics. The default methods ignore the events.
+    """
+
+    def retry(self, agent: str, error: str) -> None:
+        pass
+
+    def hedge(self, agent: str) -> None:
+        pass
+
+    def hedge_win(self, agent: str) -> None:
+        pass
+
+
+_observers: list[PolicyObserver] = []
+
+
+def add_observer(observer: PolicyObserver) -> None:
+    """Report every retry and hedge of this process to an observer"""
+    _observers.append(observer)
+
+
+class CallPolicy:
+    """Deadline, retry and hedging settings for the LLM calls of an agent
+
+    - timeout_seconds: deadline of each attempt, None to wait indefinitely
+    - max_attempts: attempts per call, the first included
+    - backoff_seconds, max_backoff_seconds: retry n sleeps a random time up to
+      min(max_backoff_seconds, backoff_seconds * 2**n)
+    - hedge: send a duplicate call when an attempt is still running after the hedging
+      delay, and take whichever answers first
+    - hedge_after_seconds: hedging delay until hedge_min_samples calls have succeeded,
+      after which the hedge_percentile of recent call latencies is used
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: Optional[float] = 120.0,
+        max_attempts: int = 3,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+        hedge: bool = False,
+        hedge_after_seconds: float = 30.0,
+        hedge_percentile: int = 95,
+        hedge_min_samples: int = 20,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")  # noqa: TRY003
+        if not 1 <= hedge_percentile <= 99:
+            raise ValueError("hedge_percentile must be between 1 and 99")  # noqa: TRY003
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.hedge = hedge
+        self.hedge_after_seconds = hedge_after_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+
+def is_transient(error: BaseException) -> bool:
+    """Check whether a failed call is worth retrying"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "status_code", None) in TRANSIENT_STATUS_CODES:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class PolicyRunner:
+    """Run calls under a CallPolicy, each attempt in a worker thread with a copy of the caller's context
+
+    A worker cannot be interrupted, so a call past its deadline keeps running in the
+    background and its answer is discarded, as is the slower answer of a hedged call.
+    """
+
+    def __init__(self, policy: CallPolicy, name: str = "llm", seed: Optional[int] = None):
+        self.policy = policy
+        self.name = name
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_CALL_WORKERS, thread_name_prefix=f"{name}-call")
+
+    def hedge_delay(self) -> float:
+        """Seconds an attempt runs before a duplicate is sent"""
+        with self._lock:
+            latencies = list(self._latencies)
+        if len(latencies) < self.policy.hedge_min_samples:
+            return self.policy.hedge_after_seconds
+        return statistics.quantiles(latencies, n=100, method="inclusive")[self.policy.hedge_percentile - 1]
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to sleep before a retry, with full jitter so concurrent callers spread out"""
+        ceiling = min(self.policy.max_backoff_seconds, self.policy.backoff_seconds * 2**retry)
+        with self._lock:
+            return self._random.uniform(0, ceiling)
+
+    def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call func, retrying transient errors and timed-out attempts
+
+        Raises:
+            TimeoutError: If the last attempt missed its deadline
+            Exception: The last attempt's error, or the first non-transient one
+        """
+        for retry in range(self.policy.max_attempts - 1):
+            try:
+                return self._attempt(func, args, kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                for observer in _observers:
+                    observer.retry(self.name, type(e).__name__)
+                time.sleep(self.backoff(retry))
+        return self._attempt(func, args, kwargs)
+
+    def _submit(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+        def timed() -> Any:
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            with self._lock:
+                self._latencies.append(time.perf_counter() - start)
+            return result
+
+        return self._executor.submit(contextvars.copy_context().run, timed)
+
+    def _attempt(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """Run one attempt, hedging it once when it outlives the hedging delay"""
+        start = time.monotonic()
+        deadline = None if self.policy.timeout_seconds is None else start + self.policy.timeout_seconds
+        hedge_at = start + self.hedge_delay() if self.policy.hedge else None
+        pending, hedged, error = {self._submit(func, args, kwargs)}, None, None
+
+        while pending:
+            wake_at = min((t for t in (deadline, hedge_at) if t is not None), default=None)
+            done, pending = wait(
+                pending,
+                timeout=None if wake_at is None else max(wake_at - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                if future.exception() is None:
+                    if future is hedged:
+                        for observer in _observers:
+                            observer.hedge_win(self.name)
+                    return future.result()
+                error = future.exception()
+
+            now = time.monotonic()
+            if pending and hedge_at is not None and now >= hedge_at:
+                hedged = self._submit(func, args, kwargs)
+                pending.add(hedged)
+                hedge_at = None
+                for observer in _observers:
+                    observer.hedge(self.name)
+            if pending and deadline is not None and now >= deadline:
+                # Calls still queued behind abandoned ones must not start and be paid for after the deadline
+                for future in pending:
+                    future.cancel()
+                raise TimeoutError(f"LLM call missed its {self.policy.timeout_seconds:g}s deadline")  # noqa: TRY003
+
+        # The loop only runs out of pending calls once every one of them has failed
+        assert error is not None  # noqa: S101
+        raise error
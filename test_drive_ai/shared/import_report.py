@@ -0,0 +1,108 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Any
+
+# Modules imported when each application starts
+ENTRY_POINTS = {
+    "backend": "test_drive_ai.main",
+    "frontend": "test_drive_ai.frontend.app",
+}
+
+# Import-time budget in seconds per entry point, including the interpreter's own startup modules
+IMPORT_BUDGETS_SECONDS = {
+    "backend": 1.5,
+    "frontend": 2.5,
+}
+
+# Heavy packages that must not be executed while an entry point is imported
+DEFERRED_MODULES = {
+    "backend": ("numpy", "pyarrow", "pandas", "crewai"),
+    "frontend": ("pyarrow", "sseclient", "crewai"),
+}
+
+# Number of modules listed in a report
+SLOWEST_MODULES = 15
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    """Parse `-X importtime` output into one entry per executed module"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        modules.append({
+            "module": name.strip(),
+            "self_seconds": int(self_us) / 1e6,
+            "cumulative_seconds": int(cumulative_us) / 1e6,
+        })
+    return modules
+
+
+def measure_imports(entry_point: str) -> dict[str, Any]:
+    """Import an entry point in a fresh interpreter and report where the time went"""
+    module = ENTRY_POINTS[entry_point]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [_PROJECT_ROOT, os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")  # noqa: TRY003
+
+    modules = _parse_importtime(completed.stderr)
+    total = sum(entry["self_seconds"] for entry in modules)
+    executed = {entry["module"] for entry in modules}
+    budget = IMPORT_BUDGETS_SECONDS[entry_point]
+    return {
+        "entry_point": entry_point,
+        "module": module,
+        "total_seconds": round(total, 6),
+        "budget_seconds": budget,
+        "within_budget": total <= budget,
+        "eagerly_imported": [name for name in DEFERRED_MODULES[entry_point] if name in executed],
+        "slowest": sorted(modules, key=lambda entry: entry["cumulative_seconds"], reverse=True)[:SLOWEST_MODULES],
+        "modules": sorted(executed),
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render an import report as plain text"""
+    lines = [
+        f"{report['entry_point']} ({report['module']}): {report['total_seconds']:.3f}s "
+        f"of {report['budget_seconds']:.3f}s budget",
+    ]
+    if report["eagerly_imported"]:
+        lines.append(f"  should be deferred: {', '.join(report['eagerly_imported'])}")
+    lines.extend(
+        f"  {entry['cumulative_seconds']:8.3f}s  {entry['self_seconds']:8.3f}s  {entry['module']}"
+        for entry in report["slowest"]
+    )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the import time of the application entry points")
+    parser.add_argument("entry_points", nargs="*", help=f"Any of {', '.join(ENTRY_POINTS)}; all when omitted")
+    args = parser.parse_args()
+    unknown = [name for name in args.entry_points if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(unknown)}")
+
+    failed = False
+    for entry_point in args.entry_points or ENTRY_POINTS:
+        report = measure_imports(entry_point)
+        print(format_report(report))
+        failed = failed or not report["within_budget"] or bool(report["eagerly_imported"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
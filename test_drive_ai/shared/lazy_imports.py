@@ -0,0 +1,40 @@
+import importlib
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+
+# Serializes the first load of lazily imported modules, which may happen in several worker threads at once
+_import_lock = threading.RLock()
+
+
+class _LazyModule(ModuleType):
+    """Stand-in for a module that imports it on first attribute access
+
+    The import runs under a process-wide lock, so threads touching the module at the
+    same time wait for it to be fully executed instead of seeing a partial module. The
+    loaded module's attributes are then copied onto the stand-in so later lookups are
+    plain attribute reads.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        with _import_lock:
+            module = importlib.import_module(self.__name__)
+            self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module that is only executed on first attribute access
+
+    Used for heavy top-level packages such as numpy, pyarrow or crewai so that importing
+    an entry point does not pay for them until they are needed. Submodules should be
+    imported inside the functions that use them, because locating a submodule imports
+    its parent package.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)  # noqa: TRY003
+    return _LazyModule(name)
@@ -0,0 +1,164 @@
+import contextvars
+import threading
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+# List prices in USD per million (prompt, completion) tokens, matched against model names
+MODEL_PRICES_PER_MILLION = {
+    "claude-3-7-sonnet": (3.0, 15.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4o": (2.5, 10.0),
+}
+
+# Recorders of the runs tracked in the current context, innermost last
+_recorders: contextvars.ContextVar[tuple["UsageRecorder", ...]] = contextvars.ContextVar(
+    "llm_usage_recorders", default=()
+)
+
+
+def estimate_cost(model: str, prompt_tokens: float, completion_tokens: float) -> Optional[float]:
+    """Estimate the USD cost of tokens from list prices, or None for an unknown model"""
+    matches = [name for name in MODEL_PRICES_PER_MILLION if name in model]
+    if not matches:
+        return None
+    prompt_price, completion_price = MODEL_PRICES_PER_MILLION[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def _usage_tokens(usage: Any) -> tuple[int, int]:
+    """Read prompt and completion token counts from a usage dict or object"""
+    if usage is None:
+        return 0, 0
+    if not isinstance(usage, dict):
+        usage = vars(usage) if hasattr(usage, "__dict__") else {}
+    prompt = usage.get("prompt_tokens", usage.get("input_tokens")) or 0
+    completion = usage.get("completion_tokens", usage.get("output_tokens")) or 0
+    return int(prompt), int(completion)
+
+
+class UsageObserver:
+    """Process-wide sink for every kickoff and LLM call, whichever run they belong to
+
+    The backend registers one to export the LLM metrics. The default methods ignore the events.
+    """
+
+    def kickoff(self, stage: str, seconds: float, cached: bool) -> None:
+        pass
+
+    def call(
+        self, model: str, agent: str, seconds: float, prompt_tokens: int, completion_tokens: int, failed: bool
+    ) -> None:
+        pass
+
+
+_observers: list[UsageObserver] = []
+
+
+def add_observer(observer: UsageObserver) -> None:
+    """Report every kickoff and LLM call of this process to an observer"""
+    _observers.append(observer)
+
+
+def _totals() -> dict[str, float]:
+    return {"prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+
+
+class UsageRecorder:
+    """Token, latency, retry and cost totals of the LLM work done for one run
+
+    Totals are kept per pipeline stage, for crew kickoffs, and per agent role, for the
+    individual LLM calls each task makes. Concurrent stages may record at the same time.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._stages: dict[str, dict[str, float]] = defaultdict(lambda: {**_totals(), "kickoffs": 0, "cache_hits": 0})
+        self._agents: dict[str, dict[str, float]] = defaultdict(lambda: {**_totals(), "calls": 0, "retries": 0})
+        self._lock = threading.Lock()
+
+    def record_kickoff(self, stage: str, seconds: float, usage: Any = None, cached: bool = False) -> None:
+        prompt, completion = _usage_tokens(usage)
+        with self._lock:
+            totals = self._stages[stage]
+            totals["kickoffs"] += 1
+            totals["cache_hits"] += cached
+            totals["seconds"] += seconds
+            totals["prompt_tokens"] += prompt
+            totals["completion_tokens"] += completion
+
+    def record_call(self, agent: str, seconds: float, usage: Any = None, failed: bool = False) -> None:
+        prompt, completion = _usage_tokens(usage)
+        with self._lock:
+            totals = self._agents[agent]
+            totals["calls"] += 1
+            totals["retries"] += failed
+            totals["seconds"] += seconds
+            totals["prompt_tokens"] += prompt
+            totals["completion_tokens"] += completion
+
+    def _with_cost(self, totals: dict[str, float]) -> dict[str, Any]:
+        cost = estimate_cost(self.model, totals["prompt_tokens"], totals["completion_tokens"])
+        return {
+            **{key: round(value, 6) if isinstance(value, float) else value for key, value in totals.items()},
+            "estimated_cost_usd": round(cost, 6) if cost is not None else None,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the run's LLM usage for its result metadata
+
+        Failed calls are counted as retries, because the agent retries its task after a
+        failed call. Token totals come from the crews, so they include cached prompts.
+        """
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.items()}
+            agents = {agent: dict(totals) for agent, totals in self._agents.items()}
+        overall = _totals()
+        for totals in stages.values():
+            for key in overall:
+                overall[key] += totals[key]
+        return {
+            "model": self.model,
+            **self._with_cost(overall),
+            "calls": sum(totals["calls"] for totals in agents.values()),
+            "retries": sum(totals["retries"] for totals in agents.values()),
+            "cache_hits": sum(totals["cache_hits"] for totals in stages.values()),
+            "stages": {stage: self._with_cost(totals) for stage, totals in stages.items()},
+            "agents": {agent: self._with_cost(totals) for agent, totals in agents.items()},
+        }
+
+
+@contextmanager
+def track_usage(model: str) -> Iterator[UsageRecorder]:
+    """Record LLM usage in this context, including threads started with a copy of it"""
+    recorder = UsageRecorder(model)
+    token = _recorders.set((*_recorders.get(), recorder))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+
+def tracking() -> bool:
+    """Check whether any run records LLM usage in this context"""
+    return bool(_recorders.get())
+
+
+def record_kickoff(stage: str, seconds: float, usage: Any = None, cached: bool = False) -> None:
+    """Record one crew kickoff with the observers and in every run tracked in this context"""
+    for observer in _observers:
+        observer.kickoff(stage, seconds, cached)
+    for recorder in _recorders.get():
+        recorder.record_kickoff(stage, seconds, usage, cached)
+
+
+def record_call(model: str, agent: str, seconds: float, usage: Any = None, failed: bool = False) -> None:
+    """Record one LLM call with the observers and in every run tracked in this context"""
+    prompt, completion = _usage_tokens(usage)
+    for observer in _observers:
+        observer.call(model, agent, seconds, prompt, completion, failed)
+    for recorder in _recorders.get():
+        recorder.record_call(agent, seconds, usage, failed)
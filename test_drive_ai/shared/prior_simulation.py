@@ -0,0 +1,121 @@
+import json
+import math
+from typing import TYPE_CHECKING, Any, Optional
+
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+else:
+    np = lazy_import("numpy")
+
+# Priors used for a segment or field the model left out
+DEFAULT_BASELINE_RATE = 0.05
+DEFAULT_LIFT = 0.0
+DEFAULT_RESPONSE_DELAY_DAYS = 7.0
+DEFAULT_COST_PER_CUSTOMER = 0.0
+
+# Shape of the gamma distributions of days to convert and cost per treated customer
+DELAY_SHAPE = 2.0
+COST_SHAPE = 2.0
+
+
+def _number(value: Any, default: float, low: float, high: float = math.inf) -> float:
+    """Read a prior as a float clamped to [low, high], falling back to the default"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if math.isnan(number) else min(max(number, low), high)
+
+
+def parse_priors(raw: str, segments: list[str]) -> dict[str, Any]:
+    """Read an intervention's effect-size priors from model output
+
+    Expects a JSON object with per-segment baseline rates and relative lifts, a mean
+    response delay in days and a cost per treated customer. Missing or out-of-range
+    values are replaced by defaults or clamped.
+
+    Raises:
+        ValueError: If the output holds no JSON object
+    """
+    text = raw.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    try:
+        priors = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError(f"Expected a JSON object of priors, got invalid JSON: {text[:200]}") from None  # noqa: TRY003
+    if not isinstance(priors, dict):
+        raise ValueError(f"Expected a JSON object of priors, got: {text[:200]}")  # noqa: TRY003, TRY004
+
+    by_segment = priors.get("segments")
+    if not isinstance(by_segment, dict):
+        by_segment = {}
+    segment_priors = {}
+    for segment in segments:
+        values = by_segment.get(segment)
+        if not isinstance(values, dict):
+            values = {}
+        segment_priors[segment] = {
+            "baseline_rate": _number(values.get("baseline_rate"), DEFAULT_BASELINE_RATE, 0, 1),
+            "lift": _number(values.get("lift"), DEFAULT_LIFT, -1),
+        }
+    return {
+        "segments": segment_priors,
+        "response_delay_days": _number(priors.get("response_delay_days"), DEFAULT_RESPONSE_DELAY_DAYS, 0),
+        "cost_per_customer": _number(priors.get("cost_per_customer"), DEFAULT_COST_PER_CUSTOMER, 0),
+    }
+
+
+def simulate_from_priors(
+    priors: dict[str, Any], sample_size: int, seed: Optional[int] = None
+) -> dict[str, dict[str, Any]]:
+    """Simulate a control and a treatment arm of sample_size customers per segment
+
+    All segments are drawn at once from aggregate distributions: conversions are binomial,
+    and the sums of per-customer gamma delays and costs are themselves gamma distributed.
+    The cost of a simulation therefore does not grow with the sample size.
+
+    Returns:
+        Outcome statistics per segment, keyed by segment name
+    """
+    segments = list(priors["segments"])
+    rng = np.random.default_rng(seed)
+    baseline = np.array([priors["segments"][segment]["baseline_rate"] for segment in segments])
+    lift = np.array([priors["segments"][segment]["lift"] for segment in segments])
+    rates = np.stack([baseline, np.clip(baseline * (1 + lift), 0, 1)])
+
+    conversions = rng.binomial(sample_size, rates)
+    observed = conversions / sample_size
+    pooled = conversions.sum(axis=0) / (2 * sample_size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (observed[1] - observed[0]) / np.sqrt(pooled * (1 - pooled) * 2 / sample_size)
+        observed_lift = observed[1] / observed[0] - 1
+
+    # Treated customers: days to convert of each conversion, cost of each customer
+    treated = conversions[1]
+    delay_scale = max(priors["response_delay_days"], 1e-9) / DELAY_SHAPE
+    total_delay = rng.gamma(np.maximum(treated, 1) * DELAY_SHAPE, delay_scale)
+    cost_scale = max(priors["cost_per_customer"], 1e-9) / COST_SHAPE
+    total_cost = rng.gamma(sample_size * COST_SHAPE, cost_scale, len(segments)) * (priors["cost_per_customer"] > 0)
+
+    def statistic(values: "npt.NDArray[Any]", index: int, digits: int) -> Optional[float]:
+        return round(float(values[index]), digits) if math.isfinite(values[index]) else None
+
+    p_values = np.array([math.erfc(abs(value) / math.sqrt(2)) for value in z])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_to_convert = total_delay / treated
+        cost_per_conversion = total_cost / treated
+    return {
+        segment: {
+            "sample_size": sample_size,
+            "control_conversion_rate": statistic(observed[0], index, 6),
+            "treatment_conversion_rate": statistic(observed[1], index, 6),
+            "lift": statistic(observed_lift, index, 6),
+            "p_value": statistic(p_values, index, 6),
+            "mean_days_to_convert": statistic(days_to_convert, index, 3),
+            "cost_per_conversion": statistic(cost_per_conversion, index, 2),
+            "priors": priors["segments"][segment],
+        }
+        for index, segment in enumerate(segments)
+    }
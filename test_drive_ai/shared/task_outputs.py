@@ -0,0 +1,109 @@
+import json
+from typing import Optional, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+OutputT = TypeVar("OutputT", bound=BaseModel)
+
+
+class InterventionSpec(BaseModel):
+    """An intervention strategy proposed by the intervention strategist"""
+
+    name: str
+    type: str = ""
+    description: str = ""
+    target_segments: list[str] = []
+    implementation: str = ""
+    expected_impact: str = ""
+    estimated_cost: Optional[str] = None
+    timeline: Optional[str] = None
+
+
+class InterventionPlan(BaseModel):
+    """Output of the intervention generation task"""
+
+    interventions: list[InterventionSpec]
+
+
+class AnalysisStats(BaseModel):
+    """Statistics of one intervention on one segment
+
+    Conversion rates are proportions between 0 and 1, and lift is the relative change
+    of the treatment conversion rate over the control one.
+    """
+
+    sample_size: Optional[int] = None
+    control_conversion_rate: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    treatment_conversion_rate: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    lift: Optional[float] = None
+    p_value: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    confidence_interval: Optional[tuple[float, float]] = None
+    cost_per_conversion: Optional[float] = None
+    mean_days_to_convert: Optional[float] = None
+    insights: list[str] = []
+
+
+class ValidationReport(BaseModel):
+    """Business validation of an analysis"""
+
+    realistic: bool = True
+    confidence_score: float = Field(ge=0.0, le=100.0)
+    risks: list[str] = []
+    recommendations: list[str] = []
+
+
+class SimulationReport(BaseModel):
+    """Output of the simulation task: the analysis statistics and their validation"""
+
+    analysis: AnalysisStats
+    validation: Optional[ValidationReport] = None
+
+
+class PairReport(SimulationReport):
+    """Simulation report of one intervention and segment pair in a batched simulation"""
+
+    intervention: str
+    segment: str
+
+
+class BatchSimulationReport(BaseModel):
+    """Output of a batched simulation task: one report per intervention and segment pair"""
+
+    reports: list[PairReport]
+
+
+class RankedIntervention(BaseModel):
+    """An intervention's place in the final ranking"""
+
+    name: str
+    score: float = Field(ge=0.0, le=100.0)
+    rationale: str = ""
+
+
+class InterventionRanking(BaseModel):
+    """Output of the ranking task"""
+
+    summary: str
+    ranking: list[RankedIntervention]
+    implementation_sequence: list[str] = []
+    recommendations: list[str] = []
+    risks: list[str] = []
+
+
+def schema_instructions(model: type[BaseModel]) -> str:
+    """Instruct an agent to answer with a JSON object matching a task output schema"""
+    return f"Output only a JSON object matching this JSON schema:\n{json.dumps(model.model_json_schema())}"
+
+
+def parse_output(model: type[OutputT], raw: str) -> Optional[OutputT]:
+    """Validate a task's raw output against its schema, or return None when it does not match
+
+    The JSON object may be wrapped in a code fence or surrounded by prose.
+    """
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return model.model_validate_json(raw[start : end + 1])
+    except ValidationError:
+        return None
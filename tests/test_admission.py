@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.background_tasks import AdmissionRejected, ExperimentTaskManager
+from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_service import ExperimentService
+from test_drive_ai.backend.simulation_service import SimulationService
+from test_drive_ai.main import app
+
+
+def test_work_estimate_is_population_times_replications():
+    config = {"parameters": {"sample_size": 1000, "interventions": ["control", "a", "b"], "replications": 4}}
+    assert SimulationService().estimate_work(config) == 12_000
+
+
+def test_client_quota_is_enforced_per_client(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_CLIENT_MAX_RUNS", 2)
+    monkeypatch.setattr(settings, "ADMISSION_CLIENT_QUOTAS", {"notebook": 1})
+    manager = ExperimentTaskManager(max_concurrent=2)
+    manager.reserve("r1", "notebook", 100)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        manager.admit("notebook", 100)
+    assert rejected.value.reason == "client_quota"
+    manager.admit("dashboard", 100)
+
+
+def test_outstanding_work_limit_still_admits_into_an_idle_pool(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_OUTSTANDING_WORK", 1000)
+    manager = ExperimentTaskManager(max_concurrent=2)
+    manager.admit("client", 5000)
+    manager.reserve("r1", "client", 5000)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        manager.admit("other", 10)
+    assert rejected.value.reason == "work_limit"
+    assert rejected.value.retry_after >= 1
+
+
+class _SlowSimulation:
+    async def run_experiment(self, experiment_id, run_id, config, status_callback):
+        await asyncio.sleep(60)
+
+
+def test_cancelling_a_queued_run_releases_its_reservation():
+    async def scenario():
+        experiment_service = ExperimentService()
+        manager = ExperimentTaskManager(max_concurrent=1)
+        run_ids = []
+        for _ in range(2):
+            run = experiment_service.create_experiment_run("bank-portal-migration")
+            manager.reserve(run.run_id, "client", 100)
+            manager.start("bank-portal-migration", run.run_id, {}, experiment_service, _SlowSimulation())
+            run_ids.append(run.run_id)
+        await asyncio.sleep(0)
+
+        assert manager.queued == 1
+        manager.cancel_experiment(run_ids[1])
+        await asyncio.sleep(0)
+        outstanding = manager.outstanding_work
+        manager.cancel_experiment(run_ids[0])
+        await asyncio.sleep(0)
+        return outstanding, manager.outstanding_work
+
+    assert asyncio.run(scenario()) == (100, 0)
+
+
+def test_run_endpoint_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUED_RUNS", 0)
+    with TestClient(app) as client:
+        response = client.post("/experiments/bank-portal-migration/run", json={})
+        runs = app.state.experiment_service.list_runs()
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["detail"]["reason"] == "queue_full"
+    assert runs["runs"] == []
+
+
+def test_client_quota_ignores_self_declared_client_ids(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ADMISSION_CLIENT_MAX_RUNS", 1)
+    monkeypatch.setattr(settings, "RUN_CHECKPOINT_PATH", str(tmp_path / "checkpoints.json"))
+    monkeypatch.setattr(settings, "SHUTDOWN_DRAIN_SECONDS", 0)
+    with TestClient(app) as client:
+        accepted = client.post("/experiments/bank-portal-migration/run", json={}, headers={"X-Client-Id": "a"})
+        rejected = client.post("/experiments/bank-portal-migration/run", json={}, headers={"X-Client-Id": "b"})
+
+    assert accepted.status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"]["reason"] == "client_quota"
+
+
+def test_retry_after_is_the_estimated_wait_capped(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUED_RUNS", 2)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_RETRY_AFTER_SECONDS", 60)
+    manager = ExperimentTaskManager(max_concurrent=1)
+    manager.seconds_per_unit = 0.01
+    for run_id in ("r1", "r2", "r3"):
+        manager.reserve(run_id, run_id, 1000)
+    manager.active = 1
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        manager.admit("client", 10)
+    assert rejected.value.estimated_wait == pytest.approx(30.0)
+    assert rejected.value.retry_after == 30
+
+    manager.seconds_per_unit = 1.0
+    with pytest.raises(AdmissionRejected) as rejected:
+        manager.admit("client", 10)
+    assert rejected.value.retry_after == 60
+
+
+@pytest.mark.parametrize("custom_parameters", [{"sample_size": "abc"}, {"sample_size": 0}, {"random_seed": "seed"}])
+def test_run_endpoint_rejects_invalid_parameters_with_422(custom_parameters):
+    with TestClient(app) as client:
+        response = client.post("/experiments/bank-portal-migration/run", json={"custom_parameters": custom_parameters})
+        runs = app.state.experiment_service.list_runs()
+
+    assert response.status_code == 422
+    assert runs["runs"] == []
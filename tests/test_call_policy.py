@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from test_drive_ai.backend.llm_metrics import LLM_HEDGE_WINS, LLM_RETRIES
+from test_drive_ai.foo import InterventionFramework, crewai
+from test_drive_ai.resilient_llm import ResilientLLM
+from test_drive_ai.shared.call_policy import CallPolicy, PolicyRunner
+
+MESSAGES = [{"role": "user", "content": "Estimate the lift of peer champions"}]
+
+
+class StandInLLMServer(ThreadingHTTPServer):
+    """OpenAI-compatible chat completions server answering with scripted latency and failures"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.faults: list[tuple[float, int]] = []
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v1"
+
+    def next_fault(self) -> tuple[float, int]:
+        """Delay and HTTP status of the next request, then fast successes once the script runs out"""
+        with self.lock:
+            self.requests += 1
+            return self.faults.pop(0) if self.faults else (0.0, 200)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        delay, status = self.server.next_fault()
+        time.sleep(delay)
+        if status == 200:
+            body = {
+                "id": "chatcmpl-stand-in",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": "lift: 12%"}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16},
+            }
+        else:
+            body = {"error": {"message": f"injected {status}", "type": "server_error"}}
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except OSError:
+            pass  # the client gave up on this request
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandInLLMServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _resilient(server, agent, **policy):
+    client = crewai.LLM(model="openai/gpt-4o-mini", base_url=server.base_url, api_key="test", max_retries=0, timeout=10)
+    return ResilientLLM(client, CallPolicy(backoff_seconds=0.01, **policy), agent)
+
+
+def test_transient_errors_are_retried_and_others_raised(server):
+    server.faults = [(0.0, 503), (0.0, 500)]
+    retries = LLM_RETRIES.value(agent="retry-agent", error="InternalServerError")
+
+    assert _resilient(server, "retry-agent", max_attempts=3).call(MESSAGES) == "lift: 12%"
+    assert server.requests == 3
+    assert LLM_RETRIES.value(agent="retry-agent", error="InternalServerError") == retries + 2
+
+    server.faults = [(0.0, 400)]
+    server.requests = 0
+    with pytest.raises(Exception, match="injected 400"):
+        _resilient(server, "retry-agent", max_attempts=3).call(MESSAGES)
+    assert server.requests == 1
+
+
+def test_attempts_past_their_deadline_are_abandoned_and_retried(server):
+    server.faults = [(2.0, 200)]
+
+    start = time.perf_counter()
+    assert _resilient(server, "deadline-agent", timeout_seconds=0.3).call(MESSAGES) == "lift: 12%"
+
+    assert time.perf_counter() - start < 1.0
+    assert server.requests == 2
+
+    server.faults = [(2.0, 200), (2.0, 200)]
+    with pytest.raises(TimeoutError):
+        _resilient(server, "deadline-agent", timeout_seconds=0.2, max_attempts=2).call(MESSAGES)
+
+
+def test_slow_calls_are_hedged_and_the_first_answer_wins(server):
+    server.faults = [(2.0, 200)]
+    wins = LLM_HEDGE_WINS.value(agent="hedge-agent")
+
+    start = time.perf_counter()
+    answer = _resilient(server, "hedge-agent", hedge=True, hedge_after_seconds=0.1).call(MESSAGES)
+
+    assert answer == "lift: 12%"
+    assert time.perf_counter() - start < 1.0
+    assert server.requests == 2
+    assert LLM_HEDGE_WINS.value(agent="hedge-agent") == wins + 1
+
+
+def test_hedging_delay_follows_recent_latency_and_backoff_is_jittered():
+    runner = PolicyRunner(
+        CallPolicy(hedge=True, hedge_after_seconds=5.0, hedge_min_samples=10, backoff_seconds=1.0), seed=1
+    )
+
+    assert runner.hedge_delay() == 5.0
+    for _ in range(20):
+        runner.run(time.sleep, 0.01)
+    assert 0.01 <= runner.hedge_delay() < 0.2
+
+    delays = [runner.backoff(3) for _ in range(200)]
+    assert all(0 <= delay <= 8.0 for delay in delays)
+    assert len(set(delays)) == 200
+    assert max(runner.backoff(10) for _ in range(50)) <= runner.policy.max_backoff_seconds
+
+
+def test_attempts_queued_past_their_deadline_never_start(monkeypatch):
+    monkeypatch.setattr("test_drive_ai.shared.call_policy.MAX_CALL_WORKERS", 1)
+    runner = PolicyRunner(CallPolicy(timeout_seconds=0.1, max_attempts=2, backoff_seconds=0.0))
+    release = threading.Event()
+    calls = []
+
+    def stalled():
+        calls.append(time.perf_counter())
+        release.wait(5)
+
+    with pytest.raises(TimeoutError):
+        runner.run(stalled)
+    release.set()
+    runner._executor.shutdown(wait=True)
+
+    assert len(calls) == 1
+
+
+def test_call_policies_are_configured_per_agent():
+    policy = CallPolicy(timeout_seconds=30.0)
+    framework = InterventionFramework(
+        llm_model="openai/gpt-4o-mini", call_policy=CallPolicy(), agent_call_policies={"data": policy}
+    )
+
+    with framework.pool.checkout("simulate") as agents:
+        assert agents["data"].llm.runner.policy is policy
+        assert agents["analyst"].llm.runner.policy.timeout_seconds == 120.0
+        assert all(agent.llm.llm is framework.llm for agent in agents.values())
+    assert InterventionFramework(llm_model="openai/gpt-4o-mini").agent_llms == {}
+    with pytest.raises(ValueError):
+        InterventionFramework(llm_model="openai/gpt-4o-mini", agent_call_policies={"reviewer": policy})
@@ -0,0 +1,162 @@
+import asyncio
+import os
+
+import pytest
+import yaml
+
+from test_drive_ai.backend import experiment_catalog
+from test_drive_ai.backend.experiment_catalog import ExperimentCatalog
+
+
+def _definition(experiment_id: str, name: str = "Experiment") -> dict:
+    return {
+        "id": experiment_id,
+        "name": name,
+        "description": "Test experiment",
+        "category": "Testing",
+        "tags": ["test"],
+        "config": {"name": "Config", "description": "Config description", "parameters": {"sample_size": 10}},
+    }
+
+
+@pytest.fixture
+def experiments_dir(tmp_path):
+    directory = tmp_path / "experiments"
+    directory.mkdir()
+    for experiment_id in ("alpha", "beta"):
+        (directory / f"{experiment_id}.yaml").write_text(yaml.safe_dump(_definition(experiment_id)))
+    return directory
+
+
+def _catalog(experiments_dir, tmp_path) -> ExperimentCatalog:
+    catalog = ExperimentCatalog(str(experiments_dir), str(tmp_path / "cache" / "catalog.pickle"))
+    catalog.load()
+    return catalog
+
+
+def test_load_parses_configs_lazily(experiments_dir, tmp_path):
+    catalog = _catalog(experiments_dir, tmp_path)
+
+    entry = catalog.get("alpha")
+    assert [e.id for e in catalog.entries()] == ["alpha", "beta"]
+    assert entry._experiment is None
+    assert entry.experiment.config.parameters == {"sample_size": 10}
+    assert entry.experiment is entry.experiment
+
+
+def test_second_load_uses_compiled_cache(experiments_dir, tmp_path, monkeypatch):
+    _catalog(experiments_dir, tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr(experiment_catalog.yaml, "load", fail)
+    catalog = _catalog(experiments_dir, tmp_path)
+
+    assert catalog.get("beta").name == "Experiment"
+
+
+def test_refresh_reloads_only_changed_files(experiments_dir, tmp_path):
+    catalog = _catalog(experiments_dir, tmp_path)
+    beta = catalog.get("beta")
+
+    path = experiments_dir / "alpha.yaml"
+    path.write_text(yaml.safe_dump(_definition("alpha", name="Renamed")))
+    os.utime(path, ns=(0, 0))
+
+    assert catalog.refresh() == ["alpha"]
+    assert catalog.get("alpha").name == "Renamed"
+    assert catalog.get("beta") is beta
+
+
+def test_refresh_ignores_touched_but_identical_files(experiments_dir, tmp_path):
+    catalog = _catalog(experiments_dir, tmp_path)
+    os.utime(experiments_dir / "alpha.yaml", ns=(0, 0))
+
+    assert catalog.refresh() == []
+
+
+def test_refresh_drops_deleted_files(experiments_dir, tmp_path):
+    catalog = _catalog(experiments_dir, tmp_path)
+    (experiments_dir / "beta.yaml").unlink()
+
+    assert catalog.refresh() == ["beta"]
+    assert catalog.get("beta") is None
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "- a list\n",
+        "just a scalar\n",
+        "id: gamma\n",
+        "{unclosed\n",
+        "{id: gamma, name: G, description: D, category: C, config: {name: C}}\n",
+        "{id: gamma, name: G, description: D, category: C, tags: none, config: {name: C, description: D, parameters: {}}}\n",
+    ],
+)
+def test_refresh_skips_invalid_files(experiments_dir, tmp_path, content, caplog):
+    catalog = _catalog(experiments_dir, tmp_path)
+    (experiments_dir / "gamma.yaml").write_text(content)
+
+    assert catalog.refresh() == []
+    assert catalog.refresh() == []
+    assert [e.id for e in catalog.entries()] == ["alpha", "beta"]
+    assert len([r for r in caplog.records if "gamma.yaml" in r.getMessage()]) == 1
+
+
+def test_watch_survives_failed_reloads(experiments_dir, tmp_path, monkeypatch):
+    catalog = _catalog(experiments_dir, tmp_path)
+    refreshes = []
+
+    def refresh():
+        refreshes.append(1)
+        if len(refreshes) == 1:
+            raise TypeError("unexpected")
+        return []
+
+    monkeypatch.setattr(catalog, "refresh", refresh)
+
+    async def scenario():
+        watcher = asyncio.create_task(catalog.watch(0.01))
+        while len(refreshes) < 3:
+            await asyncio.sleep(0.01)
+        assert not watcher.done()
+        watcher.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_query_filters_by_category_tag_and_text(tmp_path):
+    catalog = ExperimentCatalog(str(tmp_path / "missing"), str(tmp_path / "catalog.pickle"))
+    catalog.add({**_definition("loans", name="Loan Approval"), "category": "Risk", "tags": ["loans"]})
+    catalog.add({**_definition("churn", name="Churn Prevention"), "category": "Retention", "tags": ["churn"]})
+    catalog.add({**_definition("migration", name="Portal Migration"), "category": "Risk", "tags": ["banking"]})
+
+    assert [e.id for e in catalog.query(category="risk")[0]] == ["loans", "migration"]
+    assert [e.id for e in catalog.query(category="Risk", tags=["banking"])[0]] == ["migration"]
+    assert [e.id for e in catalog.query(text="prev")[0]] == ["churn"]
+    assert catalog.query(text="nothing")[0] == []
+
+
+def test_query_paginates_with_cursor(tmp_path):
+    catalog = ExperimentCatalog(str(tmp_path / "missing"), str(tmp_path / "catalog.pickle"))
+    for experiment_id in ("e", "d", "c", "b", "a"):
+        catalog.add(_definition(experiment_id))
+
+    first, cursor, total = catalog.query(limit=2)
+    second, cursor, _ = catalog.query(cursor=cursor, limit=2)
+    third, last_cursor, _ = catalog.query(cursor=cursor, limit=2)
+
+    assert total == 5
+    assert [e.id for e in first + second + third] == ["a", "b", "c", "d", "e"]
+    assert last_cursor is None
+
+
+def test_summary_projection_does_not_parse_config(tmp_path):
+    catalog = ExperimentCatalog(str(tmp_path / "missing"), str(tmp_path / "catalog.pickle"))
+    entry = catalog.add(_definition("alpha"))
+
+    assert entry.project(["id", "tags"]) == {"id": "alpha", "tags": ["test"]}
+    assert entry._experiment is None
+    assert entry.project(["id", "config"])["config"]["name"] == "Config"
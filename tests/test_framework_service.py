@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from test_drive_ai.backend.config import Settings
+from test_drive_ai.backend.experiment_schema import ExperimentStatus
+from test_drive_ai.backend.framework_service import (
+    STAGE_PROGRESS,
+    WORK_UNITS_PER_KICKOFF,
+    FrameworkSimulationService,
+)
+from test_drive_ai.foo import crewai
+from test_drive_ai.shared.task_outputs import InterventionPlan, parse_output
+
+SEGMENTS = ["small_business", "large_enterprise"]
+CONFIG = {
+    "parameters": {"segments": SEGMENTS, "sample_size": 5_000},
+    "custom_context": {"random_seed": 7},
+}
+RANKING = {
+    "summary": "Incentives win on every segment.",
+    "ranking": [{"name": "incentive_program", "score": 81}, {"name": "peer_champions", "score": 64}],
+    "recommendations": ["Launch the incentive program first"],
+}
+
+
+@pytest.fixture
+def kickoffs(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        roles = [task.agent.role for task in crew.tasks]
+        description = crew.tasks[-1].description
+        with lock:
+            calls.append(roles)
+        if roles == ["Intervention Strategist"]:
+            interventions = [{"name": "incentive_program"}, {"name": "peer_champions"}]
+            raw = f"Here you go:\n```json\n{json.dumps({'interventions': interventions})}\n```"
+        elif roles == ["Data Scientist"]:
+            lift = 0.4 if '"incentive_program"' in description else 0.1
+            segments = {segment: {"baseline_rate": 0.1, "lift": lift} for segment in SEGMENTS}
+            raw = json.dumps({"segments": segments, "response_delay_days": 4, "cost_per_customer": 12})
+        elif "final ranking" in description:
+            raw = json.dumps(RANKING)
+        else:
+            raw = "The configuration looks complete."
+        return crewai.CrewOutput(raw=raw, tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    return calls
+
+
+def test_framework_run_reports_stages_and_builds_typed_results(kickoffs):
+    service = FrameworkSimulationService("openai/gpt-4o-mini", mode="hybrid")
+    updates = []
+
+    results = asyncio.run(service.run_experiment("exp", "run-1", CONFIG, lambda *args: updates.append(args[1:])))
+
+    steps = [step for _, _, step in updates]
+    assert steps[:3] == ["Analyzing experiment configuration", "Generating interventions", "Simulating interventions"]
+    assert sum(step.startswith("Simulated ") for step in steps) == 2
+    assert steps[-2:] == ["Finalizing results", "Experiment completed successfully"]
+    assert [progress for _, progress, _ in updates] == sorted(progress for _, progress, _ in updates)
+    assert updates[-1][0] == ExperimentStatus.COMPLETED
+
+    assert kickoffs.count(["Data Scientist"]) == 2
+    assert results.summary == RANKING["summary"]
+    assert results.recommendations == RANKING["recommendations"]
+    assert results.metrics["incentive_program_conversion_rate"] == pytest.approx(14.0, abs=1.5)
+    assert results.metrics["control_conversion_rate"] == pytest.approx(10.0, abs=1.0)
+    assert results.metrics["failed_pairs"] == 0
+    assert results.visualizations[0]["data"]["categories"] == SEGMENTS
+    assert results.metadata["ranking"][0]["name"] == "incentive_program"
+    assert results.metadata["llm_usage"]["stages"]["priors"]["kickoffs"] == 2
+
+
+def test_llm_mode_reports_pairs_with_unparseable_output_as_failed(kickoffs):
+    service = FrameworkSimulationService("openai/gpt-4o-mini", mode="llm")
+    config = {**CONFIG, "parameters": {**CONFIG["parameters"], "interventions": ["incentive_program"]}}
+
+    results = asyncio.run(service.run_experiment("exp", "run-2", config, lambda *args: None))
+
+    assert ["Intervention Strategist"] not in kickoffs
+    assert kickoffs.count(["Data Scientist", "Statistical Analyst", "Business Validator"]) == 2
+    assert results.metrics["failed_pairs"] == 2
+    assert all(pair["error"] for pair in results.metadata["pairs"])
+
+
+def test_framework_run_profiles_stages_and_rejects_outcome_storage(kickoffs, tmp_path):
+    service = FrameworkSimulationService("openai/gpt-4o-mini", mode="hybrid", profiles_dir=str(tmp_path))
+    config = {**CONFIG, "profile": "timing"}
+
+    results = asyncio.run(service.run_experiment("exp", "run-3", config, lambda *args: None))
+
+    phases = [phase["phase"] for phase in results.metadata["profile"]["phases"]]
+    assert phases == list(STAGE_PROGRESS)
+    with pytest.raises(ValueError, match="store_outcomes"):
+        service.validate_config({**CONFIG, "store_outcomes": True})
+    with pytest.raises(ValueError, match="random_seed"):
+        service.validate_config({**CONFIG, "custom_context": {"random_seed": "seven"}})
+
+
+def test_framework_work_estimate_counts_crew_kickoffs():
+    config = {"parameters": {"segments": SEGMENTS, "interventions": ["a", "b", "c"]}}
+
+    hybrid = FrameworkSimulationService("openai/gpt-4o-mini", mode="hybrid").estimate_work(config)
+    per_pair = FrameworkSimulationService("openai/gpt-4o-mini", mode="llm").estimate_work(config)
+
+    assert hybrid == (2 + 3) * WORK_UNITS_PER_KICKOFF
+    assert per_pair == (2 + 3 * 2) * WORK_UNITS_PER_KICKOFF
+
+
+def test_task_outputs_are_parsed_from_fenced_or_surrounded_json():
+    raw = 'Sure!\n```json\n{"interventions": [{"name": "peer_champions", "target_segments": ["smb"]}]}\n```'
+
+    plan = parse_output(InterventionPlan, raw)
+
+    assert plan.interventions[0].target_segments == ["smb"]
+    assert parse_output(InterventionPlan, '{"interventions": "none"}') is None
+    assert parse_output(InterventionPlan, "No JSON here") is None
+
+
+def test_engine_settings_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SIMULATION_ENGINE", "framework")
+    monkeypatch.setenv("FRAMEWORK_MAX_CONCURRENCY", "8")
+    monkeypatch.setenv("FRAMEWORK_LLM_TIMEOUT_SECONDS", "45.5")
+    monkeypatch.setenv("FRAMEWORK_LLM_HEDGE", "true")
+
+    configured = Settings()
+
+    assert configured.SIMULATION_ENGINE == "framework"
+    assert configured.FRAMEWORK_MAX_CONCURRENCY == 8
+    assert configured.FRAMEWORK_LLM_TIMEOUT_SECONDS == 45.5
+    assert configured.FRAMEWORK_LLM_HEDGE is True
+    assert configured.FRAMEWORK_SIMULATION_MODE == Settings.FRAMEWORK_SIMULATION_MODE
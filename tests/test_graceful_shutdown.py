@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.background_tasks import ExperimentTaskManager
+from test_drive_ai.backend.config import settings
+from test_drive_ai.backend.experiment_schema import ExperimentStatus
+from test_drive_ai.backend.experiment_service import ExperimentService
+from test_drive_ai.backend.run_checkpoints import load_checkpoints, save_checkpoints
+from test_drive_ai.backend.simulation_service import PHASES, SimulationService
+from test_drive_ai.main import app
+
+
+class _StubSimulation:
+    async def run_experiment(self, experiment_id, run_id, config, status_callback):
+        status_callback(run_id, ExperimentStatus.RUNNING, 50, "Running intervention simulations")
+        await asyncio.sleep(config["seconds"])
+        return SimulationService._generate_mock_results(experiment_id, run_id)
+
+
+def test_drain_finishes_short_runs_and_checkpoints_long_ones():
+    async def scenario():
+        experiment_service = ExperimentService()
+        manager = ExperimentTaskManager(max_concurrent=2)
+        manager.seconds_per_unit = 0.001
+        runs = {}
+        for name, units, seconds in (("short", 100, 0.01), ("long", 1_000_000, 60), ("queued", 100, 0.01)):
+            run = experiment_service.create_experiment_run("bank-portal-migration")
+            manager.reserve(run.run_id, "client", units)
+            manager.start(
+                "bank-portal-migration", run.run_id, {"seconds": seconds}, experiment_service, _StubSimulation()
+            )
+            runs[name] = run.run_id
+        await asyncio.sleep(0)
+
+        checkpoints = await manager.drain(deadline_seconds=1.0)
+        return experiment_service, manager, runs, checkpoints
+
+    experiment_service, manager, runs, checkpoints = asyncio.run(scenario())
+    assert experiment_service.get_results(runs["short"]) is not None
+    assert {checkpoint["run"]["run_id"] for checkpoint in checkpoints} == {runs["long"], runs["queued"]}
+    assert manager.running_tasks == {}
+    assert manager.draining
+
+
+def test_resumed_run_skips_completed_phases():
+    steps = []
+    resume_from = SimulationService.resume_phase("Calculating statistical significance")
+    asyncio.run(
+        SimulationService(phase_seconds=0).run_experiment(
+            "exp", "run-1", {"resume_from_phase": resume_from}, lambda *args: steps.append(args[3])
+        )
+    )
+
+    assert steps[0] == "Calculating statistical significance"
+    assert len(steps) == len(PHASES) - resume_from + 1
+
+
+def test_checkpoints_are_consumed_once(tmp_path):
+    path = str(tmp_path / "checkpoints.json")
+    save_checkpoints(path, [{"run": {"run_id": "r1"}}])
+
+    assert load_checkpoints(path) == [{"run": {"run_id": "r1"}}]
+    assert load_checkpoints(path) == []
+
+
+def test_checkpointed_runs_survive_a_restart(tmp_path, monkeypatch):
+    path = tmp_path / "checkpoints.json"
+    monkeypatch.setattr(settings, "RUN_CHECKPOINT_PATH", str(path))
+    monkeypatch.setattr(settings, "SHUTDOWN_DRAIN_SECONDS", 0)
+    run = {"run_id": "r1", "experiment_id": "bank-portal-migration", "current_step": "Loading historical data"}
+    save_checkpoints(
+        str(path),
+        [{"experiment_id": "bank-portal-migration", "run": run, "config": {}, "client_id": "c", "units": 10}],
+    )
+
+    with TestClient(app) as client:
+        status = client.get("/experiments/run/r1/status")
+        assert status.status_code == 200
+
+    (checkpoint,) = json.loads(path.read_text())["runs"]
+    assert checkpoint["run"]["run_id"] == "r1"
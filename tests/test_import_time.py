@@ -0,0 +1,60 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from test_drive_ai.shared.import_report import ENTRY_POINTS, _parse_importtime, measure_imports
+from test_drive_ai.shared.lazy_imports import lazy_import
+
+
+def test_parse_importtime_reads_self_and_cumulative_times():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   _io",
+        "import time:      2500 |       2620 | encodings",
+        "some warning printed while importing",
+    ])
+
+    modules = _parse_importtime(stderr)
+
+    assert [entry["module"] for entry in modules] == ["_io", "encodings"]
+    assert modules[1]["self_seconds"] == pytest.approx(0.0025)
+    assert modules[1]["cumulative_seconds"] == pytest.approx(0.00262)
+
+
+@pytest.mark.parametrize("entry_point", list(ENTRY_POINTS))
+def test_entry_point_imports_within_budget_without_heavy_packages(entry_point):
+    report = measure_imports(entry_point)
+
+    assert report["eagerly_imported"] == []
+    assert report["within_budget"], report["slowest"]
+
+
+def test_lazy_import_returns_loaded_module_unchanged():
+    assert lazy_import("numpy") is np
+
+
+def test_lazy_import_rejects_missing_module():
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("test_drive_ai_missing_module")
+
+
+def test_lazy_import_loads_once_when_first_touched_by_many_threads(tmp_path, monkeypatch):
+    (tmp_path / "slow_lazy_module.py").write_text("import time\ntime.sleep(0.2)\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_lazy_module", raising=False)
+    module = lazy_import("slow_lazy_module")
+
+    barrier = threading.Barrier(8)
+
+    def touch():
+        barrier.wait()
+        return module.VALUE
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(lambda _: touch(), range(8)))
+
+    assert values == [42] * 8
+    monkeypatch.delitem(sys.modules, "slow_lazy_module")
@@ -0,0 +1,359 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from test_drive_ai import foo
+from test_drive_ai.foo import InterventionFramework, crewai, get_framework
+from test_drive_ai.shared.response_cache import ResponseCache
+
+INTERVENTIONS = [{"name": "incentive_program"}, {"name": "peer_champions"}]
+SEGMENTS = ["small_business", "medium_business", "large_enterprise"]
+
+
+@pytest.fixture(scope="module")
+def framework():
+    return InterventionFramework(llm_model="openai/gpt-4o-mini")
+
+
+@pytest.fixture
+def fake_simulation(framework, monkeypatch):
+    state = {"running": 0, "peak": 0, "delays": {}}
+    lock = threading.Lock()
+
+    def simulate(intervention, segment, sample_size=10, use_cache=True):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        try:
+            delay = state["delays"].get((intervention["name"], segment), 0.05)
+            if delay < 0:
+                raise RuntimeError("model unavailable")  # noqa: TRY003
+            time.sleep(delay)
+            return f"{intervention['name']}:{segment}"
+        finally:
+            with lock:
+                state["running"] -= 1
+
+    monkeypatch.setattr(framework, "simulate_intervention", simulate)
+    return state
+
+
+def test_simulations_run_concurrently_and_keep_input_order(framework, fake_simulation):
+    fake_simulation["delays"][("incentive_program", "small_business")] = 0.2
+
+    start = time.perf_counter()
+    results = framework.simulate_interventions(INTERVENTIONS, SEGMENTS, max_concurrency=3)
+    elapsed = time.perf_counter() - start
+
+    assert [(r["intervention"], r["segment"]) for r in results] == [
+        (i["name"], s) for i in INTERVENTIONS for s in SEGMENTS
+    ]
+    assert [r["result"] for r in results] == [f"{i['name']}:{s}" for i in INTERVENTIONS for s in SEGMENTS]
+    assert fake_simulation["peak"] == 3
+    assert elapsed < 0.2 + 5 * 0.05
+
+
+def test_slow_and_failing_simulations_are_reported_without_blocking_others(framework, fake_simulation):
+    fake_simulation["delays"][("peer_champions", "large_enterprise")] = 1.0
+    fake_simulation["delays"][("incentive_program", "medium_business")] = -1
+
+    start = time.perf_counter()
+    results = framework.simulate_interventions(INTERVENTIONS, SEGMENTS, max_concurrency=6, timeout=0.3)
+
+    assert time.perf_counter() - start < 0.9
+    by_pair = {(r["intervention"], r["segment"]): r for r in results}
+    assert by_pair["peer_champions", "large_enterprise"]["error"] == "Timed out after 0.3s"
+    assert by_pair["incentive_program", "medium_business"]["error"] == "model unavailable"
+    assert sum("result" in r for r in results) == 4
+
+
+@pytest.fixture
+def kickoffs(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        with lock:
+            calls.append([(task.agent.role, task.description) for task in crew.tasks])
+        time.sleep(0.05)
+        return crewai.CrewOutput(raw=f"output of {crew.tasks[0].description}", tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    return calls
+
+
+def test_identical_crews_reuse_cached_output_unless_opted_out(framework, kickoffs, tmp_path, monkeypatch):
+    monkeypatch.setattr(framework, "cache", ResponseCache(str(tmp_path / "cache.sqlite3")))
+
+    first = framework.generate_interventions("portal migration", num_interventions=2)
+    second = framework.generate_interventions("portal migration", num_interventions=2)
+    framework.generate_interventions("portal migration", num_interventions=2, use_cache=False)
+    framework.generate_interventions("edited portal migration", num_interventions=2)
+
+    assert len(kickoffs) == 3
+    assert kickoffs[0][0][0] == "Intervention Strategist"
+    assert second.raw == first.raw
+    assert framework.cache.stats()["entries"] == 2
+
+
+def test_concurrent_stage_runs_check_out_separate_pooled_agents(kickoffs):
+    framework = InterventionFramework(llm_model="openai/gpt-4o-mini", pool_size=2)
+    framework.pool.warm(["simulate"])
+    agent_sets = []
+    build = framework.pool._build
+    framework.pool._build = lambda roles: agent_sets.append(roles) or build(roles)
+
+    results = framework.simulate_interventions(INTERVENTIONS, SEGMENTS, max_concurrency=2)
+
+    assert all("result" in result for result in results)
+    assert len(kickoffs) == 6
+    assert agent_sets == []
+    assert framework.pool.stats()["simulate"] == {"created": 2, "idle": 2}
+    assert framework.pool.stats()["parse"] == {"created": 0, "idle": 0}
+    with framework.pool.checkout("simulate") as agents:
+        assert all(agent.llm is framework.llm for agent in agents.values())
+
+
+def test_simulations_do_not_wait_for_agents_beyond_the_pool_size(monkeypatch):
+    def kickoff(crew, *args, **kwargs):
+        time.sleep(0.3)
+        return crewai.CrewOutput(raw="output", tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    framework = InterventionFramework(llm_model="openai/gpt-4o-mini", pool_size=1)
+
+    results = framework.simulate_interventions(INTERVENTIONS, SEGMENTS, max_concurrency=6, timeout=1.0, use_cache=False)
+
+    assert all("result" in result for result in results)
+    assert framework.pool.stats()["simulate"] == {"created": 6, "idle": 6}
+    assert framework.pool.size == 1
+
+
+def test_failed_agent_builds_free_their_pool_slot_and_waits_time_out():
+    builds = []
+
+    def build(roles):
+        builds.append(roles)
+        if len(builds) <= 2:
+            raise RuntimeError
+        return {role: object() for role in roles}
+
+    pool = foo.AgentPool(build, size=1, timeout=0.1)
+    for _ in range(2):
+        with pytest.raises(RuntimeError), pool.checkout("simulate"):
+            pass
+
+    with pool.checkout("simulate"), pytest.raises(TimeoutError), pool.checkout("simulate"):
+        pass
+    assert pool.stats()["simulate"] == {"created": 1, "idle": 1}
+
+
+def test_get_framework_reuses_one_framework_per_model():
+    assert get_framework("openai/gpt-4o-mini") is get_framework("openai/gpt-4o-mini")
+    assert get_framework("openai/gpt-4o-mini") is not get_framework("openai/gpt-4o-mini", temperature=0.0)
+
+    barrier = threading.Barrier(8)
+
+    def create():
+        barrier.wait()
+        return get_framework("openai/gpt-4o-mini", temperature=0.3)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        frameworks = [future.result() for future in [executor.submit(create) for _ in range(8)]]
+    assert all(framework is frameworks[0] for framework in frameworks)
+
+
+def test_usage_is_recorded_per_stage_and_agent(framework, monkeypatch):
+    def kickoff(crew, *args, **kwargs):
+        bus = crewai.events.crewai_event_bus
+        for task in crew.tasks:
+            call_id = f"{id(crew)}-{task.agent.role}"
+            bus.emit(crew, crewai.events.LLMCallStartedEvent(call_id=call_id, agent_role=task.agent.role))
+            bus.emit(
+                crew,
+                crewai.events.LLMCallCompletedEvent(
+                    call_id=call_id,
+                    agent_role=task.agent.role,
+                    model="gpt-4o-mini",
+                    response="ok",
+                    call_type="llm_call",
+                    usage={"prompt_tokens": 100, "completion_tokens": 20},
+                ),
+            )
+        usage = {"prompt_tokens": 100 * len(crew.tasks), "completion_tokens": 20 * len(crew.tasks)}
+        return crewai.CrewOutput(raw="ok", tasks_output=[], token_usage=usage)
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+
+    with framework.track_usage() as usage:
+        framework.simulate_interventions(INTERVENTIONS, SEGMENTS, max_concurrency=3)
+        framework.rank_interventions([])
+    framework.rank_interventions([])
+    summary = usage.summary()
+
+    assert summary["stages"]["simulate"]["kickoffs"] == 6
+    assert summary["stages"]["rank"]["kickoffs"] == 1
+    assert summary["calls"] == 19
+    assert summary["agents"]["Data Scientist"]["calls"] == 6
+    assert summary["agents"]["Statistical Analyst"]["calls"] == 7
+    assert summary["prompt_tokens"] == 1900
+    assert summary["estimated_cost_usd"] > 0
+
+
+def test_map_reduce_ranking_bounds_prompt_size(framework, monkeypatch):
+    prompts = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        description = crew.tasks[0].description
+        with lock:
+            prompts.append((crew.tasks[0].agent.role, description))
+        if "Summarize the results" in description:
+            name = description.split('"')[1]
+            raw = f'```json\n{{"intervention": "{name}", "effectiveness": 70, "risk": "low"}}\n```'
+            return crewai.CrewOutput(raw=raw, tasks_output=[])
+        return crewai.CrewOutput(raw="1. peer_champions", tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    results = [
+        {"intervention": f"intervention_{i}", "segment": f"segment_{s}", "result": "x" * 2_000}
+        for i in range(3)
+        for s in range(50)
+    ]
+
+    ranking = framework.rank_interventions(results, use_cache=False)
+
+    summaries = [description for _, description in prompts if "Summarize the results" in description]
+    final = [description for _, description in prompts if "final ranking" in description]
+    assert ranking.raw == "1. peer_champions"
+    assert len(summaries) == 3
+    assert len(final) == 1
+    assert all(len(prompt) < 2 * foo.RANKING_PROMPT_BUDGET_CHARS for prompt in summaries)
+    assert len(final[0]) < 3 * foo.SUMMARY_MAX_CHARS + 1_000
+    assert '"effectiveness": 70' in final[0]
+    assert final[0].index("intervention_0") < final[0].index("intervention_1") < final[0].index("intervention_2")
+
+    prompts.clear()
+    framework.rank_interventions(results[:2], use_cache=False)
+    assert len(prompts) == 1
+    assert "x" * 2_000 in prompts[0][1]
+
+    with pytest.raises(ValueError):
+        framework.rank_interventions(results, strategy="tournament")
+
+
+def test_large_studies_are_shortlisted_until_the_ranking_fits_the_budget(framework, monkeypatch):
+    prompts = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        description = crew.tasks[0].description
+        with lock:
+            prompts.append(description)
+        if "Summarize the results" in description:
+            name = description.split('"')[1]
+            summary = {"intervention": name, "effectiveness": int(name.split("_")[1]), "key_findings": ["f" * 400]}
+            return crewai.CrewOutput(raw=json.dumps(summary), tasks_output=[])
+        if "shortlist" in description:
+            names = re.findall(r'"intervention": "(\w+)"', description)
+            return crewai.CrewOutput(raw=json.dumps(names[-3:]), tasks_output=[])
+        return crewai.CrewOutput(raw="1. intervention_199", tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    results = [{"intervention": f"intervention_{i}", "segment": "all", "result": "x" * 100} for i in range(200)]
+
+    framework.rank_interventions(results, use_cache=False, strategy="map_reduce")
+
+    shortlists = [prompt for prompt in prompts if "shortlist" in prompt]
+    final = [prompt for prompt in prompts if "final ranking" in prompt]
+    payload = final[0].split("Results: ", 1)[1].split("\n\n            Provide", 1)[0]
+    assert len(payload) <= foo.RANKING_PROMPT_BUDGET_CHARS
+    assert all(len(prompt) < foo.RANKING_PROMPT_BUDGET_CHARS + 1_000 for prompt in shortlists)
+    assert shortlists
+    assert len(json.loads(payload)) <= len(shortlists) * foo.SHORTLIST_SIZE
+    assert '"intervention": "intervention_199"' in payload
+
+
+def test_shortlist_falls_back_to_effectiveness_when_no_names_are_given():
+    summaries = [{"intervention": f"i{n}", "effectiveness": n} for n in (40, 90, 10, 70)]
+
+    assert [s["intervention"] for s in foo._parse_shortlist("I like them all", summaries)] == ["i90", "i70", "i40"]
+    assert [s["intervention"] for s in foo._parse_shortlist('["i10", "nope", "i10"]', summaries)] == ["i10"]
+
+
+def test_unparseable_summaries_are_truncated_text():
+    summary = foo._parse_summary("peer_champions", "Not JSON " * 1_000)
+
+    assert summary["intervention"] == "peer_champions"
+    assert len(summary["summary"]) < foo.SUMMARY_MAX_CHARS
+
+
+def test_hybrid_mode_makes_one_priors_call_per_intervention(framework, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        with lock:
+            calls.append([task.agent.role for task in crew.tasks])
+        if '"broken"' in crew.tasks[0].description:
+            return crewai.CrewOutput(raw="It depends on the segment.", tasks_output=[])
+        lift = 0.3 if "incentive_program" in crew.tasks[0].description else 0.0
+        priors = {
+            "segments": {segment: {"baseline_rate": 0.1, "lift": lift} for segment in SEGMENTS},
+            "response_delay_days": 5,
+            "cost_per_customer": 20,
+        }
+        return crewai.CrewOutput(raw=json.dumps(priors), tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+    interventions = [*INTERVENTIONS, {"name": "broken"}]
+
+    results = framework.simulate_interventions(interventions, SEGMENTS, mode="hybrid", seed=3, use_cache=False)
+
+    assert calls == [["Data Scientist"]] * 3
+    assert [(r["intervention"], r["segment"]) for r in results] == [
+        (i["name"], s) for i in interventions for s in SEGMENTS
+    ]
+    assert all("Expected a JSON object" in r["error"] for r in results if r["intervention"] == "broken")
+    by_pair = {(r["intervention"], r["segment"]): r.get("result") for r in results}
+    assert by_pair["incentive_program", "small_business"]["sample_size"] == foo.DEFAULT_SAMPLE_SIZES["hybrid"]
+    assert by_pair["incentive_program", "small_business"]["lift"] > 0.15
+    assert by_pair["peer_champions", "large_enterprise"]["priors"] == {"baseline_rate": 0.1, "lift": 0.0}
+
+    with pytest.raises(ValueError):
+        framework.simulate_interventions(INTERVENTIONS, SEGMENTS, mode="agent_based")
+
+
+@pytest.mark.parametrize(("batch", "crews"), [("segments", 2), ("interventions", 3)])
+def test_batched_simulation_splits_one_report_per_pair(framework, monkeypatch, batch, crews):
+    prompts = []
+    lock = threading.Lock()
+
+    def kickoff(crew, *args, **kwargs):
+        description = crew.tasks[0].description
+        with lock:
+            prompts.append(description)
+        pairs = re.findall(r"Intervention: (\w+) / Segment: (\w+)", description)
+        reports = [
+            {"intervention": name, "segment": segment, "analysis": {"lift": 0.1 * len(segment)}}
+            for name, segment in pairs
+            if (name, segment) != ("peer_champions", "large_enterprise")
+        ]
+        return crewai.CrewOutput(raw=json.dumps({"reports": reports}), tasks_output=[])
+
+    monkeypatch.setattr(crewai.Crew, "kickoff", kickoff)
+
+    results = framework.simulate_interventions(INTERVENTIONS, SEGMENTS, batch=batch, use_cache=False)
+
+    assert len(prompts) == crews
+    assert [(r["intervention"], r["segment"]) for r in results] == [
+        (i["name"], s) for i in INTERVENTIONS for s in SEGMENTS
+    ]
+    by_pair = {(r["intervention"], r["segment"]): r for r in results}
+    assert by_pair["incentive_program", "medium_business"]["result"].pydantic.analysis.lift == pytest.approx(1.5)
+    assert "No result returned" in by_pair["peer_champions", "large_enterprise"]["error"]
+    assert sum("result" in r for r in results) == 5
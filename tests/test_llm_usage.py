@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from test_drive_ai.backend import llm_metrics
+from test_drive_ai.shared import llm_usage
+from test_drive_ai.shared.llm_usage import UsageRecorder, estimate_cost, track_usage
+
+
+def test_estimate_cost_uses_the_most_specific_model_price():
+    assert estimate_cost("openai/gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+    assert estimate_cost("openai/gpt-4o", 1_000_000, 0) == pytest.approx(2.5)
+    assert estimate_cost("local/replay", 1_000, 1_000) is None
+
+
+def test_summary_totals_stages_and_agents():
+    recorder = UsageRecorder("anthropic/claude-3-7-sonnet-20250219")
+    recorder.record_kickoff("simulate", 2.0, {"prompt_tokens": 1000, "completion_tokens": 200})
+    recorder.record_kickoff("simulate", 0.01, cached=True)
+    recorder.record_call("Data Scientist", 1.5, {"prompt_tokens": 600, "completion_tokens": 150})
+    recorder.record_call("Data Scientist", 0.2, failed=True)
+    recorder.record_call("Statistical Analyst", 0.5, {"input_tokens": 400, "output_tokens": 50})
+
+    summary = recorder.summary()
+
+    assert summary["prompt_tokens"] == 1000
+    assert summary["completion_tokens"] == 200
+    assert summary["estimated_cost_usd"] == pytest.approx(0.006)
+    assert (summary["calls"], summary["retries"], summary["cache_hits"]) == (3, 1, 1)
+    assert summary["stages"]["simulate"]["kickoffs"] == 2
+    assert summary["agents"]["Data Scientist"] == {
+        "prompt_tokens": 600,
+        "completion_tokens": 150,
+        "seconds": 1.7,
+        "calls": 2,
+        "retries": 1,
+        "estimated_cost_usd": 0.00405,
+    }
+    assert summary["agents"]["Statistical Analyst"]["prompt_tokens"] == 400
+
+
+def test_recording_reaches_tracked_runs_and_metrics():
+    calls_before = llm_metrics.LLM_CALLS.value(agent="Business Validator", outcome="success")
+
+    with track_usage("openai/gpt-4o-mini") as outer:
+        with track_usage("openai/gpt-4o-mini") as inner:
+            llm_usage.record_call("openai/gpt-4o-mini", "Business Validator", 0.3, {"prompt_tokens": 10})
+        thread = threading.Thread(target=llm_usage.record_call, args=("openai/gpt-4o-mini", "Business Validator", 0.1))
+        thread.start()
+        thread.join()
+    llm_usage.record_call("openai/gpt-4o-mini", "Business Validator", 0.1)
+
+    assert inner.summary()["calls"] == 1
+    assert outer.summary()["calls"] == 1
+    assert llm_metrics.LLM_CALLS.value(agent="Business Validator", outcome="success") == calls_before + 3
@@ -0,0 +1,85 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.background_tasks import ExperimentTaskManager
+from test_drive_ai.backend.metrics import MetricsRegistry
+from test_drive_ai.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value, route="/a")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert registry.histogram("latency_seconds", "Latency", ["route"]) is histogram
+
+
+HEALTH_COUNT = 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}'
+
+
+def _health_requests(text: str) -> int:
+    return next((int(line.split()[-1]) for line in text.splitlines() if line.startswith(HEALTH_COUNT)), 0)
+
+
+def test_metrics_endpoint_reports_route_latency_and_run_gauges():
+    with TestClient(app) as client:
+        before = _health_requests(client.get("/metrics").text)
+        client.get("/health")
+        response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _health_requests(response.text) == before + 1
+    assert "experiment_runs_active 0.0" in response.text
+    assert "experiment_runs_max_concurrent 5.0" in response.text
+
+
+def test_readiness_reports_saturated_worker_pool():
+    with TestClient(app) as client:
+        assert client.get("/ready").json()["status"] == "ready"
+        app.state.task_manager.active = app.state.task_manager.max_concurrent
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "saturated"
+
+
+class _BlockingSimulation:
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def run_experiment(self, experiment_id, run_id, config, status_callback):
+        await self.release.wait()
+
+
+class _NullExperimentService:
+    def update_run_status(self, *args):
+        return None
+
+    def save_results(self, results):
+        pass
+
+
+def test_task_manager_queues_runs_beyond_max_concurrent():
+    async def scenario():
+        manager = ExperimentTaskManager(max_concurrent=2)
+        simulation = _BlockingSimulation()
+        tasks = [
+            asyncio.create_task(manager.run_experiment("exp", f"run-{i}", {}, _NullExperimentService(), simulation))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        counts = (manager.active, manager.queued, manager.saturated)
+        simulation.release.set()
+        await asyncio.gather(*tasks)
+        return counts, (manager.active, manager.queued)
+
+    during, after = asyncio.run(scenario())
+    assert during == (2, 1, True)
+    assert after == (0, 0)
@@ -0,0 +1,57 @@
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.backend.simulation_service import SimulationService
+
+
+def _write_outcomes(tmp_path):
+    store = OutcomeStore(str(tmp_path))
+    config = {
+        "parameters": {"segments": ["small", "large"], "interventions": ["control", "email"], "sample_size": 50},
+        "custom_context": {"random_seed": 7},
+    }
+    summary = SimulationService(store)._simulate_outcomes("run-1", config)
+    return store, summary
+
+
+def test_outcomes_written_one_row_group_per_cell(tmp_path):
+    store, summary = _write_outcomes(tmp_path)
+
+    assert summary["rows"] == 100
+    assert summary["row_groups"] == 4
+    assert store.has_outcomes("run-1")
+    assert not (tmp_path / "run-1.parquet.tmp").exists()
+    assert store.describe("run-1")["rows"] == 100
+
+
+def test_query_filters_and_projects_columns(tmp_path):
+    store, _ = _write_outcomes(tmp_path)
+
+    page = store.query(
+        "run-1", columns=["customer_id", "segment"], filters={"segment": {"large"}, "intervention": {"email"}}
+    )
+
+    assert len(page["rows"]) == 25
+    assert all(set(row) == {"customer_id", "segment"} for row in page["rows"])
+    assert all(row["segment"] == "large" for row in page["rows"])
+
+
+def test_query_skips_row_groups_by_statistics(tmp_path):
+    store, _ = _write_outcomes(tmp_path)
+    parquet_file = store._open("run-1")
+
+    matching = [
+        index
+        for index in range(parquet_file.metadata.num_row_groups)
+        if store._row_group_matches(parquet_file.metadata.row_group(index), {"intervention": {"control"}})
+    ]
+
+    assert len(matching) == 2
+
+
+def test_query_paginates_across_row_groups(tmp_path):
+    store, _ = _write_outcomes(tmp_path)
+
+    first = store.query("run-1", columns=["customer_id"], limit=30)
+    second = store.query("run-1", columns=["customer_id"], limit=30, offset=30)
+
+    ids = [row["customer_id"] for row in first["rows"] + second["rows"]]
+    assert ids == list(range(60))
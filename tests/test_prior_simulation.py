@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from test_drive_ai.shared.prior_simulation import DEFAULT_BASELINE_RATE, parse_priors, simulate_from_priors
+
+SEGMENTS = ["small_business", "large_enterprise"]
+
+
+def test_priors_are_parsed_with_defaults_and_clamping():
+    raw = json.dumps({
+        "segments": {"small_business": {"baseline_rate": 1.4, "lift": "0.25"}, "large_enterprise": "n/a"},
+        "response_delay_days": -3,
+        "cost_per_customer": 40,
+    })
+
+    priors = parse_priors(f"```json\n{raw}\n```", SEGMENTS)
+
+    assert priors["segments"]["small_business"] == {"baseline_rate": 1.0, "lift": 0.25}
+    assert priors["segments"]["large_enterprise"] == {"baseline_rate": DEFAULT_BASELINE_RATE, "lift": 0.0}
+    assert priors["response_delay_days"] == 0.0
+    assert priors["cost_per_customer"] == 40.0
+
+    with pytest.raises(ValueError):
+        parse_priors("The intervention should work well.", SEGMENTS)
+
+
+def test_large_samples_recover_the_priors():
+    priors = {
+        "segments": {
+            "small_business": {"baseline_rate": 0.1, "lift": 0.5},
+            "large_enterprise": {"baseline_rate": 0.2, "lift": 0.0},
+        },
+        "response_delay_days": 6.0,
+        "cost_per_customer": 15.0,
+    }
+
+    outcomes = simulate_from_priors(priors, sample_size=10_000_000, seed=1)
+
+    small, large = outcomes["small_business"], outcomes["large_enterprise"]
+    assert small["control_conversion_rate"] == pytest.approx(0.1, abs=1e-3)
+    assert small["treatment_conversion_rate"] == pytest.approx(0.15, abs=1e-3)
+    assert small["lift"] == pytest.approx(0.5, abs=0.01)
+    assert small["p_value"] < 1e-6
+    assert small["mean_days_to_convert"] == pytest.approx(6.0, rel=0.01)
+    assert small["cost_per_conversion"] == pytest.approx(15.0 / 0.15, rel=0.01)
+    assert large["lift"] == pytest.approx(0.0, abs=0.01)
+    assert simulate_from_priors(priors, 1_000, seed=7) == simulate_from_priors(priors, 1_000, seed=7)
+
+
+def test_segments_without_conversions_report_missing_statistics():
+    priors = {
+        "segments": {"small_business": {"baseline_rate": 0.0, "lift": 0.0}},
+        "response_delay_days": 7.0,
+        "cost_per_customer": 0.0,
+    }
+
+    outcome = simulate_from_priors(priors, 100, seed=0)["small_business"]
+
+    assert outcome["treatment_conversion_rate"] == 0.0
+    assert outcome["lift"] is None
+    assert outcome["p_value"] is None
+    assert outcome["mean_days_to_convert"] is None
+    assert outcome["cost_per_conversion"] is None
@@ -0,0 +1,56 @@
+import asyncio
+import pstats
+
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.profiling import RunProfiler
+from test_drive_ai.backend.simulation_service import SimulationService
+from test_drive_ai.main import app
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_profiler_charges_engine_cpu_to_the_current_phase(tmp_path):
+    profiler = RunProfiler("cprofile")
+    with profiler.phase("idle"):
+        pass
+    with profiler.phase("compute"):
+        profiler.run_engine(_busy, 200_000)
+
+    summary = profiler.summary()
+    idle, compute = summary["phases"]
+    assert idle["cpu_seconds"] == 0
+    assert compute["cpu_seconds"] > 0
+    assert summary["peak_memory_bytes"] > 0
+    assert any("_busy" in entry["function"] for entry in summary["top_functions"])
+
+    profiler.dump_profile(str(tmp_path / "run.prof"))
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+
+def test_timing_only_runs_record_phases_without_profile():
+    profiler = RunProfiler()
+    with profiler.phase("idle"):
+        pass
+
+    assert not profiler.enabled
+    assert "peak_memory_bytes" not in profiler.phases[0]
+    assert not profiler.has_profile
+
+
+def test_profiled_run_summarizes_phases_in_metadata(tmp_path):
+    service = SimulationService(profiles_dir=str(tmp_path), phase_seconds=0)
+    results = asyncio.run(service.run_experiment("exp", "run-1", {"profile": "cprofile"}, lambda *args: None))
+
+    profile = results.metadata["profile"]
+    assert len(profile["phases"]) == 8
+    assert profile["profile_available"]
+    assert (tmp_path / "run-1.prof").exists()
+
+
+def test_missing_profile_download_returns_404():
+    with TestClient(app) as client:
+        response = client.get("/experiments/run/unknown/profile")
+    assert response.status_code == 404
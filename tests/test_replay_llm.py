@@ -0,0 +1,91 @@
+import statistics
+
+import pytest
+
+from test_drive_ai import benchmark as benchmark_module
+from test_drive_ai.benchmark import benchmark
+from test_drive_ai.foo import InterventionFramework, crewai
+from test_drive_ai.replay_llm import LatencyModel, LLMRecordings, RecordingLLM, ReplayLLM, message_key
+
+CONFIG = {"name": "Portal Migration", "segments": {"small_business": {"size": 30}}}
+
+
+class EchoLLM(crewai.BaseLLM):
+    def call(self, messages, *args, **kwargs):
+        return f"Thought: I now know the final answer\nFinal Answer: answer {message_key(messages)[:8]}"
+
+
+def test_latency_models():
+    assert LatencyModel.parse("fixed:0.2").sample() == 0.2
+    assert LatencyModel.parse("recorded:0.5").sample(recorded_seconds=3.0) == 1.5
+    assert LatencyModel.parse("recorded:0.5").sample() == 0.5
+    assert 0.5 <= LatencyModel.parse("uniform:1.0,0.5", seed=1).sample() <= 1.5
+
+    lognormal = LatencyModel.parse("lognormal:2.0,0.3", seed=1)
+    assert statistics.median(lognormal.sample() for _ in range(2_000)) == pytest.approx(2.0, rel=0.05)
+
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1.0")
+    with pytest.raises(ValueError):
+        LatencyModel.parse("lognormal:1,0.4,7")
+
+
+def test_recorded_responses_replay_offline(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    recorder = InterventionFramework(llm=RecordingLLM(EchoLLM(model="echo"), LLMRecordings(path)), verbose=False)
+    recorded = recorder.parse_experiment_config(CONFIG, use_cache=False)
+
+    recordings = LLMRecordings(path)
+    replayer = InterventionFramework(llm=ReplayLLM(recordings, LatencyModel("fixed", 0.0)), verbose=False)
+    with replayer.track_usage() as usage:
+        replayed = replayer.parse_experiment_config(CONFIG, use_cache=False)
+
+    assert len(recordings) == 1
+    assert replayed.raw == recorded.raw
+    assert usage.summary()["agents"]["Experiment Designer"]["calls"] == 1
+    assert usage.summary()["prompt_tokens"] > 0
+
+
+def test_unrecorded_prompts_fail_unless_misses_are_allowed(tmp_path):
+    recordings = LLMRecordings(str(tmp_path / "recordings.jsonl"))
+    llm = ReplayLLM(recordings, LatencyModel("fixed", 0.0))
+
+    with pytest.raises(KeyError):
+        llm.call([{"role": "user", "content": "unrecorded"}])
+
+    lenient = ReplayLLM(recordings, LatencyModel("fixed", 0.0), allow_misses=True)
+    assert "Final Answer" in lenient.call([{"role": "user", "content": "unrecorded"}])
+
+
+def test_benchmark_measures_pipeline_throughput_per_concurrency_level(tmp_path):
+    recordings = LLMRecordings(str(tmp_path / "recordings.jsonl"))
+
+    serial, concurrent = benchmark(recordings, "fixed:0.1", (1, 9), allow_misses=True)
+
+    assert serial["llm_calls"] == concurrent["llm_calls"] == 30
+    assert serial["pairs"] == concurrent["pairs"] == 9
+    assert serial["failed_pairs"] == concurrent["failed_pairs"] == 0
+    assert concurrent["wall_seconds"] < serial["wall_seconds"]
+    assert concurrent["calls_per_second"] > serial["calls_per_second"]
+    assert set(serial["stage_seconds"]) == {"parse", "generate", "simulate", "rank"}
+
+
+def test_main_dispatches_on_the_subcommand(monkeypatch, capsys):
+    calls = []
+
+    def record(model, path, mode, batch):
+        calls.append(("record", mode, batch))
+        return path
+
+    def replay(recordings, latency, levels, allow_misses, seed, mode, batch):
+        calls.append(("replay", mode, batch))
+        return []
+
+    monkeypatch.setattr(benchmark_module, "record", record)
+    monkeypatch.setattr(benchmark_module, "benchmark", replay)
+
+    assert benchmark_module.main(["record", "--mode", "hybrid", "--recordings", "recorded.jsonl"]) == 0
+    assert benchmark_module.main(["replay", "--batch", "segments", "--json"]) == 0
+
+    assert calls == [("record", "hybrid", "none"), ("replay", "llm", "segments")]
+    assert "recorded.jsonl" in capsys.readouterr().out
@@ -0,0 +1,58 @@
+import time
+
+from test_drive_ai.shared.response_cache import ResponseCache
+
+
+def _key(description):
+    return ResponseCache.key("openai/gpt-4o-mini", 0.7, [("Experiment Designer", description)])
+
+
+def test_key_covers_model_temperature_and_every_step():
+    steps = [("Data Scientist", "generate data"), ("Analyst", "analyze")]
+
+    assert ResponseCache.key("m", 0.7, steps) == ResponseCache.key("m", 0.7, list(steps))
+    assert ResponseCache.key("m", 0.7, steps) != ResponseCache.key("m", 0.2, steps)
+    assert ResponseCache.key("m", 0.7, steps) != ResponseCache.key("other", 0.7, steps)
+    assert ResponseCache.key("m", 0.7, steps) != ResponseCache.key("m", 0.7, steps[:1])
+
+
+def test_responses_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path)
+    cache.set(_key("parse config"), "summary")
+    cache.close()
+
+    reopened = ResponseCache(path)
+
+    assert reopened.get(_key("parse config")) == "summary"
+    assert reopened.get(_key("other config")) is None
+    assert reopened.stats()["hit_ratio"] == 0.5
+
+
+def test_expired_responses_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    cache.set(_key("parse config"), "summary")
+
+    time.sleep(0.1)
+
+    assert cache.get(_key("parse config")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_responses_are_evicted_over_the_limits(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set(_key("a"), "A")
+    cache.set(_key("b"), "B")
+    cache.get(_key("a"))
+    cache.set(_key("c"), "C")
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) == "A"
+    assert cache.get(_key("c")) == "C"
+
+    sized = ResponseCache(str(tmp_path / "sized.sqlite3"), max_bytes=10)
+    sized.set(_key("a"), "x" * 6)
+    sized.set(_key("b"), "y" * 6)
+
+    assert (sized.stats()["entries"], sized.stats()["bytes"]) == (1, 6)
+    assert sized.get(_key("b")) == "yyyyyy"
@@ -0,0 +1,64 @@
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.responses import (
+    IMMUTABLE_CACHE_CONTROL,
+    CachedBody,
+    cached_response,
+    dumps,
+    negotiate_encoding,
+)
+
+BODY = CachedBody(dumps({"values": list(range(1000))}))
+
+app = FastAPI()
+
+
+@app.get("/body")
+async def body_endpoint(request: Request):
+    return cached_response(request, BODY, IMMUTABLE_CACHE_CONTROL)
+
+
+client = TestClient(app)
+
+
+def test_etag_and_cache_control_are_set():
+    response = client.get("/body", headers={"Accept-Encoding": "identity"})
+
+    assert response.headers["etag"] == BODY.etag()
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == BODY.body
+
+
+def test_matching_if_none_match_returns_304():
+    response = client.get("/body", headers={"If-None-Match": BODY.etag(), "Accept-Encoding": "identity"})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_each_encoding_has_its_own_etag_and_any_revalidates():
+    gzipped = client.get("/body", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/body", headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["etag"] == BODY.etag("gzip") != identity.headers["etag"]
+    revalidated = client.get("/body", headers={"If-None-Match": gzipped.headers["etag"], "Accept-Encoding": "identity"})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == BODY.etag()
+    assert client.get("/body", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_is_negotiated_for_large_bodies():
+    response = client.get("/body", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"values": list(range(1000))}
+    assert BODY.encoded("gzip") == gzip.compress(BODY.body, mtime=0)
+
+
+def test_negotiation_respects_quality_and_size():
+    assert negotiate_encoding("gzip;q=0", 10_000) is None
+    assert negotiate_encoding("gzip", 10) is None
+    assert negotiate_encoding("*", 10_000) is not None
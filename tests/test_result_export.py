@@ -0,0 +1,53 @@
+import io
+import json
+
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from test_drive_ai.backend.outcome_store import OutcomeStore
+from test_drive_ai.backend.result_export import export_csv, export_ndjson, export_parquet
+from test_drive_ai.backend.simulation_service import SimulationService
+
+
+def _stored_run(tmp_path):
+    store = OutcomeStore(str(tmp_path))
+    config = {"parameters": {"segments": ["small", "large"], "interventions": ["control", "email"], "sample_size": 40}}
+    SimulationService(store)._simulate_outcomes("run-1", config)
+    return SimulationService._generate_mock_results("exp", "run-1"), store
+
+
+def test_ndjson_streams_result_then_outcomes(tmp_path):
+    result, store = _stored_run(tmp_path)
+
+    lines = b"".join(export_ndjson(result, store)).splitlines()
+
+    assert json.loads(lines[0])["type"] == "result"
+    assert len(lines) == 1 + 80
+    assert json.loads(lines[-1])["customer_id"] == 79
+
+
+def test_csv_writes_header_once(tmp_path):
+    result, store = _stored_run(tmp_path)
+
+    chunks = list(export_csv(result, store, "outcomes"))
+    table = pacsv.read_csv(io.BytesIO(b"".join(chunks)))
+
+    assert len(chunks) == 4
+    assert table.num_rows == 80
+
+
+def test_parquet_stream_is_a_valid_file(tmp_path):
+    result, store = _stored_run(tmp_path)
+
+    table = pq.read_table(io.BytesIO(b"".join(export_parquet(result, store, "outcomes"))))
+
+    assert table.num_rows == 80
+    assert table.column_names[0] == "customer_id"
+
+
+def test_metrics_table_export(tmp_path):
+    result, store = _stored_run(tmp_path)
+
+    table = pacsv.read_csv(io.BytesIO(b"".join(export_csv(result, store, "metrics"))))
+
+    assert table.column("metric").to_pylist() == list(result.metrics)
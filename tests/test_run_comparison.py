@@ -0,0 +1,47 @@
+import pytest
+
+from test_drive_ai.backend.experiment_schema import ExperimentResult
+from test_drive_ai.backend.run_comparison import compare_results
+
+
+def _result(run_id: str, rate: float, weeks: list[str], values: list[float]) -> ExperimentResult:
+    return ExperimentResult(
+        run_id=run_id,
+        experiment_id="exp",
+        summary="",
+        metrics={"control_conversion_rate": rate, "sample_size": 2500},
+        visualizations=[{"type": "line_chart", "title": "Rate", "data": {"x": weeks, "y": values}}],
+        recommendations=[],
+    )
+
+
+def test_deltas_are_relative_to_baseline():
+    comparison = compare_results([_result("a", 10.0, [], []), _result("b", 12.0, [], [])])
+
+    column = comparison["metrics"].index("control_conversion_rate")
+    assert comparison["baseline_run_id"] == "a"
+    assert comparison["deltas"][1][column] == pytest.approx(2.0)
+    assert comparison["relative_deltas"][1][column] == pytest.approx(20.0)
+
+
+def test_pooled_significance_against_baseline():
+    comparison = compare_results(
+        [_result("a", 10.0, [], []), _result("b", 15.0, [], []), _result("c", 10.2, [], [])], baseline_run_id="a"
+    )
+
+    p_values = comparison["significance"]["p_values"]
+    assert comparison["significance"]["metrics"] == ["control_conversion_rate"]
+    assert p_values[0][0] is None
+    assert p_values[1][0] < 0.001
+    assert p_values[2][0] > 0.5
+
+
+def test_visualization_series_are_aligned_on_label_union():
+    comparison = compare_results([
+        _result("a", 10.0, ["W1", "W2"], [1.0, 2.0]),
+        _result("b", 10.0, ["W2", "W3"], [3.0, 4.0]),
+    ])
+
+    (viz,) = comparison["visualizations"]
+    assert viz["labels"] == ["W1", "W2", "W3"]
+    assert viz["series"] == {"a:y": [1.0, 2.0, None], "b:y": [None, 3.0, 4.0]}
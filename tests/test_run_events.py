@@ -0,0 +1,120 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from test_drive_ai.backend.experiment_schema import ExperimentRun, ExperimentStatus
+from test_drive_ai.backend.run_events import RunEventBroker, RunSubscription
+from test_drive_ai.main import app
+
+
+def test_updates_are_coalesced_per_run():
+    broker = RunEventBroker()
+    run = ExperimentRun(run_id="r1", experiment_id="exp")
+    broker.publish(run)
+    subscription = RunSubscription()
+    broker.watch(subscription, ["r1"])
+    subscription.drain(broker)
+
+    for progress in (10, 20, 30):
+        run.progress = progress
+        broker.publish(run)
+
+    message = subscription.drain(broker)
+    assert [update["progress"] for update in message["runs"]] == [30]
+    assert subscription.drain(broker) is None
+
+
+def test_experiment_summary_tracks_active_and_finished_runs():
+    broker = RunEventBroker()
+    subscription = RunSubscription()
+    broker.watch(subscription, experiment_ids=["exp"])
+    broker.publish(ExperimentRun(run_id="r1", experiment_id="exp", status=ExperimentStatus.RUNNING, progress=50))
+    broker.publish(ExperimentRun(run_id="r2", experiment_id="exp", status=ExperimentStatus.COMPLETED, progress=100))
+
+    (summary,) = subscription.drain(broker)["experiments"]
+    assert summary == {
+        "experiment_id": "exp",
+        "active_runs": 1,
+        "mean_progress": 50,
+        "completed_runs": 1,
+        "failed_runs": 0,
+    }
+
+
+def test_unwatched_runs_are_not_delivered():
+    broker = RunEventBroker()
+    run = ExperimentRun(run_id="r1", experiment_id="exp")
+    broker.publish(run)
+    subscription = RunSubscription()
+    broker.watch(subscription, ["r1", "missing"])
+    assert subscription.drain(broker)["errors"] == ["Run not found: missing"]
+
+    broker.close(subscription)
+    broker.publish(run)
+    assert subscription.drain(broker) is None
+
+
+def test_events_since_replays_only_missed_events():
+    broker = RunEventBroker()
+    run = ExperimentRun(run_id="r1", experiment_id="exp")
+    for progress in (0, 10, 20, 30):
+        run.progress = progress
+        broker.publish(run)
+
+    assert [event["event_id"] for event in broker.events_since("r1", 2)] == [3, 4]
+    assert broker.events_since("r1", 4) == []
+    assert [event["event_id"] for event in broker.events_since("r1")] == [4]
+    assert broker.events_since("missing") is None
+
+
+def test_events_since_resyncs_when_missed_events_were_evicted(monkeypatch):
+    monkeypatch.setattr("test_drive_ai.backend.run_events.settings.RUN_EVENT_BUFFER_SIZE", 2)
+    broker = RunEventBroker()
+    run = ExperimentRun(run_id="r1", experiment_id="exp")
+    for progress in (0, 10, 20, 30):
+        run.progress = progress
+        broker.publish(run)
+
+    (event,) = broker.events_since("r1", 1)
+    assert event["event_id"] == 4
+    assert event["progress"] == 30
+
+
+def test_events_since_resyncs_on_an_event_id_from_before_a_restart():
+    broker = RunEventBroker()
+    run = ExperimentRun(run_id="r1", experiment_id="exp")
+    for progress in (40, 50):
+        run.progress = progress
+        broker.publish(run)
+
+    (event,) = broker.events_since("r1", 57)
+    assert event["event_id"] == 2
+    assert event["progress"] == 50
+
+
+def test_sse_stream_resumes_from_last_event_id():
+    with TestClient(app) as client:
+        experiment_service = app.state.experiment_service
+        run = experiment_service.create_experiment_run("bank-portal-migration")
+        for progress in (25, 50):
+            experiment_service.update_run_status(run.run_id, ExperimentStatus.RUNNING, progress, "Running")
+        experiment_service.update_run_status(run.run_id, ExperimentStatus.COMPLETED, 100, "Done")
+
+        response = client.get(f"/experiments/run/{run.run_id}/stream", headers={"Last-Event-ID": "2"})
+
+    events = [json.loads(line[len("data: ") :]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [event["event_id"] for event in events] == [3, 4, 4]
+    assert events[-1]["status"] == "completed"
+
+
+def test_websocket_multiplexes_run_updates():
+    with TestClient(app) as client:
+        experiment_service = app.state.experiment_service
+        runs = [experiment_service.create_experiment_run("bank-portal-migration") for _ in range(3)]
+
+        with client.websocket_connect("/experiments/ws") as websocket:
+            websocket.send_json({"action": "subscribe", "run_ids": [run.run_id for run in runs]})
+            message = websocket.receive_json()
+
+    assert message["type"] == "updates"
+    assert {update["run_id"] for update in message["runs"]} == {run.run_id for run in runs}
@@ -0,0 +1,53 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from test_drive_ai.backend.experiment_schema import ExperimentRun, ExperimentStatus
+from test_drive_ai.backend.run_index import RunIndex
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def index():
+    index = RunIndex()
+    for i in range(5):
+        run = ExperimentRun(
+            run_id=f"run-{i}", experiment_id="even" if i % 2 == 0 else "odd", started_at=START + timedelta(minutes=i)
+        )
+        index.add(run)
+        if i < 3:
+            index.update_status(run.run_id, run.status, ExperimentStatus.RUNNING, run.started_at + timedelta(seconds=i))
+            run.status = ExperimentStatus.RUNNING
+    return index
+
+
+def test_query_returns_newest_first_with_keyset_pages(index):
+    first = index.query(limit=2)
+    second = index.query(cursor=first["next_cursor"], limit=2)
+    third = index.query(cursor=second["next_cursor"], limit=2)
+
+    run_ids = [run.run_id for page in (first, second, third) for run in page["runs"]]
+    assert run_ids == ["run-4", "run-3", "run-2", "run-1", "run-0"]
+    assert third["next_cursor"] is None
+
+
+def test_query_filters_by_experiment_status_and_time(index):
+    result = index.query(
+        experiment_id="even", statuses=[ExperimentStatus.RUNNING], started_after=START + timedelta(minutes=1)
+    )
+
+    assert [run.run_id for run in result["runs"]] == ["run-2"]
+
+
+def test_aggregates_cover_all_matching_runs(index):
+    aggregates = index.query(limit=1)["aggregates"]
+
+    assert aggregates["total"] == 5
+    assert aggregates["counts_by_status"] == {"running": 3, "pending": 2}
+    assert aggregates["queue_wait_seconds"]["p50"] == 1.0
+
+
+def test_invalid_cursor_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
@@ -0,0 +1,41 @@
+import json
+import logging
+import queue
+
+from test_drive_ai.backend.structured_logging import JSONFormatter, RunSamplingFilter, _LazyQueueHandler
+
+
+def _record(msg, level=logging.INFO, args=(), **extra):
+    record = logging.LogRecord("test_drive_ai.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_keeps_one_record_per_run_and_interval():
+    sampling = RunSamplingFilter(interval_seconds=60)
+
+    assert sampling.filter(_record("Run progress", run_id="r1", sampled=True))
+    assert not sampling.filter(_record("Run progress", run_id="r1", sampled=True))
+    assert sampling.filter(_record("Run progress", run_id="r2", sampled=True))
+    assert sampling.filter(_record("Run progress", logging.WARNING, run_id="r1", sampled=True))
+    assert sampling.filter(_record("Run status changed", run_id="r1"))
+
+
+def test_json_formatter_writes_extra_fields_as_keys():
+    line = JSONFormatter().format(_record("Run %s", args=("r1",), run_id="r1", sampled=True, progress=50))
+
+    entry = json.loads(line)
+    assert entry["message"] == "Run r1"
+    assert entry["run_id"] == "r1"
+    assert entry["progress"] == 50
+    assert "sampled" not in entry
+
+
+def test_queue_handler_defers_formatting_to_the_listener():
+    log_queue = queue.SimpleQueue()
+    record = _record("Run %s", args=("r1",))
+    _LazyQueueHandler(log_queue).emit(record)
+
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.args == ("r1",)